@@ -12,6 +12,8 @@ from app.models.medecin import Medecin
 from app.models.patient import Patient
 from app.models.incident import Incident
 from app.models.suivi_incident import SuiviIncident
+from app.models.incident_stat import IncidentStat
+from app.models.incident_archive import IncidentArchive, SuiviIncidentArchive
 
 config = context.config
 if config.config_file_name is not None:
@@ -0,0 +1,89 @@
+"""align tables with models and add query indexes
+
+Revision ID: 3f9a1c2b7d40
+Revises: dc7192856123
+Create Date: 2026-10-18 09:12:04.318245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d40'
+down_revision: Union[str, None] = 'dc7192856123'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OLD_GRAVITE = ('mineur', 'modere', 'majeur', 'critique')
+NEW_GRAVITE = ('MINEUR', 'MODERE', 'MAJEUR', 'CRITIQUE')
+OLD_STATUT = ('ouvert', 'en_cours', 'resolu', 'ferme')
+NEW_STATUT = ('OUVERT', 'EN_COURS', 'RESOLU', 'FERME')
+
+
+def _migrate_enum(column: str, name: str, old: tuple, new: tuple, convert: str) -> None:
+    """
+    Switch the enum labels from `old` to `new`. MySQL maps the stored labels
+    case-insensitively during the ALTER; the UPDATE covers the other dialects.
+    """
+    with op.batch_alter_table('incidents') as batch_op:
+        batch_op.alter_column(column, existing_type=sa.Enum(*old, name=name),
+                              type_=sa.Enum(*new, name=name), existing_nullable=False)
+    op.execute(f'UPDATE incidents SET {column} = {convert}({column})')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Table names used by the models
+    op.rename_table('incident', 'incidents')
+    op.rename_table('suiviincident', 'suivis_incidents')
+
+    # Enum labels are stored as the Python enum names (upper case)
+    _migrate_enum('gravite', 'graviteenum', OLD_GRAVITE, NEW_GRAVITE, 'UPPER')
+    _migrate_enum('statut', 'statutenum', OLD_STATUT, NEW_STATUT, 'UPPER')
+
+    op.execute('UPDATE incidents SET deleted = 0 WHERE deleted IS NULL')
+    with op.batch_alter_table('incidents') as batch_op:
+        batch_op.alter_column('dateCreation', existing_type=sa.DateTime(), nullable=False,
+                              existing_server_default=sa.text('now()'))
+        batch_op.alter_column('dateModification', existing_type=sa.DateTime(), nullable=False,
+                              existing_server_default=sa.text('now()'))
+        batch_op.alter_column('deleted', existing_type=sa.Integer(), type_=sa.SmallInteger(),
+                              nullable=False, server_default='0')
+
+    with op.batch_alter_table('suivis_incidents') as batch_op:
+        batch_op.add_column(sa.Column('dateCreation', sa.DateTime(), nullable=False,
+                                      server_default=sa.text('CURRENT_TIMESTAMP')))
+
+    # Indexes backing each IncidentService query
+    op.create_index('ix_incidents_patient_actif', 'incidents',
+                    ['idPatient', 'deleted', 'dateIncident', 'heureIncident'])
+    op.create_index('ix_incidents_actif_creation', 'incidents', ['deleted', 'dateCreation', 'id'])
+    op.create_index('ix_suivis_incident_date', 'suivis_incidents', ['idIncident', 'dateSuivi'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_suivis_incident_date', table_name='suivis_incidents')
+    op.drop_index('ix_incidents_actif_creation', table_name='incidents')
+    op.drop_index('ix_incidents_patient_actif', table_name='incidents')
+
+    with op.batch_alter_table('suivis_incidents') as batch_op:
+        batch_op.drop_column('dateCreation')
+
+    with op.batch_alter_table('incidents') as batch_op:
+        batch_op.alter_column('deleted', existing_type=sa.SmallInteger(), type_=sa.Integer(),
+                              nullable=True, server_default=None)
+        batch_op.alter_column('dateModification', existing_type=sa.DateTime(), nullable=True,
+                              existing_server_default=sa.text('now()'))
+        batch_op.alter_column('dateCreation', existing_type=sa.DateTime(), nullable=True,
+                              existing_server_default=sa.text('now()'))
+
+    _migrate_enum('statut', 'statutenum', NEW_STATUT, OLD_STATUT, 'LOWER')
+    _migrate_enum('gravite', 'graviteenum', NEW_GRAVITE, OLD_GRAVITE, 'LOWER')
+
+    op.rename_table('suivis_incidents', 'suiviincident')
+    op.rename_table('incidents', 'incident')
@@ -0,0 +1,31 @@
+"""add version column to incidents for optimistic concurrency
+
+Revision ID: 5d2b8e4c1f63
+Revises: a8c3f61e9b25
+Create Date: 2026-10-18 21:07:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b8e4c1f63'
+down_revision: Union[str, None] = 'a8c3f61e9b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows start at version 1, like new ones (mapper version_id_col)
+    op.add_column('incidents', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('incidents_archive', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('incidents_archive', 'version')
+    op.drop_column('incidents', 'version')
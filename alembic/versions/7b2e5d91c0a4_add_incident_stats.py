@@ -0,0 +1,56 @@
+"""add incident_stats summary table
+
+Revision ID: 7b2e5d91c0a4
+Revises: 3f9a1c2b7d40
+Create Date: 2026-10-18 11:02:37.514920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e5d91c0a4'
+down_revision: Union[str, None] = '3f9a1c2b7d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'incident_stats',
+        sa.Column('dimension', sa.String(length=20), nullable=False),
+        sa.Column('bucket', sa.String(length=32), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dimension', 'bucket')
+    )
+
+    # Initial counts — same definition as StatsService.recount
+    if op.get_context().dialect.name == 'sqlite':
+        month, text = "strftime('%Y-%m', dateIncident)", 'TEXT'
+    else:
+        month, text = "CONCAT(YEAR(dateIncident), '-', LPAD(MONTH(dateIncident), 2, '0'))", 'CHAR'
+    op.execute(f"""
+        INSERT INTO incident_stats (dimension, bucket, count)
+        SELECT 'total', 'all', COUNT(*) FROM incidents WHERE deleted = 0
+        UNION ALL
+        SELECT 'gravite', gravite, COUNT(*) FROM incidents WHERE deleted = 0 GROUP BY gravite
+        UNION ALL
+        SELECT 'statut', statut, COUNT(*) FROM incidents WHERE deleted = 0 GROUP BY statut
+        UNION ALL
+        SELECT 'mois', {month}, COUNT(*) FROM incidents WHERE deleted = 0 GROUP BY {month}
+        UNION ALL
+        SELECT 'idImplant', CAST(idImplant AS {text}), COUNT(*) FROM incidents
+        WHERE deleted = 0 AND idImplant IS NOT NULL GROUP BY idImplant
+        UNION ALL
+        SELECT 'idProcesseur', CAST(idProcesseur AS {text}), COUNT(*) FROM incidents
+        WHERE deleted = 0 AND idProcesseur IS NOT NULL GROUP BY idProcesseur
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('incident_stats')
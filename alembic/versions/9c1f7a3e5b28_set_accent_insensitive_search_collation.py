@@ -0,0 +1,52 @@
+"""set an accent-insensitive collation on the full-text searched columns
+
+Revision ID: 9c1f7a3e5b28
+Revises: 5d2b8e4c1f63
+Create Date: 2026-10-19 09:12:37.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1f7a3e5b28'
+down_revision: Union[str, None] = '5d2b8e4c1f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same value as app.models.incident_search.SEARCH_COLLATION
+COLLATION = 'utf8mb4_0900_ai_ci'
+
+
+# The archive tables copy these columns (app.models.incident_archive): same
+# collation there, so the hot/archive UNION ALL of the exports compares alike
+COLUMNS = [
+    ('incidents', 'description', sa.String(2000), mysql.VARCHAR(2000, charset='utf8mb4', collation=COLLATION)),
+    ('incidents_archive', 'description', sa.String(2000),
+     mysql.VARCHAR(2000, charset='utf8mb4', collation=COLLATION)),
+    ('suivis_incidents', 'actionsPrises', sa.Text(), mysql.TEXT(charset='utf8mb4', collation=COLLATION)),
+    ('suivis_incidents_archive', 'actionsPrises', sa.Text(), mysql.TEXT(charset='utf8mb4', collation=COLLATION)),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # MySQL only: FULLTEXT matching follows the column collation, which otherwise
+    # comes from the database default and may be accent-sensitive (SQLite FTS5
+    # folds accents with remove_diacritics)
+    if op.get_context().dialect.name != 'mysql':
+        return
+    for table, column, default_type, collated_type in COLUMNS:
+        op.alter_column(table, column, existing_type=default_type, existing_nullable=False, type_=collated_type)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name != 'mysql':
+        return
+    for table, column, default_type, collated_type in reversed(COLUMNS):
+        op.alter_column(table, column, existing_type=collated_type, existing_nullable=False, type_=default_type)
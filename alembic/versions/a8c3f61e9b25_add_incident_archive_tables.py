@@ -0,0 +1,64 @@
+"""add archive tables for incidents and suivis
+
+Revision ID: a8c3f61e9b25
+Revises: e5a90f3d2c17
+Create Date: 2026-10-18 18:42:10.305871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c3f61e9b25'
+down_revision: Union[str, None] = 'e5a90f3d2c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same columns as incidents / suivis_incidents (ids copied), plus dateArchivage
+    op.create_table(
+        'incidents_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('dateIncident', sa.Date(), nullable=False),
+        sa.Column('heureIncident', sa.Time(), nullable=False),
+        sa.Column('gravite', sa.Enum('MINEUR', 'MODERE', 'MAJEUR', 'CRITIQUE', name='graviteenum'), nullable=False),
+        sa.Column('description', sa.String(length=2000), nullable=False),
+        sa.Column('statut', sa.Enum('OUVERT', 'EN_COURS', 'RESOLU', 'FERME', name='statutenum'), nullable=False),
+        sa.Column('idPatient', sa.Integer(), nullable=False),
+        sa.Column('idImplant', sa.Integer(), nullable=True),
+        sa.Column('idProcesseur', sa.Integer(), nullable=True),
+        sa.Column('idMedecin', sa.Integer(), nullable=True),
+        sa.Column('dateCreation', sa.DateTime(), nullable=False),
+        sa.Column('dateModification', sa.DateTime(), nullable=False),
+        sa.Column('deleted', sa.SmallInteger(), nullable=False),
+        sa.Column('dateArchivage', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_incidents_archive_patient', 'incidents_archive', ['idPatient', 'dateIncident'])
+    op.create_table(
+        'suivis_incidents_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('dateSuivi', sa.Date(), nullable=False),
+        sa.Column('actionsPrises', sa.Text(), nullable=False),
+        sa.Column('idIncident', sa.Integer(), nullable=False),
+        sa.Column('idMedecin', sa.Integer(), nullable=True),
+        sa.Column('dateCreation', sa.DateTime(), nullable=False),
+        sa.Column('dateArchivage', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_suivis_archive_incident_date', 'suivis_incidents_archive', ['idIncident', 'dateSuivi']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_suivis_archive_incident_date', table_name='suivis_incidents_archive')
+    op.drop_table('suivis_incidents_archive')
+    op.drop_index('ix_incidents_archive_patient', table_name='incidents_archive')
+    op.drop_table('incidents_archive')
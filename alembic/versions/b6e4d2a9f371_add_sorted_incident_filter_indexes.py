@@ -0,0 +1,42 @@
+"""index the medecin / implant / processeur filters for every list sort order
+
+Revision ID: b6e4d2a9f371
+Revises: 9c1f7a3e5b28
+Create Date: 2026-10-20 10:04:52.318846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e4d2a9f371'
+down_revision: Union[str, None] = '9c1f7a3e5b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FILTERS = (('medecin', 'idMedecin'), ('implant', 'idImplant'), ('processeur', 'idProcesseur'))
+SORTS = (
+    ('creation', ['dateCreation', 'id']),
+    ('date', ['dateIncident', 'heureIncident', 'id']),
+    ('modification', ['dateModification', 'id']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The previous filter indexes ended in dateIncident: every other sort needed a filesort
+    for name, column in FILTERS:
+        for suffix, sort_columns in SORTS:
+            op.create_index(f'ix_incidents_{name}_{suffix}', 'incidents', [column, 'deleted', *sort_columns])
+        op.drop_index(f'ix_incidents_{name}', table_name='incidents')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, column in reversed(FILTERS):
+        op.create_index(f'ix_incidents_{name}', 'incidents', [column, 'deleted', 'dateIncident'])
+        for suffix, _ in reversed(SORTS):
+            op.drop_index(f'ix_incidents_{name}_{suffix}', table_name='incidents')
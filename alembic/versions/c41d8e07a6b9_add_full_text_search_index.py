@@ -0,0 +1,45 @@
+"""add full-text search index on descriptions and suivi actions
+
+Revision ID: c41d8e07a6b9
+Revises: 7b2e5d91c0a4
+Create Date: 2026-10-18 13:40:11.906218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e07a6b9'
+down_revision: Union[str, None] = '7b2e5d91c0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_context().dialect.name == 'sqlite':
+        # Same definition as app.models.incident_search
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS incident_search USING fts5("
+            "body, kind UNINDEXED, ref_id UNINDEXED, incident_id UNINDEXED, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute("INSERT INTO incident_search (rowid, body, kind, ref_id, incident_id) "
+                   "SELECT 2 * id, description, 'incident', id, id FROM incidents WHERE deleted = 0")
+        op.execute("INSERT INTO incident_search (rowid, body, kind, ref_id, incident_id) "
+                   "SELECT 2 * s.id + 1, s.actionsPrises, 'suivi', s.id, s.idIncident FROM suivis_incidents s "
+                   "JOIN incidents i ON i.id = s.idIncident WHERE i.deleted = 0")
+    else:
+        op.create_index('ft_incidents_description', 'incidents', ['description'], mysql_prefix='FULLTEXT')
+        op.create_index('ft_suivis_actions', 'suivis_incidents', ['actionsPrises'], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS incident_search")
+    else:
+        op.drop_index('ft_suivis_actions', table_name='suivis_incidents')
+        op.drop_index('ft_incidents_description', table_name='incidents')
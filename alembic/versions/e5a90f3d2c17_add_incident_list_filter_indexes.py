@@ -0,0 +1,39 @@
+"""add indexes for incident list filters and sort orders
+
+Revision ID: e5a90f3d2c17
+Revises: c41d8e07a6b9
+Create Date: 2026-10-18 15:21:48.077134
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a90f3d2c17'
+down_revision: Union[str, None] = 'c41d8e07a6b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = (
+    ('ix_incidents_actif_date', ['deleted', 'dateIncident', 'heureIncident', 'id']),
+    ('ix_incidents_actif_modification', ['deleted', 'dateModification', 'id']),
+    ('ix_incidents_triage', ['deleted', 'statut', 'gravite', 'dateIncident']),
+    ('ix_incidents_medecin', ['idMedecin', 'deleted', 'dateIncident']),
+    ('ix_incidents_implant', ['idImplant', 'deleted', 'dateIncident']),
+    ('ix_incidents_processeur', ['idProcesseur', 'deleted', 'dateIncident']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns in INDEXES:
+        op.create_index(name, 'incidents', columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='incidents')
@@ -0,0 +1,224 @@
+"""
+Admission control and load shedding for the database-bound routes (/api/...).
+
+Every /api request needs a pooled connection, and the pool holds
+DB_POOL_SIZE + DB_MAX_OVERFLOW of them: letting more requests in only moves
+the wait inside SQLAlchemy, where it ends in a pool timeout after the client
+has given up. AdmissionMiddleware admits at most ADMISSION_MAX_CONCURRENT
+requests at a time (the pool capacity by default); the next ones wait in a
+FIFO queue of ADMISSION_MAX_QUEUE places for ADMISSION_QUEUE_TIMEOUT_SECONDS.
+A full queue or an expired wait is answered at once with 503 and Retry-After.
+
+With RATE_LIMIT_PER_SECOND, each client (address) also has a token bucket
+of RATE_LIMIT_BURST requests refilled at that rate; an empty bucket is a 429.
+OPTIONS requests are let through untouched.
+
+State lives on the event loop thread of each worker process: the counters
+need no lock. Queue depth, in-flight requests, waits and rejections are
+exported at /metrics.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ADMITTED_PREFIX = "/api/"
+MAX_CLIENTS = 10000
+
+QUEUE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Rejected(Exception):
+    """Request refused by admission control; `reason` labels the rejection metric."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    """At most `max_concurrent` holders, then a FIFO queue of `max_queue` waiters with a deadline."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, timeout_seconds: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the queue if needed. Raises Rejected (queue_full / timeout)."""
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise Rejected("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                raise Rejected("timeout")
+            # Handed a slot as the deadline expired: keep it
+        except asyncio.CancelledError:
+            # Client gone: hand back a slot it may have been given meanwhile
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            ADMISSION_QUEUE_WAIT.observe((), time.perf_counter() - start)
+
+    def release(self) -> None:
+        """Give the slot to the oldest waiter still waiting, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class TokenBuckets:
+    """Per-client token buckets of `burst` tokens refilled at `rate` per second (LRU-bounded)."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int = MAX_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def take(self, client: str, now: Optional[float] = None) -> float:
+        """Take a token: 0 if granted, otherwise the seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [float(self.burst), now]
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+
+def build_controller() -> Optional[AdmissionController]:
+    """Controller sized from the settings; None when ADMISSION_MAX_CONCURRENT is 0."""
+    capacity = settings.ADMISSION_MAX_CONCURRENT
+    if capacity is None:
+        capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    if capacity <= 0:
+        return None
+    return AdmissionController(capacity, settings.ADMISSION_MAX_QUEUE, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS)
+
+
+def build_buckets() -> Optional[TokenBuckets]:
+    if settings.RATE_LIMIT_PER_SECOND <= 0:
+        return None
+    return TokenBuckets(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+
+
+admission = build_controller()
+rate_limiter = build_buckets()
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying rate limiting, then admission control, to /api requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # OPTIONS (CORS preflight and the like) needs no connection: never queued, shed or limited
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or not scope["path"].startswith(ADMITTED_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        if rate_limiter is not None:
+            client = scope["client"][0] if scope.get("client") else "unknown"
+            wait = rate_limiter.take(client)
+            if wait:
+                ADMISSION_REJECTED.inc(("rate_limited",))
+                logger.warning("%s %s → 429 rate limited (client %s)", scope["method"], scope["path"], client)
+                await _reject(send, 429, "Trop de requêtes : réessayez plus tard.", math.ceil(wait))
+                return
+
+        controller = admission
+        if controller is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await controller.acquire()
+        except Rejected as e:
+            ADMISSION_REJECTED.inc((e.reason,))
+            logger.warning(
+                "%s %s → 503 shed (%s: %s in flight, %s queued)",
+                scope["method"], scope["path"], e.reason, controller.in_flight, controller.queued
+            )
+            await _reject(
+                send, 503, "Service saturé : réessayez dans quelques instants.",
+                settings.ADMISSION_RETRY_AFTER_SECONDS
+            )
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release()
+
+
+async def _reject(send, status: int, detail: str, retry_after: int) -> None:
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(retry_after, 1)).encode()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+
+# ─────────────────────────────────────────────
+# METRICS
+# ─────────────────────────────────────────────
+
+ADMISSION_IN_FLIGHT = metrics.Gauge(
+    metrics.registry, "admission_in_flight", "API requests holding an admission slot.",
+    function=lambda: {(): admission.in_flight} if admission is not None else {}
+)
+ADMISSION_QUEUE_DEPTH = metrics.Gauge(
+    metrics.registry, "admission_queue_depth", "API requests waiting for an admission slot.",
+    function=lambda: {(): admission.queued} if admission is not None else {}
+)
+ADMISSION_QUEUE_WAIT = metrics.Histogram(
+    metrics.registry, "admission_queue_wait_seconds", "Time queued before admission or rejection.",
+    buckets=QUEUE_WAIT_BUCKETS
+)
+ADMISSION_REJECTED = metrics.Counter(
+    metrics.registry, "admission_rejected_total",
+    "API requests refused by load shedding, by reason (queue_full, timeout, rate_limited).", ("reason",)
+)
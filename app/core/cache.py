@@ -0,0 +1,255 @@
+"""
+Read-through cache for serialized incident payloads.
+
+Backends:
+- MemoryCache: in-process LRU bounded in size, entries expire after a TTL.
+  Each worker process has its own copy, so cross-process staleness is bounded
+  by the TTL.
+- RedisCache: shared between workers, invalidations are seen by all of them.
+  Any client exposing redis-py's get / set(ex=) / delete / incr / eval /
+  scan_iter works. Its calls block, and IncidentService runs on the event loop
+  under DATABASE_ASYNC (AsyncSession.run_sync), so the two are not combined.
+
+Read-through fills are guarded by a write generation, bumped before every
+invalidation: a reader that loaded a row before a concurrent write committed
+and invalidated would otherwise put that stale payload back until the TTL.
+The reader takes the generation before reading the database, and the fill is
+skipped if it has moved since.
+
+IncidentCache wraps a backend with per-incident keys and hit/miss counters.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Protocol
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[bytes]: ...
+    def set(self, key: str, value: bytes) -> None: ...
+    def generation(self) -> int: ...
+    def set_if_generation(self, key: str, value: bytes, generation: int) -> bool: ...
+    def delete(self, key: str) -> None: ...
+    def delete_many(self, keys: List[str]) -> None: ...
+    def clear(self) -> None: ...
+
+
+class MemoryCache:
+    """Thread-safe LRU cache with a size bound and a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._put(key, value)
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def set_if_generation(self, key: str, value: bytes, generation: int) -> bool:
+        with self._lock:
+            if self._generation != generation:
+                return False
+            self._put(key, value)
+            return True
+
+    def _put(self, key: str, value: bytes) -> None:
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def delete_many(self, keys: List[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """
+    Shared cache backend on top of a redis-py compatible client. The write
+    generation is a counter key, compared and set atomically by a script.
+    """
+
+    # KEYS[1] entry, KEYS[2] generation; ARGV value, ttl, expected generation
+    SET_IF_GENERATION = (
+        "if (tonumber(redis.call('GET', KEYS[2])) or 0) ~= tonumber(ARGV[3]) then return 0 end "
+        "redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2]) return 1"
+    )
+
+    def __init__(self, client, ttl_seconds: int, prefix: str = "followup:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.generation_key = prefix + "generation"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, ex=self.ttl_seconds)
+
+    def generation(self) -> int:
+        return int(self.client.get(self.generation_key) or 0)
+
+    def set_if_generation(self, key: str, value: bytes, generation: int) -> bool:
+        return bool(self.client.eval(
+            self.SET_IF_GENERATION, 2, self.prefix + key, self.generation_key, value, self.ttl_seconds, generation
+        ))
+
+    # The generation moves before the keys go: a fill checked after the INCR is
+    # refused, one applied before it is removed by the DEL
+
+    def delete(self, key: str) -> None:
+        self.client.incr(self.generation_key)
+        self.client.delete(self.prefix + key)
+
+    def delete_many(self, keys: List[str]) -> None:
+        self.client.incr(self.generation_key)
+        # One DEL per chunk of keys rather than one round trip per key
+        for start in range(0, len(keys), 1000):
+            self.client.delete(*(self.prefix + key for key in keys[start:start + 1000]))
+
+    def clear(self) -> None:
+        self.client.incr(self.generation_key)
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            if key not in (self.generation_key, self.generation_key.encode()):
+                self.client.delete(key)
+
+
+class NullCache:
+    """Backend used when caching is disabled."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        pass
+
+    def generation(self) -> int:
+        return 0
+
+    def set_if_generation(self, key: str, value: bytes, generation: int) -> bool:
+        return False
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def delete_many(self, keys: List[str]) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class IncidentCache:
+    """Serialized IncidentResponse payloads keyed by incident id."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(incident_id: int) -> str:
+        return f"incident:{incident_id}"
+
+    def get(self, incident_id: int) -> Optional[bytes]:
+        payload = self.backend.get(self._key(incident_id))
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    def generation(self) -> int:
+        """Write generation, to take before reading the database for a later put."""
+        return self.backend.generation()
+
+    def put(self, incident_id: int, payload: bytes, generation: Optional[int] = None) -> bool:
+        """
+        Store a payload. With `generation`, only if no invalidation happened
+        since it was taken; returns whether the payload was stored.
+        """
+        if generation is None:
+            self.backend.set(self._key(incident_id), payload)
+            return True
+        return self.backend.set_if_generation(self._key(incident_id), payload, generation)
+
+    def invalidate(self, incident_id: int) -> None:
+        self.backend.delete(self._key(incident_id))
+
+    def invalidate_many(self, incident_ids: Iterable[int]) -> None:
+        keys = [self._key(incident_id) for incident_id in incident_ids]
+        if keys:
+            self.backend.delete_many(keys)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def build_backend() -> CacheBackend:
+    """Create the backend selected by CACHE_BACKEND (memory, redis or none)."""
+    if settings.CACHE_BACKEND == "none":
+        return NullCache()
+    if settings.CACHE_BACKEND == "redis":
+        if settings.DATABASE_ASYNC:
+            # IncidentService runs on the event loop thread there: each Redis round trip would stall it
+            raise RuntimeError("CACHE_BACKEND=redis is not supported with DATABASE_ASYNC (use memory or none).")
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package.") from e
+        return RedisCache(redis.Redis.from_url(settings.REDIS_URL), ttl_seconds=settings.CACHE_TTL_SECONDS)
+    return MemoryCache(max_entries=settings.CACHE_MAX_ENTRIES, ttl_seconds=settings.CACHE_TTL_SECONDS)
+
+
+incident_cache = IncidentCache(build_backend())
@@ -0,0 +1,101 @@
+"""
+HTTP validators and conditional requests (RFC 9110 §13).
+
+Resources expose a strong ETag derived from their version metadata (ids,
+version counters, row counts) and a Last-Modified date, so both sides of a
+comparison can be computed from a metadata-only query without loading or
+serializing the rows:
+- GET with If-None-Match (or If-Modified-Since) → 304 when unchanged.
+- PUT with If-Match → 412 when the resource changed since it was read.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+# Private: the representations carry patient data and must be revalidated on each use
+CACHE_CONTROL = "private, no-cache"
+
+
+class PreconditionFailedError(Exception):
+    """If-Match did not match the current version of the resource."""
+
+
+class VersionConflictError(Exception):
+    """The resource changed between read and write (expected version outdated, or concurrent write)."""
+
+
+def strong_etag(*parts: object) -> str:
+    """Quoted strong entity tag built from the version parts of a representation."""
+    digest = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def http_date(value: datetime) -> str:
+    """IMF-fixdate of a naive UTC datetime (as stored by the models)."""
+    return format_datetime(value.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True)
+
+
+def _entity_tags(header: str) -> list:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = False) -> bool:
+    """
+    True if `etag` is listed in an If-Match / If-None-Match header value.
+    If-None-Match uses the weak comparison (W/ prefix ignored), If-Match the strong one.
+    """
+    if not header:
+        return False
+    for tag in _entity_tags(header):
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            if weak and tag[2:] == etag:
+                return True
+        elif tag == etag:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when the former is absent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag, weak=True)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+    return False
+
+
+def has_conditions(request: Request) -> bool:
+    """True if the request carries a cache validator to check."""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+    """Add ETag, Last-Modified and Cache-Control to a response."""
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Empty 304 response carrying the same validators as the 200 would."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
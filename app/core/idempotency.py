@@ -0,0 +1,288 @@
+"""
+Idempotency-Key support for the creation endpoints (POST incident, POST suivi).
+
+A client retrying a POST sends the same Idempotency-Key header. The first
+request claims the key and runs; its 2xx response is kept in a key → response
+store for IDEMPOTENCY_TTL_SECONDS. A retry is answered from the store, before
+any route code or database session is involved, with Idempotent-Replayed: true.
+
+- Concurrent retries: only the request that claimed the key runs; the others
+  wait (up to IDEMPOTENCY_WAIT_SECONDS) for its response, then 409 + Retry-After.
+- Same key, different body: 422.
+- Non-2xx responses are not kept: the claim is released and a retry runs again.
+
+Stores: MemoryIdempotencyStore (per process) or RedisIdempotencyStore (shared,
+claims with SET NX), following CACHE_BACKEND. The middleware runs the calls of
+a `blocking` store (network round trips) in the threadpool, off the event loop.
+Records are compact byte strings: state, body fingerprint, then status,
+content type and body for a response.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Protocol, Tuple
+
+import anyio
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+# POST routes where a retry must not create a second row
+IDEMPOTENT_PATHS = (re.compile(r"^/api/incidents/?$"), re.compile(r"^/api/incidents/\d+/suivis/?$"))
+_VALID_KEY = re.compile(r"^[\x21-\x7e]{1,255}$")
+_POLL_SECONDS = 0.05
+
+PENDING, DONE = b"P", b"D"
+
+
+class IdempotencyStore(Protocol):
+    blocking: bool
+
+    def claim(self, key: str, value: bytes, ttl_seconds: int) -> bool: ...
+    def get(self, key: str) -> Optional[bytes]: ...
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None: ...
+    def delete(self, key: str) -> None: ...
+
+
+class MemoryIdempotencyStore:
+    """Thread-safe in-process store, bounded in size, entries expire after their TTL."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def claim(self, key: str, value: bytes, ttl_seconds: int) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._put(key, value, ttl_seconds)
+            return True
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        with self._lock:
+            self._put(key, value, ttl_seconds)
+
+    def _put(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisIdempotencyStore:
+    """Store shared between workers on a redis-py compatible client; claims are SET NX."""
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "followup:idempotency:"):
+        self.client = client
+        self.prefix = prefix
+
+    def claim(self, key: str, value: bytes, ttl_seconds: int) -> bool:
+        return bool(self.client.set(self.prefix + key, value, ex=ttl_seconds, nx=True))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+def build_store() -> IdempotencyStore:
+    """Redis when CACHE_BACKEND=redis, in-process memory otherwise."""
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package.") from e
+        return RedisIdempotencyStore(redis.Redis.from_url(settings.REDIS_URL))
+    return MemoryIdempotencyStore(max_entries=settings.IDEMPOTENCY_MAX_ENTRIES)
+
+
+idempotency_store = build_store()
+
+
+# ─────────────────────────────────────────────
+# RECORDS
+# ─────────────────────────────────────────────
+
+def pending_record(fingerprint: bytes) -> bytes:
+    return PENDING + b"|" + fingerprint
+
+
+def response_record(fingerprint: bytes, status: int, content_type: bytes, body: bytes) -> bytes:
+    return b"|".join((DONE, fingerprint, str(status).encode(), content_type, body))
+
+
+def parse_record(record: bytes) -> Tuple[bytes, bytes, Optional[Tuple[int, bytes, bytes]]]:
+    """(state, fingerprint, (status, content type, body) or None while pending)."""
+    if record.startswith(PENDING):
+        state, fingerprint = record.split(b"|", 1)
+        return state, fingerprint, None
+    state, fingerprint, status, content_type, body = record.split(b"|", 4)
+    return state, fingerprint, (int(status), content_type, body)
+
+
+# ─────────────────────────────────────────────
+# MIDDLEWARE
+# ─────────────────────────────────────────────
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware applying Idempotency-Key to the POST routes of IDEMPOTENT_PATHS."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        key = _idempotency_key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not _VALID_KEY.match(key):
+            await _respond(send, 400, {"detail": "Idempotency-Key invalide (1 à 255 caractères ASCII visibles)."})
+            return
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()[:32].encode()
+        store_key = f"{scope['path'].rstrip('/')}|{key}"
+        store = idempotency_store
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        pending = pending_record(fingerprint)
+        while not await _call(store, store.claim, store_key, pending, settings.IDEMPOTENCY_LOCK_SECONDS):
+            record = await _call(store, store.get, store_key)
+            if record is None:
+                continue  # released or expired in between: claim again
+            _, stored_fingerprint, response = parse_record(record)
+            if stored_fingerprint != fingerprint:
+                logger.warning("Idempotency-Key %s reused with a different body on %s", key, scope["path"])
+                await _respond(send, 422, {"detail": "Idempotency-Key déjà utilisée pour une autre requête."})
+                return
+            if response is not None:
+                logger.info("Idempotency-Key %s → replayed %s response", key, response[0])
+                await _replay(send, *response)
+                return
+            if time.monotonic() > deadline:
+                await _respond(
+                    send, 409, {"detail": "Une requête avec cette Idempotency-Key est en cours."},
+                    extra_headers=[(b"retry-after", b"1")]
+                )
+                return
+            await asyncio.sleep(_POLL_SECONDS)
+
+        await self._run(scope, body, send, store, store_key, fingerprint)
+
+    async def _run(self, scope, body: bytes, send, store: IdempotencyStore, store_key: str, fingerprint: bytes):
+        """Run the request that claimed the key; keep its response if 2xx, release the claim otherwise."""
+        sent = False
+        status, content_type, chunks = 0, b"", []
+
+        async def receive_body():
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send_wrapper(message):
+            nonlocal status, content_type
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_wrapper)
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await _call(store, store.delete, store_key)
+            raise
+        if 200 <= status < 300:
+            await _call(
+                store, store.set, store_key, response_record(fingerprint, status, content_type, b"".join(chunks)),
+                settings.IDEMPOTENCY_TTL_SECONDS
+            )
+        else:
+            await _call(store, store.delete, store_key)
+
+
+async def _call(store: IdempotencyStore, method: Callable[..., Any], *args: Any) -> Any:
+    """Call a store method, in the threadpool when the store blocks on network I/O."""
+    if store.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+def _idempotency_key(scope) -> Optional[str]:
+    if scope["type"] != "http" or scope["method"] != "POST":
+        return None
+    if not any(path.match(scope["path"]) for path in IDEMPOTENT_PATHS):
+        return None
+    for name, value in scope["headers"]:
+        if name == HEADER:
+            return value.decode("latin-1")
+    return None
+
+
+async def _read_body(receive) -> bytes:
+    chunks, more_body = [], True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def _replay(send, status: int, content_type: bytes, body: bytes) -> None:
+    headers = [(b"content-length", str(len(body)).encode()), REPLAYED_HEADER]
+    if content_type:
+        headers.append((b"content-type", content_type))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _respond(send, status: int, content: dict, extra_headers=()) -> None:
+    body = json.dumps(content, ensure_ascii=False).encode("utf-8")
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *extra_headers]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
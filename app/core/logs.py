@@ -0,0 +1,182 @@
+"""
+Non-blocking structured logging.
+
+configure_logging() routes every record through a LazyQueueHandler on the
+root logger: the calling thread only merges the %-style arguments into the
+message and enqueues the record; a QueueListener thread formats it (JSON or
+text) and writes it to stdout.
+
+Before a record is enqueued:
+- RequestIdFilter stamps it with the request id of the current context
+  (RequestIdMiddleware: X-Request-ID header, or a generated id).
+- SamplingFilter keeps only a fraction of the DEBUG / INFO records of the
+  loggers listed in LOG_SAMPLING (longest logger-name prefix wins).
+  WARNING and above are never sampled.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Mapping, Optional, Tuple
+
+# Client-supplied ids are echoed in logs and headers: keep them short and printable
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(request_id)s | %(message)s"
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds `request_id` to each record ("-" outside a request)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the DEBUG / INFO records per logger, given as {logger prefix: rate}."""
+
+    def __init__(self, rates: Mapping[str, float], rng: Optional[random.Random] = None):
+        super().__init__()
+        self.rates = dict(rates)
+        self.random = (rng or random.Random()).random
+        self._resolved: Dict[str, float] = {}
+
+    def rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            matches = [p for p in self.rates if name == p or name.startswith(p + ".")]
+            rate = self._resolved[name] = self.rates[max(matches, key=len)] if matches else 1.0
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1.0 or self.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, request_id, message (and exc)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler doing the least work on the calling thread: it merges the
+    %-style arguments (they may be mutated after the call) and enqueues the
+    record itself; level name, timestamp, JSON and traceback formatting are
+    left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def build_formatter(fmt: str) -> logging.Formatter:
+    if fmt == "json":
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def build_pipeline(
+    stream, fmt: str = "json", sampling: Optional[Mapping[str, float]] = None
+) -> Tuple[logging.handlers.QueueHandler, logging.handlers.QueueListener]:
+    """QueueHandler (request id, sampling) feeding a QueueListener that writes to `stream`. Not started."""
+    output = logging.StreamHandler(stream)
+    output.setFormatter(build_formatter(fmt))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    if sampling:
+        handler.addFilter(SamplingFilter(sampling))
+    return handler, logging.handlers.QueueListener(log_queue, output)
+
+
+def configure_logging(
+    level: int = logging.INFO, fmt: str = "json", sampling: Optional[Mapping[str, float]] = None
+) -> None:
+    """Install the queue pipeline on the root logger (replacing its handlers), writing to stdout."""
+    global _listener
+    stop_logging()
+    # Record attributes no formatter here uses, skipped when the record is created
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+    handler, _listener = build_pipeline(sys.stdout, fmt, sampling)
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush the queue and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware binding a request id to the context of each HTTP request:
+    the client's X-Request-ID when valid, a new one otherwise. Echoed in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                value = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(value):
+                    request_id = value
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
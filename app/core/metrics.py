@@ -0,0 +1,335 @@
+"""
+In-process metrics, exposed at /metrics in the Prometheus text format (0.0.4).
+
+- MetricsMiddleware: per-route request counts by status code, latency
+  histograms and in-flight requests. Routes are labelled by their path
+  template (/api/incidents/{id}), so the number of series stays bounded.
+- TimedQueuePool / TimedAsyncQueuePool: connection pools that record the time
+  spent obtaining a connection; checked-out / overflow gauges are read from
+  the pools when scraped.
+
+Recording is lock-free: each thread updates its own shard of plain dicts
+(the event loop thread for requests, the threadpool threads for the pool)
+and a scrape sums the shards. When a thread exits (AnyIO recycles idle
+worker threads), its shard is folded into a single "retired" shard, so the
+number of shards follows the live threads. Each worker process has its own registry.
+"""
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.routing import Match
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds — request latency, and connection checkout (usually well under a millisecond)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _merge(into: dict, shard: dict) -> None:
+    """Add the values of `shard` to `into` (histograms are lists of per-bucket counts plus the sum)."""
+    for key, value in dict(shard).items():
+        if isinstance(value, list):
+            total = into.setdefault(key, [0] * len(value))
+            for i, v in enumerate(value):
+                total[i] += v
+        else:
+            into[key] = into.get(key, 0) + value
+
+
+class _ShardOwner:
+    """Thread-local sentinel: collected when its thread exits, which retires the thread's shard."""
+    __slots__ = ("__weakref__",)
+
+
+class Registry:
+    """Metric families plus one shard of values per live recording thread, and one for exited threads."""
+
+    def __init__(self):
+        self.families: List["_Family"] = []
+        self._local = threading.local()
+        self._shards: Dict[int, dict] = {}
+        self._retired: dict = {}
+        self._lock = threading.Lock()
+
+    def shard(self) -> dict:
+        """Values recorded by the current thread, keyed by (family, label values)."""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            self._local.owner = owner = _ShardOwner()
+            with self._lock:
+                self._shards[id(values)] = values
+            weakref.finalize(owner, self._retire, values)
+            return values
+
+    def _retire(self, values: dict) -> None:
+        """Fold the shard of an exited thread into the retired shard."""
+        with self._lock:
+            if self._shards.pop(id(values), None) is not None:
+                _merge(self._retired, values)
+
+    def collect(self) -> Dict[tuple, object]:
+        """Sum of all shards (histograms are lists of per-bucket counts plus the sum)."""
+        merged = {}
+        with self._lock:
+            shards = list(self._shards.values())
+            _merge(merged, self._retired)
+        for shard in shards:
+            _merge(merged, shard)
+        return merged
+
+    def reset(self) -> None:
+        """Forget all recorded values (tests)."""
+        with self._lock:
+            for shard in self._shards.values():
+                shard.clear()
+            self._retired.clear()
+
+    def render(self) -> str:
+        values = self.collect()
+        lines = []
+        for family in self.families:
+            lines.extend(family.render(values))
+        return "\n".join(lines) + "\n"
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, registry: Registry, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        registry.families.append(self)
+
+    def samples(self, values: dict) -> List[tuple]:
+        return sorted((labels, value) for (family, labels), value in values.items() if family is self)
+
+    def render(self, values: dict) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.samples(values):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        values = self.registry.shard()
+        key = (self, labels)
+        values[key] = values.get(key, 0) + amount
+
+
+class Gauge(_Family):
+    """Gauge moved up and down by the threads (in-flight), or read from `function` when scraped."""
+    kind = "gauge"
+
+    def __init__(self, *args, function: Optional[Callable[[], Dict[tuple, float]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.function = function
+
+    inc = Counter.inc
+
+    def dec(self, labels: tuple = ()) -> None:
+        self.inc(labels, -1)
+
+    def samples(self, values: dict) -> List[tuple]:
+        if self.function is not None:
+            return sorted(self.function().items())
+        return super().samples(values)
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = buckets
+
+    def observe(self, labels: tuple, value: float) -> None:
+        values = self.registry.shard()
+        key = (self, labels)
+        series = values.get(key)
+        if series is None:
+            # One count per bucket (the last one is +Inf), then the sum
+            series = values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, values: dict) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, series in self.samples(values):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# ─────────────────────────────────────────────
+# CONNECTION POOLS
+# ─────────────────────────────────────────────
+
+# Live pools by label — pool.recreate() (engine.dispose) replaces the entry
+_pools: Dict[str, "weakref.ref"] = {}
+
+
+class _TimedPool:
+    metrics_label = ""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _pools[self.metrics_label] = weakref.ref(self)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe((self.metrics_label,), time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    """QueuePool recording connection checkout time (queue wait, plus connect when it grows)."""
+    metrics_label = "sync"
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool recording connection checkout time."""
+    metrics_label = "async"
+
+
+class TimedReadQueuePool(TimedQueuePool):
+    """TimedQueuePool of the read replica engine."""
+    metrics_label = "sync_read"
+
+
+class TimedAsyncReadQueuePool(TimedAsyncQueuePool):
+    """TimedAsyncQueuePool of the read replica engine."""
+    metrics_label = "async_read"
+
+
+def _pool_gauge(read: Callable) -> Callable[[], Dict[tuple, float]]:
+    def function():
+        pools = ((label, ref()) for label, ref in list(_pools.items()))
+        return {(label,): read(pool) for label, pool in pools if pool is not None}
+    return function
+
+
+# ─────────────────────────────────────────────
+# METRICS
+# ─────────────────────────────────────────────
+
+registry = Registry()
+
+HTTP_REQUESTS = Counter(
+    registry, "http_requests_total", "Requests handled, by route template, method and status code.",
+    ("route", "method", "status")
+)
+HTTP_LATENCY = Histogram(
+    registry, "http_request_duration_seconds", "Time to send the complete response, by route template and method.",
+    ("route", "method"), buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    registry, "http_requests_in_flight", "Requests being handled, by route template and method.", ("route", "method")
+)
+DB_POOL_SIZE = Gauge(
+    registry, "db_pool_size", "Connections kept open by the pool.", ("pool",),
+    function=_pool_gauge(lambda pool: pool.size())
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    registry, "db_pool_checked_out", "Connections currently checked out of the pool.", ("pool",),
+    function=_pool_gauge(lambda pool: pool.checkedout())
+)
+DB_POOL_OVERFLOW = Gauge(
+    registry, "db_pool_overflow", "Connections open beyond pool_size (max_overflow).", ("pool",),
+    function=_pool_gauge(lambda pool: max(pool.overflow(), 0))
+)
+DB_POOL_WAIT = Histogram(
+    registry, "db_pool_wait_seconds", "Time to obtain a connection from the pool.", ("pool",),
+    buckets=POOL_WAIT_BUCKETS
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording HTTP_* metrics for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+        in_flight = (_route_template(scope), method)
+        HTTP_IN_FLIGHT.inc(in_flight)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Set by the router on the shared scope once a route matched
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            HTTP_IN_FLIGHT.dec(in_flight)
+            HTTP_REQUESTS.inc((path, method, str(status_code)))
+            HTTP_LATENCY.observe((path, method), elapsed)
+
+
+def _route_template(scope) -> str:
+    """
+    Path template of the route that will handle the request. The router sets
+    scope["route"] only once it runs, so the in-flight gauge matches the
+    routes itself, as Starlette does (a full match, else a partial one).
+    """
+    app = scope.get("app")
+    if app is None:
+        return UNMATCHED_ROUTE
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return route.path
+        if match is Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
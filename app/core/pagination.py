@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token encoding the sort key of the last row
+of a page. The next page is fetched with a `WHERE (k1, k2, ...) < (v1, v2, ...)`
+predicate instead of an OFFSET, so every page costs the same index range scan
+no matter how deep the client pages.
+"""
+
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, Callable, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _deserialize(value: Any, kind: type) -> Any:
+    if kind is datetime:
+        return datetime.fromisoformat(value)
+    if kind is date:
+        return date.fromisoformat(value)
+    if kind is time:
+        return time.fromisoformat(value)
+    return kind(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key values of a row into an opaque cursor token."""
+    raw = json.dumps([_serialize(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, types: Sequence[type]) -> Tuple[Any, ...]:
+    """
+    Decode a cursor token back into typed sort-key values.
+    Raises InvalidCursorError if the token is malformed or does not match `types`.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong arity")
+        return tuple(_deserialize(v, t) for v, t in zip(values, types))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Curseur de pagination invalide.") from e
+
+
+def keyset_predicate(columns: Sequence[Any], values: Sequence[Any], descending: bool):
+    """
+    Build the row-value comparison `(c1, c2, ...) < (v1, v2, ...)` (or `>` when
+    ascending) in its expanded OR/AND form, which every dialect can turn into
+    an index range scan.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def next_cursor(items: Sequence[Any], limit: Optional[int], key: Callable[[Any], Sequence[Any]]) -> Optional[str]:
+    """Return the cursor for the page after `items`, or None if this was the last page."""
+    if not limit or len(items) < limit:
+        return None
+    return encode_cursor(key(items[-1]))
+
+
+class SortKey(NamedTuple):
+    """
+    A keyset sort order: the ORDER BY columns (ending with a unique one), the
+    Python types of their values for cursor decoding, and the direction.
+    """
+    columns: Tuple[Any, ...]
+    types: Tuple[type, ...]
+    descending: bool
+
+    def order_by(self) -> list:
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+    def predicate(self, cursor: str):
+        """Keyset predicate for the rows after `cursor`. Raises InvalidCursorError."""
+        return keyset_predicate(self.columns, decode_cursor(cursor, self.types), self.descending)
+
+    def values(self, row: Any) -> Tuple[Any, ...]:
+        """Sort-key values of a mapped row, as encoded in its cursor."""
+        return tuple(getattr(row, column.key) for column in self.columns)
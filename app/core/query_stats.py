@@ -0,0 +1,150 @@
+"""
+Per-request SQL statement statistics, slow-query log and N+1 detection.
+
+`instrument(engine)` hooks before/after_cursor_execute on an engine. Each
+statement is timed; statements slower than SLOW_QUERY_MS are logged with
+their normalized SQL. While a request is being handled (QueryStatsMiddleware)
+its statements are also added to a QueryStats held in a context variable,
+which the threadpool (run_in_threadpool) and AsyncSession greenlets inherit.
+
+At the end of the request the same normalized statement running
+N_PLUS_ONE_THRESHOLD times or more is reported as a probable N+1.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Statement shape: literals and placeholders become ?, IN lists (?), whitespace collapsed."""
+    shape = _STRING.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    __slots__ = ("count", "seconds", "slowest", "slowest_seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest: Optional[str] = None
+        self.slowest_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        # Bound statements repeat verbatim; normalized only when reported
+        self.statements[statement] += 1
+        if seconds >= self.slowest_seconds:
+            self.slowest, self.slowest_seconds = statement, seconds
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times, most frequent first."""
+        shapes = Counter()
+        for statement, n in self.statements.items():
+            shapes[normalize(statement)] += n
+        return [(shape, n) for shape, n in shapes.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current() -> Optional[QueryStats]:
+    """Statistics of the request being handled, if any."""
+    return _current.get()
+
+
+@contextmanager
+def track() -> Iterator[QueryStats]:
+    """Collect the statements executed in this context (and the threads / tasks it starts)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, normalize(statement))
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute: drop its start time,
+    # or it would stay on the pooled connection for the connection's lifetime.
+    # Statements run one at a time per connection: the list holds at most this one
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument(engine) -> None:
+    """Time every statement executed on `engine` (sync Engine, or AsyncEngine.sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware giving each HTTP request its QueryStats and reporting it when done."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if stats.count:
+                    _report(scope, stats)
+
+
+def _report(scope, stats: QueryStats) -> None:
+    route = getattr(scope.get("route"), "path", scope["path"])
+    request = f"{scope['method']} {route}"
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "%s → %s queries, %.1f ms in DB, slowest %.1f ms: %s",
+            request, stats.count, stats.seconds * 1000, stats.slowest_seconds * 1000, normalize(stats.slowest)
+        )
+    if stats.count < settings.N_PLUS_ONE_THRESHOLD:
+        return
+    for shape, n in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+        logger.warning("Probable N+1 on %s: %s × %s", request, n, shape)
@@ -0,0 +1,164 @@
+"""
+Read replica routing — read-your-writes and lag reporting.
+
+GET routes read from the replica (app.database.get_read_db). A replica is
+behind the primary by its replication lag, so a client that just wrote could
+read its own write back stale: ReadYourWritesMiddleware answers every
+successful write with a cookie holding the time until which that client reads
+from the primary (DATABASE_READ_STICKY_SECONDS). The cookie travels with the
+client, so the pinning holds whichever instance serves the next request.
+
+On MySQL the lag is the replica's own Seconds_Behind_Source (SHOW REPLICA
+STATUS). Elsewhere, or without the REPLICATION CLIENT privilege, it is
+estimated from the data: the age of the oldest incident write on the primary
+that the replica has not applied yet, 0 when caught up (an idle pair reads 0,
+not the time since the last write). /ready caches the result for
+DATABASE_READ_LAG_CACHE_SECONDS so that frequent probes cost no extra queries.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_COOKIE = "followup_primary_until"
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# SHOW SLAVE STATUS / Seconds_Behind_Master before MySQL 8.0.22
+REPLICA_STATUS_QUERIES = (
+    ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+    ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+)
+
+# (monotonic expiry, status) of the last replica_status computed with a replica
+_cached_status: Optional[Tuple[float, Dict[str, object]]] = None
+
+
+def pinned_to_primary(request: HTTPConnection) -> bool:
+    """Whether the client wrote recently enough to read from the primary."""
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware setting the primary-pinning cookie on the response of
+    each successful write (non-GET request answered below 400). Inactive
+    without DATABASE_READ_URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in READ_METHODS or not settings.DATABASE_READ_URL:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.DATABASE_READ_STICKY_SECONDS
+                cookie = (
+                    f"{PRIMARY_COOKIE}={time.time() + window:.3f}; Max-Age={max(int(window), 1)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class ReplicationStopped(Exception):
+    """The replica reports no lag because its replication threads are not running."""
+
+
+def _reported_lag(replica: Session) -> Optional[float]:
+    """
+    Seconds_Behind_Source of a MySQL replica. None when the server has no
+    replication channel or the statement is not allowed (estimate instead).
+    """
+    for statement, column in REPLICA_STATUS_QUERIES:
+        try:
+            row = replica.execute(text(statement)).mappings().first()
+        except DBAPIError as e:
+            logger.debug("%s failed: %s", statement, e.orig)
+            replica.rollback()
+            continue
+        if row is None:
+            return None
+        if row[column] is None:
+            raise ReplicationStopped()
+        return float(row[column])
+    return None
+
+
+def _estimated_lag(primary: Session, replica: Session, now: datetime) -> float:
+    """Age of the oldest incident write on the primary that the replica has not applied (0 when caught up)."""
+    from app.models.incident import Incident  # app.database imports this module
+
+    # One seek per `deleted` value on ix_incidents_actif_modification (deleted, dateModification, id)
+    def latest(session: Session) -> Optional[datetime]:
+        values = [
+            session.execute(select(func.max(Incident.dateModification)).where(Incident.deleted == deleted)).scalar()
+            for deleted in (0, 1)
+        ]
+        return max((v for v in values if v is not None), default=None)
+
+    on_replica = latest(replica)
+    unapplied = [
+        primary.execute(select(func.min(Incident.dateModification)).where(
+            Incident.deleted == deleted,
+            *([Incident.dateModification > on_replica] if on_replica is not None else [])
+        )).scalar()
+        for deleted in (0, 1)
+    ]
+    oldest = min((v for v in unapplied if v is not None), default=None)
+    if oldest is None:
+        return 0.0
+    return max((now - oldest).total_seconds(), 0.0)
+
+
+def replica_lag(primary: Session, replica: Session, now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Seconds the replica is behind the primary (0 when caught up); None when
+    its replication is stopped. `now` (naive UTC) defaults to the current time.
+    """
+    if replica.get_bind().dialect.name == "mysql":
+        try:
+            reported = _reported_lag(replica)
+        except ReplicationStopped:
+            return None
+        if reported is not None:
+            return reported
+    return _estimated_lag(primary, replica, now or datetime.utcnow())
+
+
+def replica_status(primary: Session, replica: Optional[Session]) -> Dict[str, object]:
+    """
+    Readiness summary of the replica: status (ok / lagging / unreachable) and
+    lag in seconds, recomputed at most once per DATABASE_READ_LAG_CACHE_SECONDS.
+    """
+    global _cached_status
+    if replica is None:
+        return {"configured": False}
+    if _cached_status is not None and _cached_status[0] > time.monotonic():
+        return _cached_status[1]
+    try:
+        lag = replica_lag(primary, replica)
+    except Exception as e:
+        status = {"configured": True, "status": "unreachable", "lag_seconds": None, "error": type(e).__name__}
+    else:
+        lagging = lag is None or lag > settings.DATABASE_READ_MAX_LAG_SECONDS
+        status = {"configured": True, "status": "lagging" if lagging else "ok", "lag_seconds": lag}
+    _cached_status = (time.monotonic() + settings.DATABASE_READ_LAG_CACHE_SECONDS, status)
+    return status
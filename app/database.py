@@ -4,23 +4,111 @@ Manages SQLAlchemy engine, session, and base model.
 """
 
 import logging
+from datetime import datetime
+from typing import Union
+from fastapi import Depends, Request
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
 from app.core.config import settings
+from app.core.metrics import TimedAsyncQueuePool, TimedAsyncReadQueuePool, TimedQueuePool, TimedReadQueuePool
+from app.core.query_stats import instrument
+from app.core.replica import pinned_to_primary
 
 logger = logging.getLogger(__name__)
 
 # Create engine with connection pool settings
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=TimedQueuePool, # QueuePool exposing checkout time at /metrics
     pool_pre_ping=True,       # Verify connections before use
     pool_recycle=3600,        # Recycle connections every hour
-    pool_size=10,             # Max connections in pool
-    max_overflow=20,          # Extra connections allowed beyond pool_size
+    pool_size=settings.DB_POOL_SIZE,        # Max connections in pool
+    max_overflow=settings.DB_MAX_OVERFLOW,  # Extra connections allowed beyond pool_size
     echo=settings.DEBUG,      # Log SQL queries in debug mode
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument(engine)
+
+# Objects stay loaded after commit: writes return them without a SELECT to
+# reload them (all column defaults are computed client-side at INSERT / UPDATE)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Read replica engine — only created when DATABASE_READ_URL is set; GET routes
+# fall back to the primary session otherwise (see get_read_db)
+read_engine = None
+ReadSessionLocal = None
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(
+        settings.DATABASE_READ_URL,
+        poolclass=TimedReadQueuePool,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        echo=settings.DEBUG,
+    )
+    instrument(read_engine)
+    # info["replica"] tells the services the data may lag (IncidentService.get_payload)
+    ReadSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine, info={"replica": True}
+    )
+
+# Sync drivers and their asyncio counterparts
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Return `url` with its driver swapped for the asyncio one (e.g. pymysql → aiomysql)."""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+# Async engine — only created when DATABASE_ASYNC is enabled, so the async
+# driver stays an optional dependency.
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+        poolclass=TimedAsyncQueuePool,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        echo=settings.DEBUG,
+    )
+    instrument(async_engine.sync_engine)
+    # Objects stay readable after commit: serialization happens outside the greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async_read_engine = None
+AsyncReadSessionLocal = None
+if settings.DATABASE_ASYNC and settings.DATABASE_READ_URL:
+    async_read_engine = create_async_engine(
+        async_database_url(settings.DATABASE_READ_URL),
+        poolclass=TimedAsyncReadQueuePool,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        echo=settings.DEBUG,
+    )
+    instrument(async_read_engine.sync_engine)
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine, autoflush=False, expire_on_commit=False, info={"replica": True}
+    )
+
+# Either session flavour — services accept both (see AsyncIncidentService)
+DbSession = Union[Session, AsyncSession]
 
 
 class Base(DeclarativeBase):
@@ -28,6 +116,14 @@ class Base(DeclarativeBase):
     pass
 
 
+def utcnow() -> datetime:
+    """
+    Current naive UTC time, whole seconds: what MySQL DATETIME columns store.
+    Timestamps returned right after a write then equal the ones read back later.
+    """
+    return datetime.utcnow().replace(microsecond=0)
+
+
 def get_db():
     """
     Dependency injection for database sessions.
@@ -37,8 +133,62 @@ def get_db():
     try:
         yield db
     except Exception as e:
-        logger.error(f"Database session error: {e}")
+        logger.error("Database session error: %s", e)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    Async variant of get_db, yielding an AsyncSession.
+    Ensures the session is always closed after the request.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error("Database session error: %s", e)
+            await db.rollback()
+            raise
+
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)):
+    """
+    Read-only variant of get_db for the GET routes: a replica session when
+    DATABASE_READ_URL is set and the client has not written in the last
+    DATABASE_READ_STICKY_SECONDS, the primary session otherwise.
+    The primary Session is lazy: it opens no connection unless used.
+    """
+    if ReadSessionLocal is None or pinned_to_primary(request):
+        yield primary
+        return
+    db = ReadSessionLocal()
+    try:
+        yield db
+    except Exception as e:
+        logger.error("Read replica session error: %s", e)
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_read_db(request: Request, primary: AsyncSession = Depends(get_async_db)):
+    """Async variant of get_read_db."""
+    if AsyncReadSessionLocal is None or pinned_to_primary(request):
+        yield primary
+        return
+    async with AsyncReadSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error("Read replica session error: %s", e)
+            await db.rollback()
+            raise
+
+
+# Session dependencies used by the routers, selected by DATABASE_ASYNC
+get_session = get_async_db if settings.DATABASE_ASYNC else get_db
+get_read_session = get_async_read_db if settings.DATABASE_ASYNC else get_read_db
@@ -6,21 +6,33 @@ Version: 1.0.0
 
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
 
-from app.routers import incidents, suivis, patients
+from app.routers import incidents, suivis, patients, search, stats
 from app.core.config import settings
-from app.database import engine, Base
+from app.core.cache import incident_cache
+from app.core import metrics
+from app.core.admission import AdmissionMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.logs import RequestIdMiddleware, configure_logging
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.replica import ReadYourWritesMiddleware, replica_status
+from app.database import engine, async_engine, AsyncSessionLocal, SessionLocal, Base
+from app import database
+from app.services.async_incident_service import AsyncIncidentService
 
 # ─────────────────────────────────────────────
 # Logging configuration
 # ─────────────────────────────────────────────
-logging.basicConfig(
+# Records are queued on the request thread and written by a listener thread
+configure_logging(
     level=logging.DEBUG if settings.DEBUG else logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
+    fmt=settings.LOG_FORMAT,
+    sampling=settings.LOG_SAMPLING,
 )
 logger = logging.getLogger(__name__)
 
@@ -34,11 +46,30 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 FollowUp API starting up...")
 
     # Import ALL models before create_all so SQLAlchemy knows all tables
-    from app.models import incident, suivi_incident, patient, medecin
+    from app.models import incident, suivi_incident, patient, medecin, incident_stat, incident_search, incident_archive
 
-    Base.metadata.create_all(bind=engine)
+    if async_engine is not None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    else:
+        Base.metadata.create_all(bind=engine)
     logger.info("✅ Database tables verified.")
+
+    if settings.CACHE_WARMUP and settings.CACHE_BACKEND != "none":
+        try:
+            if AsyncSessionLocal is not None:
+                async with AsyncSessionLocal() as db:
+                    await AsyncIncidentService.warm_cache(db, settings.CACHE_MAX_ENTRIES)
+            else:
+                with SessionLocal() as db:
+                    await AsyncIncidentService.warm_cache(db, settings.CACHE_MAX_ENTRIES)
+        except Exception as e:
+            logger.warning("⚠️ Cache warm-up skipped: %s", e)
     yield
+    if async_engine is not None:
+        await async_engine.dispose()
+    if database.async_read_engine is not None:
+        await database.async_read_engine.dispose()
     logger.info("🛑 FollowUp API shutting down.")
 
 
@@ -67,7 +98,39 @@ app = FastAPI(
 )
 
 # ─────────────────────────────────────────────
-# CORS Middleware
+# Idempotency-Key on creations: retries replayed from the store, not re-run
+# ─────────────────────────────────────────────
+app.add_middleware(IdempotencyMiddleware)
+
+# ─────────────────────────────────────────────
+# Read-your-writes: clients that wrote read from the primary for a few seconds
+# ─────────────────────────────────────────────
+app.add_middleware(ReadYourWritesMiddleware)
+
+# ─────────────────────────────────────────────
+# SQL statement statistics per request (slow queries, N+1)
+# ─────────────────────────────────────────────
+app.add_middleware(QueryStatsMiddleware)
+
+# ─────────────────────────────────────────────
+# Admission control: /api requests beyond the DB pool capacity queue briefly,
+# then are shed with 503 (and optionally rate-limited per client with 429)
+# ─────────────────────────────────────────────
+app.add_middleware(AdmissionMiddleware)
+
+# ─────────────────────────────────────────────
+# Request id (log correlation), bound before any log line of the request
+# ─────────────────────────────────────────────
+app.add_middleware(RequestIdMiddleware)
+
+# ─────────────────────────────────────────────
+# Metrics Middleware (times the whole request, from just inside CORS)
+# ─────────────────────────────────────────────
+app.add_middleware(metrics.MetricsMiddleware)
+
+# ─────────────────────────────────────────────
+# CORS Middleware (added last, so outermost: the responses the middlewares
+# above answer themselves — replays, 409, 422, 429, 503 — carry CORS headers)
 # ─────────────────────────────────────────────
 app.add_middleware(
     CORSMiddleware,
@@ -75,6 +138,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "X-Request-ID", "Idempotent-Replayed", "Retry-After"],
 )
 
 # ─────────────────────────────────────────────
@@ -82,7 +146,7 @@ app.add_middleware(
 # ─────────────────────────────────────────────
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception on {request.method} {request.url}: {exc}", exc_info=True)
+    logger.error("Unhandled exception on %s %s: %s", request.method, request.url, exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={"detail": "Une erreur interne est survenue. Veuillez contacter l'administrateur."}
@@ -94,6 +158,8 @@ async def global_exception_handler(request: Request, exc: Exception):
 app.include_router(incidents.router)
 app.include_router(suivis.router)
 app.include_router(patients.router)
+app.include_router(stats.router)
+app.include_router(search.router)
 
 # ─────────────────────────────────────────────
 # Utility endpoints
@@ -104,5 +170,30 @@ def health_check():
     return {
         "status": "ok",
         "service": settings.APP_NAME,
-        "version": settings.APP_VERSION
-    }
\ No newline at end of file
+        "version": settings.APP_VERSION,
+        "cache": incident_cache.stats()
+    }
+
+
+@app.get("/ready", tags=["Health"], summary="Disponibilité des bases de données")
+def readiness_check(primary: Session = Depends(database.get_db)):
+    """
+    Vérifie la base principale (503 si injoignable) et rapporte le retard du
+    réplica de lecture (`status` ok / lagging / unreachable, `lag_seconds`).
+    """
+    try:
+        primary.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.error("Readiness: primary database unreachable: %s", e)
+        return JSONResponse(status_code=503, content={"status": "unavailable", "database": "unreachable"})
+
+    if database.ReadSessionLocal is None:
+        return {"status": "ready", "database": "ok", "replica": replica_status(primary, None)}
+    with database.ReadSessionLocal() as replica:
+        return {"status": "ready", "database": "ok", "replica": replica_status(primary, replica)}
+
+
+@app.get("/metrics", tags=["Health"], summary="Métriques Prometheus", include_in_schema=False)
+def prometheus_metrics():
+    """Compteurs par route, histogrammes de latence et état du pool de connexions (format texte Prometheus)."""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
\ No newline at end of file
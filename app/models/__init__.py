@@ -0,0 +1,8 @@
+# Import every model so string-based relationships resolve whichever one is used first
+from app.models.incident import Incident  # noqa: F401
+from app.models.incident_archive import IncidentArchive, SuiviIncidentArchive  # noqa: F401
+from app.models.incident_search import incident_search  # noqa: F401
+from app.models.incident_stat import IncidentStat  # noqa: F401
+from app.models.medecin import Medecin  # noqa: F401
+from app.models.patient import Patient  # noqa: F401
+from app.models.suivi_incident import SuiviIncident  # noqa: F401
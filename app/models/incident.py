@@ -1,7 +1,9 @@
 import enum
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Enum, SmallInteger
-from app.database import Base
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Enum, SmallInteger, Index
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import relationship
+from app.database import Base, utcnow
+from app.models.incident_search import SEARCH_COLLATION
 
 
 class GraviteEnum(str, enum.Enum):
@@ -20,12 +22,40 @@ class StatutEnum(str, enum.Enum):
 
 class Incident(Base):
     __tablename__ = "incidents"
+    __table_args__ = (
+        # IncidentService.get_by_patient: WHERE idPatient, deleted ORDER BY dateIncident, heureIncident
+        Index("ix_incidents_patient_actif", "idPatient", "deleted", "dateIncident", "heureIncident"),
+        # IncidentService.get_all: WHERE deleted ORDER BY dateCreation, id
+        Index("ix_incidents_actif_creation", "deleted", "dateCreation", "id"),
+        # get_all sorted by dateIncident / filtered on a dateIncident range
+        Index("ix_incidents_actif_date", "deleted", "dateIncident", "heureIncident", "id"),
+        # get_all sorted by dateModification, cache warm-up
+        Index("ix_incidents_actif_modification", "deleted", "dateModification", "id"),
+        # get_all triage filters: statut, gravite, dateIncident range
+        Index("ix_incidents_triage", "deleted", "statut", "gravite", "dateIncident"),
+        # get_all filtered on a medecin / implant / processeur: one index per sort order
+        # (dateCreation, dateIncident, dateModification), so the page is read in order
+        *(
+            Index(f"ix_incidents_{name}_{suffix}", column, "deleted", *sort_columns)
+            for name, column in (("medecin", "idMedecin"), ("implant", "idImplant"), ("processeur", "idProcesseur"))
+            for suffix, sort_columns in (
+                ("creation", ("dateCreation", "id")),
+                ("date", ("dateIncident", "heureIncident", "id")),
+                ("modification", ("dateModification", "id")),
+            )
+        ),
+        # SearchService (MySQL); SQLite uses the incident_search FTS5 table
+        Index("ft_incidents_description", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     dateIncident = Column(Date, nullable=False)
     heureIncident = Column(Time, nullable=False)
     gravite = Column(Enum(GraviteEnum), nullable=False)
-    description = Column(String(2000), nullable=False)
+    description = Column(
+        String(2000).with_variant(mysql.VARCHAR(2000, charset="utf8mb4", collation=SEARCH_COLLATION), "mysql"),
+        nullable=False
+    )
     statut = Column(Enum(StatutEnum), default=StatutEnum.OUVERT, nullable=False)
 
     idPatient = Column(Integer, nullable=False)
@@ -33,6 +63,23 @@ class Incident(Base):
     idProcesseur = Column(Integer, nullable=True)
     idMedecin = Column(Integer, nullable=True)
 
-    dateCreation = Column(DateTime, default=datetime.utcnow, nullable=False)
-    dateModification = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
-    deleted = Column(SmallInteger, default=0, nullable=False)
\ No newline at end of file
+    dateCreation = Column(DateTime, default=utcnow, nullable=False)
+    dateModification = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
+    deleted = Column(SmallInteger, default=0, nullable=False)
+    # Optimistic concurrency: every ORM UPDATE is "WHERE id = ? AND version = ?"
+    # and bumps it; a concurrent write makes the flush raise StaleDataError
+    version = Column(Integer, default=1, nullable=False)
+
+    __mapper_args__ = {"version_id_col": version}
+
+    # The schema has no foreign keys: joins are declared on the id columns.
+    # Read-only — writes keep going through the id columns above.
+    patient = relationship(
+        "Patient", primaryjoin="foreign(Incident.idPatient) == Patient.id",
+        back_populates="incidents", viewonly=True
+    )
+    medecin = relationship("Medecin", primaryjoin="foreign(Incident.idMedecin) == Medecin.id", viewonly=True)
+    suivis = relationship(
+        "SuiviIncident", primaryjoin="Incident.id == foreign(SuiviIncident.idIncident)",
+        order_by="(SuiviIncident.dateSuivi, SuiviIncident.id)", back_populates="incident", viewonly=True
+    )
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, DateTime, Index, Table
+from sqlalchemy.orm import relationship
+from app.database import Base
+from app.models.incident import Incident
+from app.models.suivi_incident import SuiviIncident
+
+
+def _archive_table(source: Table, name: str, *indexes: Index) -> Table:
+    """Same columns as `source` (ids kept as they were, no defaults), plus dateArchivage."""
+    columns = [
+        Column(c.name, c.type.copy(), primary_key=c.primary_key, nullable=c.nullable, autoincrement=False)
+        for c in source.columns
+    ]
+    return Table(name, Base.metadata, *columns, Column("dateArchivage", DateTime, nullable=False), *indexes)
+
+
+class IncidentArchive(Base):
+    """Incidents moved out of `incidents` by ArchiveService (soft-deleted, or closed long ago)."""
+    __table__ = _archive_table(
+        Incident.__table__, "incidents_archive",
+        Index("ix_incidents_archive_patient", "idPatient", "dateIncident"),
+    )
+
+    patient = relationship("Patient", primaryjoin="foreign(IncidentArchive.idPatient) == Patient.id", viewonly=True)
+    medecin = relationship("Medecin", primaryjoin="foreign(IncidentArchive.idMedecin) == Medecin.id", viewonly=True)
+    suivis = relationship(
+        "SuiviIncidentArchive", primaryjoin="IncidentArchive.id == foreign(SuiviIncidentArchive.idIncident)",
+        order_by="(SuiviIncidentArchive.dateSuivi, SuiviIncidentArchive.id)", viewonly=True
+    )
+
+
+class SuiviIncidentArchive(Base):
+    """Suivis of the archived incidents."""
+    __table__ = _archive_table(
+        SuiviIncident.__table__, "suivis_incidents_archive",
+        Index("ix_suivis_archive_incident_date", "idIncident", "dateSuivi"),
+    )
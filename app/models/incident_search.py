@@ -0,0 +1,32 @@
+"""
+Full-text index over Incident.description and SuiviIncident.actionsPrises.
+
+- MySQL: FULLTEXT indexes declared on the two tables (see their models); InnoDB
+  keeps them in sync and the columns' accent/case-insensitive collation
+  (SEARCH_COLLATION, whatever the database default) folds French text.
+- SQLite: an FTS5 table, created with the metadata and fed by SearchService.
+  Rowids are 2*id for incidents and 2*id+1 for suivis so both share one table.
+"""
+
+from sqlalchemy import DDL, column, event, table
+from app.database import Base
+
+INCIDENT_SEARCH_TABLE = "incident_search"
+# MySQL collation of the FULLTEXT-indexed columns: accent- and case-insensitive (ai_ci)
+SEARCH_COLLATION = "utf8mb4_0900_ai_ci"
+
+incident_search = table(
+    INCIDENT_SEARCH_TABLE,
+    column("rowid"), column("body"), column("kind"), column("ref_id"), column("incident_id"),
+)
+
+CREATE_INCIDENT_SEARCH = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {INCIDENT_SEARCH_TABLE} USING fts5("
+    "body, kind UNINDEXED, ref_id UNINDEXED, incident_id UNINDEXED, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+event.listen(Base.metadata, "after_create", DDL(CREATE_INCIDENT_SEARCH).execute_if(dialect="sqlite"))
+event.listen(
+    Base.metadata, "before_drop", DDL(f"DROP TABLE IF EXISTS {INCIDENT_SEARCH_TABLE}").execute_if(dialect="sqlite")
+)
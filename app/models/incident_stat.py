@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+
+class IncidentStat(Base):
+    """Number of active incidents per (dimension, bucket), maintained by StatsService."""
+    __tablename__ = "incident_stats"
+
+    dimension = Column(String(20), primary_key=True)
+    bucket = Column(String(32), primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Patient(Base):
@@ -13,4 +14,9 @@ class Patient(Base):
     telephone = Column(String(20), nullable=True)
     email = Column(String(150), nullable=True)
     dateImplantation = Column(Date, nullable=True)
-    idImplant = Column(Integer, nullable=True)
\ No newline at end of file
+    idImplant = Column(Integer, nullable=True)
+
+    incidents = relationship(
+        "Incident", primaryjoin="Patient.id == foreign(Incident.idPatient)",
+        back_populates="patient", viewonly=True
+    )
@@ -1,16 +1,32 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, Date, DateTime, Text
-from app.database import Base
+from sqlalchemy import Column, Integer, Date, DateTime, Text, Index
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import relationship
+from app.database import Base, utcnow
+from app.models.incident_search import SEARCH_COLLATION
 
 
 class SuiviIncident(Base):
     __tablename__ = "suivis_incidents"
+    __table_args__ = (
+        # IncidentService.get_suivis: WHERE idIncident ORDER BY dateSuivi, id
+        Index("ix_suivis_incident_date", "idIncident", "dateSuivi"),
+        # SearchService (MySQL); SQLite uses the incident_search FTS5 table
+        Index("ft_suivis_actions", "actionsPrises", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     dateSuivi = Column(Date, nullable=False)
-    actionsPrises = Column(Text, nullable=False)
+    actionsPrises = Column(
+        Text().with_variant(mysql.TEXT(charset="utf8mb4", collation=SEARCH_COLLATION), "mysql"), nullable=False
+    )
 
     idIncident = Column(Integer, nullable=False)
     idMedecin = Column(Integer, nullable=True)
 
-    dateCreation = Column(DateTime, default=datetime.utcnow, nullable=False)
\ No newline at end of file
+    dateCreation = Column(DateTime, default=utcnow, nullable=False)
+
+    incident = relationship(
+        "Incident", primaryjoin="foreign(SuiviIncident.idIncident) == Incident.id",
+        back_populates="suivis", viewonly=True
+    )
+    medecin = relationship("Medecin", primaryjoin="foreign(SuiviIncident.idMedecin) == Medecin.id", viewonly=True)
@@ -5,12 +5,25 @@ Endpoints conform to TP06 specifications and IEC 62304 Class B requirements.
 """
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import date
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Set
 
-from app.database import get_db
-from app.schemas.incident import IncidentCreate, IncidentUpdate, IncidentResponse
+from app.core.conditional import (
+    PreconditionFailedError, VersionConflictError, has_conditions, is_not_modified, not_modified, set_validators
+)
+from app.core.config import settings
+from app.core.pagination import InvalidCursorError, next_cursor
+from app.database import DbSession, get_read_session, get_session
+from app.models.incident import GraviteEnum, StatutEnum
+from app.schemas.incident import (
+    INCIDENT_FIELDS, ExportFormat, IncidentBulkCreate, IncidentBulkResult, IncidentCreate, IncidentDetailResponse,
+    IncidentFilter, IncidentInclude, IncidentSort, IncidentStatusResult, IncidentStatusUpdate, IncidentUpdate,
+    IncidentResponse, ListFormat
+)
+from app.services.export_service import MEDIA_TYPES, ExportService
+from app.services.async_incident_service import AsyncIncidentService
 from app.services.incident_service import IncidentService
 
 logger = logging.getLogger(__name__)
@@ -31,9 +44,17 @@ router = APIRouter(
     response_model=IncidentResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Créer un nouvel incident",
-    description="Déclare un nouvel incident lié à un implant cochléaire. Le patient doit exister."
+    description=(
+        "Déclare un nouvel incident lié à un implant cochléaire. Le patient doit exister. "
+        "Avec l'en-tête `Idempotency-Key`, une nouvelle tentative avec la même clé renvoie la réponse "
+        "de la première (en-tête `Idempotent-Replayed`) sans créer de doublon."
+    ),
+    responses={
+        409: {"description": "Une requête avec la même Idempotency-Key est encore en cours"},
+        422: {"description": "Idempotency-Key déjà utilisée pour une autre requête"},
+    }
 )
-def create_incident(data: IncidentCreate, db: Session = Depends(get_db)):
+async def create_incident(data: IncidentCreate, db: DbSession = Depends(get_session)):
     """
     Crée un incident cochléaire.
     - Vérifie l'existence du patient
@@ -41,62 +62,325 @@ def create_incident(data: IncidentCreate, db: Session = Depends(get_db)):
     - Statut initial: Ouvert
     """
     try:
-        incident = IncidentService.create(db, data)
-        logger.info(f"POST /api/incidents → created incident {incident.id}")
+        incident = await AsyncIncidentService.create(db, data)
+        logger.info("POST /api/incidents → created incident %s", incident.id)
         return incident
     except ValueError as e:
-        logger.warning(f"POST /api/incidents → validation error: {e}")
+        logger.warning("POST /api/incidents → validation error: %s", e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        logger.error(f"POST /api/incidents → unexpected error: {e}", exc_info=True)
+        logger.error("POST /api/incidents → unexpected error: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur interne du serveur.")
 
 
+@router.post(
+    "/bulk",
+    response_model=IncidentBulkResult,
+    summary="Créer des incidents en masse",
+    description=(
+        "Ingestion en une seule transaction de jusqu'à 10 000 incidents (fichiers de matériovigilance). "
+        "Les lignes qui violent une règle métier sont rejetées individuellement dans `errors`."
+    )
+)
+async def create_incidents_bulk(data: IncidentBulkCreate, db: DbSession = Depends(get_session)):
+    """
+    Crée un lot d'incidents.
+    - Vérifie patients et implants en une seule requête
+    - Insère toutes les lignes valides en un seul INSERT multi-lignes
+    """
+    try:
+        result = await AsyncIncidentService.create_many(db, data.items)
+    except Exception as e:
+        logger.error("POST /api/incidents/bulk → unexpected error: %s", e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur interne du serveur.")
+    logger.info("POST /api/incidents/bulk → created %s, rejected %s", result.created, len(result.errors))
+    return result
+
+
+@router.patch(
+    "/status",
+    response_model=IncidentStatusResult,
+    summary="Changer le statut d'incidents en masse",
+    description=(
+        "Applique un statut cible aux incidents listés dans `ids` ou retenus par `filter` (10 000 au plus), "
+        "en une seule requête UPDATE. Transitions autorisées : Ouvert → En cours, Résolu, Fermé ; "
+        "En cours → Résolu, Fermé ; Résolu → En cours, Fermé ; Fermé est définitif. "
+        "Les incidents supprimés ou inconnus sont signalés `not_found`, les transitions interdites "
+        "`forbidden_transition`, sans empêcher les autres."
+    )
+)
+async def update_incidents_status(data: IncidentStatusUpdate, db: DbSession = Depends(get_session)):
+    """
+    Transition de statut groupée (fin de revue : clôture des incidents résolus).
+    - Un SELECT verrouillant les statuts courants, un UPDATE ensembliste
+    - Résultat par incident, dans l'ordre de la demande
+    """
+    try:
+        result = await AsyncIncidentService.transition_many(db, data.statut, ids=data.ids, filters=data.filter)
+    except ValueError as e:
+        logger.warning("PATCH /api/incidents/status → %s", e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    logger.info("PATCH /api/incidents/status → %s updated to %s", result.updated, result.statut.value)
+    return result
+
+
+def incident_filters(
+    date_from: Optional[date] = Query(None, description="dateIncident ≥ date_from (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, description="dateIncident ≤ date_to (YYYY-MM-DD)"),
+    gravite: Optional[List[GraviteEnum]] = Query(None, description="Gravité(s) retenue(s), répétable"),
+    statut: Optional[List[StatutEnum]] = Query(None, description="Statut(s) retenu(s), répétable"),
+    idMedecin: Optional[int] = Query(None, gt=0, description="Médecin référent"),
+    idImplant: Optional[int] = Query(None, gt=0, description="Implant concerné"),
+    idProcesseur: Optional[int] = Query(None, gt=0, description="Processeur concerné"),
+) -> IncidentFilter:
+    """Query parameters shared by the list and export routes."""
+    return IncidentFilter(
+        date_from=date_from, date_to=date_to, gravite=gravite, statut=statut,
+        idMedecin=idMedecin, idImplant=idImplant, idProcesseur=idProcesseur
+    )
+
+
+def export_filters(
+    filters: IncidentFilter = Depends(incident_filters),
+    include_deleted: bool = Query(False, description="Inclure les incidents supprimés (soft delete)"),
+) -> IncidentFilter:
+    """Query parameters of the export routes."""
+    return filters.model_copy(update={"include_deleted": include_deleted})
+
+
+def fields_param(
+    fields: Optional[str] = Query(
+        None, description="Champs à renvoyer, séparés par des virgules : id,gravite,statut,dateIncident,idPatient…"
+    )
+) -> Set[str]:
+    """Parse the comma-separated `fields` query parameter."""
+    if not fields:
+        return set()
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(INCIDENT_FIELDS)
+    if unknown:
+        allowed = ", ".join(INCIDENT_FIELDS)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Champ(s) inconnu(s) dans fields : {', '.join(sorted(unknown))} (valeurs possibles : {allowed})."
+        )
+    return names
+
+
 @router.get(
     "/",
     response_model=List[IncidentResponse],
     summary="Lister tous les incidents",
-    description="Retourne tous les incidents actifs (non supprimés) avec pagination."
+    description=(
+        "Retourne les incidents actifs (non supprimés), du plus récent au plus ancien par défaut. "
+        "Filtres combinables : gravité et statut (répétables), période de survenue, médecin, implant, "
+        "processeur ; tri au choix parmi les valeurs de `sort`. "
+        "Pagination par curseur : passer la valeur de l'en-tête `X-Next-Cursor` dans `cursor` "
+        "(avec les mêmes filtres et le même tri) pour obtenir la page suivante. "
+        "`fields=id,gravite,statut` ne lit et ne renvoie que ces champs ; `format=columnar` renvoie "
+        "un objet avec un tableau par champ (`{\"id\": [...], \"gravite\": [...]}`) au lieu d'un tableau d'objets."
+    )
 )
-def list_incidents(
-    skip: int = Query(0, ge=0, description="Nombre d'enregistrements à sauter"),
+async def list_incidents(
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Nombre d'enregistrements à sauter (préférer `cursor`)"),
     limit: int = Query(100, ge=1, le=500, description="Nombre maximum de résultats"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Curseur opaque renvoyé dans `X-Next-Cursor`"),
+    with_total: bool = Query(False, description="Renvoie le nombre total d'incidents retenus dans `X-Total-Count`"),
+    sort: IncidentSort = Query(IncidentSort.DATE_CREATION_DESC, description="Ordre de tri (`-` = décroissant)"),
+    filters: IncidentFilter = Depends(incident_filters),
+    fields: Set[str] = Depends(fields_param),
+    format: ListFormat = Query(ListFormat.OBJECTS, description="Forme de la réponse : objects ou columnar"),
+    db: DbSession = Depends(get_read_session)
 ):
-    """Liste paginée de tous les incidents actifs."""
-    incidents = IncidentService.get_all(db, skip=skip, limit=limit)
-    logger.info(f"GET /api/incidents → returned {len(incidents)} incidents")
+    """Liste paginée (par curseur), filtrée et triée des incidents actifs."""
+    try:
+        incidents = await AsyncIncidentService.get_all(
+            db, skip=skip, limit=limit, cursor=cursor, filters=filters, sort=sort, fields=fields
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    cursor_token = next_cursor(incidents, limit, IncidentService.list_cursor(sort))
+    if cursor_token:
+        response.headers["X-Next-Cursor"] = cursor_token
+    if with_total:
+        response.headers["X-Total-Count"] = str(await AsyncIncidentService.count_all(db, filters))
+    logger.info("GET /api/incidents → returned %s incidents", len(incidents))
+    if fields or format is ListFormat.COLUMNAR:
+        return Response(
+            IncidentService.serialize_fields(incidents, fields or INCIDENT_FIELDS, format),
+            media_type="application/json", headers=response.headers
+        )
+    if settings.FAST_LIST_SERIALIZATION:
+        # Same body as response_model, encoded in one pass; keeps the headers set above
+        return Response(
+            IncidentService.serialize_list(incidents), media_type="application/json", headers=response.headers
+        )
     return incidents
 
 
+def _export_response(db: DbSession, statement, fmt: ExportFormat, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        ExportService.stream(db, statement, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt.value}"'},
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Exporter le registre des incidents",
+    description=(
+        "Export complet en flux (NDJSON ou CSV) pour les audits de matériovigilance ANSM, "
+        "incidents archivés compris. Les lignes sont lues par curseur serveur et envoyées au fil de l'eau : "
+        "la mémoire reste constante quel que soit le volume."
+    )
+)
+async def export_incidents(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Format de sortie : ndjson ou csv"),
+    filters: IncidentFilter = Depends(export_filters),
+    db: DbSession = Depends(get_read_session)
+):
+    """Export en flux des incidents filtrés."""
+    logger.info(
+        "GET /api/incidents/export → format=%s, filters=%s", format.value, filters.model_dump(exclude_none=True)
+    )
+    return _export_response(db, IncidentService.export_incidents_statement(filters), format, "incidents")
+
+
+@router.get(
+    "/export/suivis",
+    response_class=StreamingResponse,
+    summary="Exporter les suivis d'incidents",
+    description=(
+        "Export en flux (NDJSON ou CSV) des suivis dont l'incident correspond aux filtres, "
+        "suivis d'incidents archivés compris."
+    )
+)
+async def export_suivis(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Format de sortie : ndjson ou csv"),
+    filters: IncidentFilter = Depends(export_filters),
+    db: DbSession = Depends(get_read_session)
+):
+    """Export en flux des suivis des incidents filtrés."""
+    logger.info("GET /api/incidents/export/suivis → format=%s", format.value)
+    return _export_response(db, IncidentService.export_suivis_statement(filters), format, "suivis")
+
+
+def include_param(
+    include: Optional[str] = Query(
+        None, description="Ressources liées à inclure, séparées par des virgules : suivis, patient, medecin"
+    )
+) -> Set[IncidentInclude]:
+    """Parse the comma-separated `include` query parameter."""
+    if not include:
+        return set()
+    try:
+        return {IncidentInclude(name.strip()) for name in include.split(",") if name.strip()}
+    except ValueError:
+        allowed = ", ".join(i.value for i in IncidentInclude)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Valeur de include invalide : {include!r} (valeurs possibles : {allowed})."
+        )
+
+
+async def archived_or_404(db: DbSession, id: int, include: Set[IncidentInclude], include_archived: bool) -> Response:
+    """Incident absent des tables courantes : lu depuis l'archive si demandé, sinon 404."""
+    if include_archived:
+        archived = await AsyncIncidentService.get_archived(db, id, include)
+        if archived:
+            logger.info("GET /api/incidents/%s → served from archive", id)
+            return Response(content=IncidentService.serialize_detail(archived, include), media_type="application/json")
+    logger.warning("GET /api/incidents/%s → not found", id)
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Incident {id} non trouvé.")
+
+
 @router.get(
     "/{id}",
-    response_model=IncidentResponse,
+    response_model=IncidentDetailResponse,
     summary="Récupérer un incident par ID",
-    description="Retourne les détails d'un incident spécifique. Retourne 404 si non trouvé ou supprimé."
+    description=(
+        "Retourne les détails d'un incident spécifique. Retourne 404 si non trouvé ou supprimé. "
+        "La réponse porte `ETag` et `Last-Modified` : avec `If-None-Match`, renvoie 304 si l'incident "
+        "n'a pas changé. `include=suivis,patient,medecin` intègre les ressources liées dans la même "
+        "réponse (chargées en une ou deux requêtes SQL, sans validateurs de cache). "
+        "Avec `include_archived=true`, un incident déplacé dans l'archive (fermé depuis longtemps) "
+        "est lu depuis l'archive, sans validateurs de cache."
+    ),
+    responses={304: {"description": "Incident inchangé depuis la version connue du client"}}
 )
-def get_incident(id: int, db: Session = Depends(get_db)):
-    """Récupère un incident par son identifiant."""
-    incident = IncidentService.get_by_id(db, id)
-    if not incident:
-        logger.warning(f"GET /api/incidents/{id} → not found")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Incident {id} non trouvé.")
-    return incident
+async def get_incident(
+    id: int,
+    request: Request,
+    include: Set[IncidentInclude] = Depends(include_param),
+    include_archived: bool = Query(False, description="Chercher aussi dans les incidents archivés"),
+    db: DbSession = Depends(get_read_session)
+):
+    """Récupère un incident par son identifiant (servi depuis le cache si possible)."""
+    if include:
+        incident = await AsyncIncidentService.get_detail(db, id, include)
+        if not incident:
+            return await archived_or_404(db, id, include, include_archived)
+        return Response(content=IncidentService.serialize_detail(incident, include), media_type="application/json")
+
+    if has_conditions(request):
+        current = await AsyncIncidentService.incident_version(db, id)
+        if current is not None:
+            version, modified = current
+            etag = IncidentService.incident_etag(id, version)
+            if is_not_modified(request, etag, modified):
+                logger.info("GET /api/incidents/%s → 304 not modified", id)
+                return not_modified(etag, modified)
+
+    payload = await AsyncIncidentService.get_payload(db, id)
+    if payload is None:
+        return await archived_or_404(db, id, include, include_archived)
+    response = Response(content=payload, media_type="application/json")
+    version, modified = IncidentService.payload_version(payload)
+    set_validators(response, IncidentService.incident_etag(id, version), modified)
+    return response
 
 
 @router.put(
     "/{id}",
     response_model=IncidentResponse,
     summary="Mettre à jour un incident",
-    description="Met à jour les champs fournis d'un incident existant. Les champs non fournis sont conservés."
+    description=(
+        "Met à jour les champs fournis d'un incident existant. Les champs non fournis sont conservés. "
+        "Avec `If-Match` (ETag d'un GET précédent), la mise à jour est refusée (412) si l'incident "
+        "a été modifié entre-temps, y compris pendant la mise à jour. Sinon, avec `version` (champ `version` "
+        "d'un GET précédent), elle est refusée (409) si l'incident n'est plus à cette version ; sans, une "
+        "écriture concurrente est rejouée sur la version à jour, sans perte de mise à jour."
+    ),
+    responses={
+        409: {"description": "L'incident a changé depuis la version indiquée (écriture concurrente)"},
+        412: {"description": "L'incident a changé depuis la version indiquée dans If-Match"},
+    }
 )
-def update_incident(id: int, data: IncidentUpdate, db: Session = Depends(get_db)):
+async def update_incident(
+    id: int,
+    data: IncidentUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag de la version modifiée par le client"),
+    db: DbSession = Depends(get_session)
+):
     """Mise à jour partielle d'un incident."""
-    incident = IncidentService.update(db, id, data)
+    try:
+        incident = await AsyncIncidentService.update(db, id, data, if_match=if_match)
+    except PreconditionFailedError as e:
+        logger.warning("PUT /api/incidents/%s → precondition failed", id)
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    except VersionConflictError as e:
+        logger.warning("PUT /api/incidents/%s → version conflict", id)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     if not incident:
-        logger.warning(f"PUT /api/incidents/{id} → not found")
+        logger.warning("PUT /api/incidents/%s → not found", id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Incident {id} non trouvé.")
-    logger.info(f"PUT /api/incidents/{id} → updated")
+    set_validators(response, IncidentService.incident_etag(incident.id, incident.version), incident.dateModification)
+    logger.info("PUT /api/incidents/%s → updated", id)
     return incident
 
 
@@ -106,10 +390,14 @@ def update_incident(id: int, data: IncidentUpdate, db: Session = Depends(get_db)
     summary="Supprimer un incident (soft delete)",
     description="Marque l'incident comme supprimé (deleted=1) et passe son statut à Fermé. Les données sont conservées."
 )
-def delete_incident(id: int, db: Session = Depends(get_db)):
+async def delete_incident(id: int, db: DbSession = Depends(get_session)):
     """Soft-delete d'un incident — les données sont conservées en base."""
-    success = IncidentService.soft_delete(db, id)
+    try:
+        success = await AsyncIncidentService.soft_delete(db, id)
+    except VersionConflictError as e:
+        logger.warning("DELETE /api/incidents/%s → version conflict", id)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     if not success:
-        logger.warning(f"DELETE /api/incidents/{id} → not found")
+        logger.warning("DELETE /api/incidents/%s → not found", id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Incident {id} non trouvé.")
-    logger.info(f"DELETE /api/incidents/{id} → soft-deleted")
\ No newline at end of file
+    logger.info("DELETE /api/incidents/%s → soft-deleted", id)
\ No newline at end of file
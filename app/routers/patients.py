@@ -4,12 +4,15 @@ Handles patient-related queries, including their incident history.
 """
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
 
-from app.database import get_db
+from app.core.conditional import is_not_modified, not_modified, set_validators, strong_etag
+from app.core.config import settings
+from app.core.pagination import InvalidCursorError, next_cursor
+from app.database import DbSession, get_read_session
 from app.schemas.incident import IncidentResponse
+from app.services.async_incident_service import AsyncIncidentService
 from app.services.incident_service import IncidentService
 
 logger = logging.getLogger(__name__)
@@ -27,20 +30,53 @@ router = APIRouter(
     "/{id}/incidents",
     response_model=List[IncidentResponse],
     summary="Incidents d'un patient",
-    description="Retourne tous les incidents actifs d'un patient, ordonnés du plus récent au plus ancien."
+    description=(
+        "Retourne les incidents actifs d'un patient, ordonnés du plus récent au plus ancien. "
+        "Pagination par curseur via `cursor` et l'en-tête `X-Next-Cursor`. "
+        "Avec `If-None-Match`, renvoie 304 si aucun incident du patient n'a changé."
+    ),
+    responses={304: {"description": "Liste inchangée depuis la version connue du client"}}
 )
-def get_patient_incidents(id: int, db: Session = Depends(get_db)):
+async def get_patient_incidents(
+    id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500, description="Nombre maximum de résultats"),
+    cursor: Optional[str] = Query(None, description="Curseur opaque renvoyé dans `X-Next-Cursor`"),
+    with_total: bool = Query(False, description="Renvoie le nombre total d'incidents dans `X-Total-Count`"),
+    db: DbSession = Depends(get_read_session)
+):
     """
     Récupère l'historique des incidents d'un patient.
-    Vérifie d'abord que le patient existe.
+    Vérifie d'abord que le patient existe et si la version connue du client est à jour.
     """
-    from app.models.patient import Patient
-
-    patient = db.query(Patient).filter(Patient.id == id).first()
-    if not patient:
-        logger.warning(f"GET /api/patients/{id}/incidents → patient not found")
+    version = await AsyncIncidentService.patient_incidents_version(db, id)
+    if version is None:
+        logger.warning("GET /api/patients/%s/incidents → patient not found", id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Patient {id} non trouvé.")
 
-    incidents = IncidentService.get_by_patient(db, id)
-    logger.info(f"GET /api/patients/{id}/incidents → returned {len(incidents)} incidents")
+    # The page parameters select a different representation of the same version
+    count, rows, last_id, versions, modified = version
+    etag = strong_etag("patient-incidents", id, rows, last_id, versions, request.url.query)
+    if is_not_modified(request, etag, modified):
+        logger.info("GET /api/patients/%s/incidents → 304 not modified", id)
+        return not_modified(etag, modified)
+    set_validators(response, etag, modified)
+
+    try:
+        incidents = await AsyncIncidentService.get_by_patient(db, id, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    cursor_token = next_cursor(incidents, limit, IncidentService.patient_incidents_cursor)
+    if cursor_token:
+        response.headers["X-Next-Cursor"] = cursor_token
+    if with_total:
+        response.headers["X-Total-Count"] = str(count)
+    logger.info("GET /api/patients/%s/incidents → returned %s incidents", id, len(incidents))
+    if settings.FAST_LIST_SERIALIZATION:
+        # Same body as response_model, encoded in one pass; keeps the headers set above
+        return Response(
+            IncidentService.serialize_list(incidents), media_type="application/json", headers=response.headers
+        )
     return incidents
\ No newline at end of file
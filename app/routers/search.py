@@ -0,0 +1,47 @@
+"""
+Router: Recherche
+Full-text search across incident descriptions and follow-up actions.
+"""
+
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List
+
+from app.database import DbSession, get_read_session
+from app.schemas.search import SearchHit
+from app.services.async_incident_service import run_db
+from app.services.search_service import SearchService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/search",
+    tags=["Recherche"],
+    responses={
+        400: {"description": "Requête de recherche invalide"},
+    }
+)
+
+
+@router.get(
+    "",
+    response_model=List[SearchHit],
+    summary="Recherche plein texte",
+    description=(
+        "Recherche dans les descriptions d'incidents et les actions de suivi (index plein texte). "
+        "Tous les mots doivent figurer (début de mot, sans tenir compte des accents ni de la casse) ; "
+        "les mots de moins de 3 caractères sont ignorés. Résultats triés par pertinence, avec extrait surligné."
+    )
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Texte recherché, ex. « perte de son »"),
+    limit: int = Query(20, ge=1, le=100, description="Nombre maximum de résultats"),
+    db: DbSession = Depends(get_read_session)
+):
+    """Recherche plein texte sur les incidents actifs et leurs suivis."""
+    try:
+        hits = await run_db(db, SearchService.search, q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    logger.info("GET /api/search → %s hits", len(hits))
+    return hits
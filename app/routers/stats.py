@@ -0,0 +1,35 @@
+"""
+Router: Statistiques
+Incident counts for the management dashboard, served from the summary table.
+"""
+
+import logging
+from fastapi import APIRouter, Depends
+
+from app.database import DbSession, get_read_session
+from app.schemas.stats import IncidentStatsResponse
+from app.services.async_incident_service import run_db
+from app.services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/stats",
+    tags=["Statistiques"],
+)
+
+
+@router.get(
+    "/incidents",
+    response_model=IncidentStatsResponse,
+    summary="Statistiques des incidents",
+    description=(
+        "Nombre d'incidents actifs par gravité, statut, mois de survenue, implant et processeur. "
+        "Les compteurs sont tenus à jour à chaque écriture : la lecture ne parcourt pas la table des incidents."
+    )
+)
+async def get_incident_stats(db: DbSession = Depends(get_read_session)):
+    """Compteurs d'incidents pour le tableau de bord."""
+    stats = await run_db(db, StatsService.get)
+    logger.info("GET /api/stats/incidents → total=%s", stats.total)
+    return stats
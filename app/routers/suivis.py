@@ -4,12 +4,14 @@ Handles follow-up actions on cochlear implant incidents.
 """
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
 
-from app.database import get_db
+from app.core.conditional import VersionConflictError, is_not_modified, not_modified, set_validators, strong_etag
+from app.core.pagination import InvalidCursorError, next_cursor
+from app.database import DbSession, get_read_session, get_session
 from app.schemas.suivi_incident import SuiviCreate, SuiviResponse
+from app.services.async_incident_service import AsyncIncidentService
 from app.services.incident_service import IncidentService
 
 logger = logging.getLogger(__name__)
@@ -31,16 +33,27 @@ router = APIRouter(
     summary="Ajouter un suivi à un incident",
     description=(
         "Ajoute une action de suivi à un incident existant. "
-        "Si l'incident est en statut Ouvert, il passe automatiquement à EnCours."
-    )
+        "Si l'incident est en statut Ouvert, il passe automatiquement à EnCours. "
+        "Avec `versionIncident` (champ `version` de l'incident lu), le suivi est refusé (409) "
+        "si l'incident n'est plus à cette version. Avec l'en-tête `Idempotency-Key`, une nouvelle "
+        "tentative avec la même clé renvoie la réponse de la première sans créer de doublon."
+    ),
+    responses={
+        409: {"description": "Incident modifié depuis la version indiquée, ou même Idempotency-Key en cours"},
+        422: {"description": "Idempotency-Key déjà utilisée pour une autre requête"},
+    }
 )
-def add_suivi(id: int, data: SuiviCreate, db: Session = Depends(get_db)):
+async def add_suivi(id: int, data: SuiviCreate, db: DbSession = Depends(get_session)):
     """Crée un suivi pour l'incident spécifié."""
-    suivi = IncidentService.add_suivi(db, id, data)
+    try:
+        suivi = await AsyncIncidentService.add_suivi(db, id, data)
+    except VersionConflictError as e:
+        logger.warning("POST /api/incidents/%s/suivis → version conflict", id)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     if not suivi:
-        logger.warning(f"POST /api/incidents/{id}/suivis → incident not found")
+        logger.warning("POST /api/incidents/%s/suivis → incident not found", id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Incident {id} non trouvé.")
-    logger.info(f"POST /api/incidents/{id}/suivis → created suivi {suivi.id}")
+    logger.info("POST /api/incidents/%s/suivis → created suivi %s", id, suivi.id)
     return suivi
 
 
@@ -48,16 +61,45 @@ def add_suivi(id: int, data: SuiviCreate, db: Session = Depends(get_db)):
     "/{id}/suivis",
     response_model=List[SuiviResponse],
     summary="Historique des suivis d'un incident",
-    description="Retourne tous les suivis d'un incident, ordonnés par date croissante."
+    description=(
+        "Retourne les suivis d'un incident, ordonnés par date croissante. "
+        "Pagination par curseur via `cursor` et l'en-tête `X-Next-Cursor`. "
+        "Avec `If-None-Match`, renvoie 304 si aucun suivi n'a été ajouté."
+    ),
+    responses={304: {"description": "Suivis inchangés depuis la version connue du client"}}
 )
-def get_suivis(id: int, db: Session = Depends(get_db)):
+async def get_suivis(
+    id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500, description="Nombre maximum de résultats"),
+    cursor: Optional[str] = Query(None, description="Curseur opaque renvoyé dans `X-Next-Cursor`"),
+    with_total: bool = Query(False, description="Renvoie le nombre total de suivis dans `X-Total-Count`"),
+    db: DbSession = Depends(get_read_session)
+):
     """Récupère l'historique complet des suivis pour un incident."""
-    # Verify the incident exists first
-    incident = IncidentService.get_by_id(db, id)
-    if not incident:
-        logger.warning(f"GET /api/incidents/{id}/suivis → incident not found")
+    # Verify the incident exists and read the suivis version in one query
+    version = await AsyncIncidentService.suivis_version(db, id)
+    if version is None:
+        logger.warning("GET /api/incidents/%s/suivis → incident not found", id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Incident {id} non trouvé.")
 
-    suivis = IncidentService.get_suivis(db, id)
-    logger.info(f"GET /api/incidents/{id}/suivis → returned {len(suivis)} suivis")
+    count, last_id, modified = version
+    etag = strong_etag("suivis", id, count, last_id, request.url.query)
+    if is_not_modified(request, etag, modified):
+        logger.info("GET /api/incidents/%s/suivis → 304 not modified", id)
+        return not_modified(etag, modified)
+    set_validators(response, etag, modified)
+
+    try:
+        suivis = await AsyncIncidentService.get_suivis(db, id, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    cursor_token = next_cursor(suivis, limit, IncidentService.suivis_cursor)
+    if cursor_token:
+        response.headers["X-Next-Cursor"] = cursor_token
+    if with_total:
+        response.headers["X-Total-Count"] = str(count)
+    logger.info("GET /api/incidents/%s/suivis → returned %s suivis", id, len(suivis))
     return suivis
\ No newline at end of file
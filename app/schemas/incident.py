@@ -2,10 +2,14 @@
 Pydantic schemas for Incident — request validation and response serialization.
 """
 
-from pydantic import BaseModel, Field, field_validator
+import enum
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import date, time, datetime
-from typing import Optional
+from typing import List, Optional
 from app.models.incident import GraviteEnum, StatutEnum
+from app.schemas.medecin import MedecinResponse
+from app.schemas.patient import PatientResponse
+from app.schemas.suivi_incident import SuiviResponse
 
 
 class IncidentCreate(BaseModel):
@@ -42,12 +46,20 @@ class IncidentCreate(BaseModel):
     }
 
 
+class IncidentBulkCreate(BaseModel):
+    """Schema for bulk ingestion of incidents (e.g. manufacturer vigilance files)."""
+    items: List[IncidentCreate] = Field(..., min_length=1, max_length=10000, description="Incidents à créer")
+
+
 class IncidentUpdate(BaseModel):
     """Schema for partial update of an incident (PATCH-style via PUT)."""
     gravite: Optional[GraviteEnum] = Field(None, description="Nouveau niveau de gravité")
     description: Optional[str] = Field(None, min_length=5, max_length=2000)
     statut: Optional[StatutEnum] = Field(None, description="Nouveau statut")
     idMedecin: Optional[int] = Field(None, gt=0)
+    version: Optional[int] = Field(
+        None, ge=1, description="Version lue par le client : 409 si l'incident a changé depuis"
+    )
 
     @field_validator("description")
     @classmethod
@@ -71,5 +83,109 @@ class IncidentResponse(BaseModel):
     idMedecin: Optional[int] = None
     dateCreation: Optional[datetime] = None
     dateModification: Optional[datetime] = None
+    version: int
+
+    model_config = {"from_attributes": True}
+
+
+class IncidentInclude(str, enum.Enum):
+    """Related resources that can be embedded in an incident detail (`include=`)."""
+    SUIVIS = "suivis"
+    PATIENT = "patient"
+    MEDECIN = "medecin"
+
+
+class IncidentDetailResponse(IncidentResponse):
+    """Incident with the related resources requested in `include`; the others are omitted."""
+    suivis: Optional[List[SuiviResponse]] = None
+    patient: Optional[PatientResponse] = None
+    medecin: Optional[MedecinResponse] = None
+
+
+class IncidentBulkError(BaseModel):
+    """Business-rule error for one row of a bulk ingestion."""
+    index: int = Field(..., description="Position de la ligne dans `items`")
+    detail: str
+
+
+class IncidentBulkResult(BaseModel):
+    """Outcome of a bulk ingestion."""
+    created: int = Field(..., description="Nombre d'incidents créés")
+    ids: Optional[List[int]] = Field(
+        None,
+        description="IDs créés, dans l'ordre des lignes valides (SQLite, PostgreSQL, MySQL ; null sur les autres SGBD)"
+    )
+    errors: List[IncidentBulkError] = Field(default_factory=list, description="Lignes rejetées")
+
+
+class IncidentFilter(BaseModel):
+    """Server-side filters on incidents (list and export)."""
+    date_from: Optional[date] = Field(None, description="dateIncident ≥ date_from")
+    date_to: Optional[date] = Field(None, description="dateIncident ≤ date_to")
+    gravite: Optional[List[GraviteEnum]] = Field(None, description="Gravités retenues")
+    statut: Optional[List[StatutEnum]] = Field(None, description="Statuts retenus")
+    idMedecin: Optional[int] = Field(None, description="Médecin référent")
+    idImplant: Optional[int] = Field(None, description="Implant concerné")
+    idProcesseur: Optional[int] = Field(None, description="Processeur concerné")
+    include_deleted: bool = Field(False, description="Inclure les incidents supprimés (soft delete)")
+
+
+class IncidentStatusUpdate(BaseModel):
+    """Status transition applied to many incidents, chosen by id or by filter."""
+    statut: StatutEnum = Field(..., description="Statut cible")
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000, description="Incidents visés")
+    filter: Optional[IncidentFilter] = Field(
+        None, description="Incidents visés par filtre, à la place de `ids` (10 000 au plus, jamais les supprimés)"
+    )
+
+    @model_validator(mode="after")
+    def ids_or_filter(self) -> "IncidentStatusUpdate":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Fournir soit `ids`, soit `filter`.")
+        return self
+
+
+class StatusChangeOutcome(str, enum.Enum):
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden_transition"
+
+
+class IncidentStatusChange(BaseModel):
+    """Outcome of a bulk status transition for one incident."""
+    id: int
+    outcome: StatusChangeOutcome
+    statut: Optional[StatutEnum] = Field(None, description="Statut après la requête (absent si introuvable)")
+
+
+class IncidentStatusResult(BaseModel):
+    """Outcome of a bulk status transition."""
+    statut: StatutEnum = Field(..., description="Statut cible")
+    updated: int = Field(..., description="Nombre d'incidents modifiés")
+    results: List[IncidentStatusChange] = Field(..., description="Résultat par incident, dans l'ordre de la demande")
+
+
+class IncidentSort(str, enum.Enum):
+    """Sort orders accepted by GET /api/incidents (`-` = descending), each backed by an index."""
+    DATE_CREATION_DESC = "-dateCreation"
+    DATE_CREATION = "dateCreation"
+    DATE_INCIDENT_DESC = "-dateIncident"
+    DATE_INCIDENT = "dateIncident"
+    DATE_MODIFICATION_DESC = "-dateModification"
+    DATE_MODIFICATION = "dateModification"
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ListFormat(str, enum.Enum):
+    """Body layout of GET /api/incidents: an array of objects, or one array per field."""
+    OBJECTS = "objects"
+    COLUMNAR = "columnar"
+
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+# Field names accepted by `fields=` on GET /api/incidents, in response order
+INCIDENT_FIELDS = tuple(IncidentResponse.model_fields)
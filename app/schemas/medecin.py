@@ -0,0 +1,18 @@
+"""
+Pydantic schemas for Medecin — embedded in incident details.
+"""
+
+from pydantic import BaseModel
+from typing import Optional
+
+
+class MedecinResponse(BaseModel):
+    """Schema for physician responses."""
+    id: int
+    nom: str
+    prenom: str
+    specialite: Optional[str] = None
+    telephone: Optional[str] = None
+    email: Optional[str] = None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,23 @@
+"""
+Pydantic schemas for Patient — embedded in incident details.
+"""
+
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+
+
+class PatientResponse(BaseModel):
+    """Schema for patient responses."""
+    id: int
+    nom: str
+    prenom: str
+    dateNaissance: Optional[date] = None
+    sexe: Optional[str] = None
+    adresse: Optional[str] = None
+    telephone: Optional[str] = None
+    email: Optional[str] = None
+    dateImplantation: Optional[date] = None
+    idImplant: Optional[int] = None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,15 @@
+"""
+Pydantic schemas for full-text search results.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Literal
+
+
+class SearchHit(BaseModel):
+    """One incident description or suivi matching a search."""
+    type: Literal["incident", "suivi"] = Field(..., description="Nature du texte trouvé")
+    id: int = Field(..., description="ID de l'incident ou du suivi")
+    idIncident: int = Field(..., description="ID de l'incident concerné")
+    score: float = Field(..., description="Pertinence (plus élevé = plus pertinent)")
+    snippet: str = Field(..., description="Extrait du texte échappé en HTML, termes trouvés entourés de <mark>…</mark>")
@@ -0,0 +1,20 @@
+"""
+Pydantic schemas for incident statistics.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Dict
+
+
+class IncidentStatsResponse(BaseModel):
+    """Active incident counts per dimension."""
+    total: int = Field(..., description="Nombre d'incidents actifs")
+    gravite: Dict[str, int] = Field(default_factory=dict, description="Nombre d'incidents par gravité")
+    statut: Dict[str, int] = Field(default_factory=dict, description="Nombre d'incidents par statut")
+    mois: Dict[str, int] = Field(default_factory=dict, description="Nombre d'incidents par mois (YYYY-MM) de survenue")
+    idImplant: Dict[str, int] = Field(
+        default_factory=dict, description="Nombre d'incidents par implant (incidents sans implant non comptés)"
+    )
+    idProcesseur: Dict[str, int] = Field(
+        default_factory=dict, description="Nombre d'incidents par processeur (incidents sans processeur non comptés)"
+    )
@@ -12,6 +12,9 @@ class SuiviCreate(BaseModel):
     dateSuivi: date = Field(..., description="Date du suivi (YYYY-MM-DD)")
     actionsPrises: str = Field(..., min_length=5, description="Description des actions prises")
     idMedecin: Optional[int] = Field(None, gt=0, description="ID du médecin ayant effectué le suivi")
+    versionIncident: Optional[int] = Field(
+        None, ge=1, description="Version de l'incident lue par le client : 409 si l'incident a changé depuis"
+    )
 
     @field_validator("actionsPrises")
     @classmethod
@@ -0,0 +1,136 @@
+"""
+ArchiveService — moves cold incidents out of the hot tables.
+
+Candidates are soft-deleted incidents and incidents closed (FERME) with no
+change for `months` months. They are copied with their suivis into
+incidents_archive / suivis_incidents_archive, removed from the search index,
+then deleted from incidents / suivis_incidents, one batch per short
+transaction: the hot tables are only ever locked for one batch of rows.
+
+The statistics summary keeps counting archived incidents (StatsService.recount
+reads both tables), so archiving does not touch incident_stats.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, and_, delete, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import incident_cache
+from app.database import utcnow
+from app.models.incident import Incident, StatutEnum
+from app.models.incident_archive import IncidentArchive, SuiviIncidentArchive
+from app.models.suivi_incident import SuiviIncident
+from app.services.search_service import SearchService
+
+logger = logging.getLogger(__name__)
+
+
+def months_before(moment: datetime, months: int) -> datetime:
+    """Same day and time `months` months earlier (clamped to the end of shorter months)."""
+    year, month = divmod(moment.year * 12 + moment.month - 1 - months, 12)
+    month += 1
+    next_month = datetime(year + month // 12, month % 12 + 1, 1)
+    last_day = (next_month - datetime(year, month, 1)).days
+    return moment.replace(year=year, month=month, day=min(moment.day, last_day))
+
+
+class ArchiveService:
+
+    @staticmethod
+    def candidates_clause(cutoff: datetime):
+        """Incidents to archive: soft-deleted, or closed and unchanged since `cutoff`."""
+        return or_(
+            Incident.deleted == 1,
+            and_(Incident.statut == StatutEnum.FERME, Incident.dateModification < cutoff)
+        )
+
+    @staticmethod
+    def held_back(db: Session) -> List[int]:
+        """
+        Incidents left in place whatever their state: the highest incident id and
+        the incident owning the highest suivi id. Without AUTOINCREMENT, SQLite
+        hands the highest deleted id out again, which would collide in the archive.
+        """
+        return [
+            incident_id for incident_id in (
+                db.execute(select(func.max(Incident.id))).scalar(),
+                db.execute(
+                    select(SuiviIncident.idIncident).order_by(SuiviIncident.id.desc()).limit(1)
+                ).scalar(),
+            ) if incident_id is not None
+        ]
+
+    @staticmethod
+    def archive_batch(
+        db: Session, cutoff: datetime, after: int, batch_size: int, held_back: List[int]
+    ) -> Tuple[List[int], int]:
+        """
+        Move the next `batch_size` candidates with id > `after`, and their suivis,
+        to the archive tables in one transaction. Returns the archived incident ids
+        and the number of archived suivis.
+        """
+        statement = (
+            select(Incident.id)
+            .where(Incident.id > after, ArchiveService.candidates_clause(cutoff))
+            .order_by(Incident.id).limit(batch_size).with_for_update()
+        )
+        if held_back:
+            statement = statement.where(Incident.id.not_in(held_back))
+        ids = db.execute(statement).scalars().all()
+        if not ids:
+            db.rollback()
+            return [], 0
+
+        archived_at = literal(utcnow(), DateTime)
+        incident_columns = [c.name for c in Incident.__table__.columns]
+        db.execute(insert(IncidentArchive).from_select(
+            incident_columns + ["dateArchivage"],
+            select(*Incident.__table__.columns, archived_at).where(Incident.id.in_(ids))
+        ))
+        suivi_columns = [c.name for c in SuiviIncident.__table__.columns]
+        suivis = db.execute(insert(SuiviIncidentArchive).from_select(
+            suivi_columns + ["dateArchivage"],
+            select(*SuiviIncident.__table__.columns, archived_at).where(SuiviIncident.idIncident.in_(ids))
+        ))
+        SearchService.unindex_incidents(db, ids)
+        db.execute(delete(SuiviIncident).where(SuiviIncident.idIncident.in_(ids)))
+        db.execute(delete(Incident).where(Incident.id.in_(ids)))
+        db.commit()
+        incident_cache.invalidate_many(ids)
+        return ids, suivis.rowcount
+
+    @staticmethod
+    def run(
+        db: Session,
+        months: int,
+        batch_size: int,
+        pause: float = 0.0,
+        now: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Archive every candidate, batch after batch in id order, sleeping `pause`
+        seconds between batches. Returns the number of archived incidents and suivis.
+        """
+        cutoff = months_before(now or datetime.utcnow(), months)
+        held_back = ArchiveService.held_back(db)
+        logger.info("Archiving incidents closed before %s (batch %s)", cutoff.isoformat(), batch_size)
+
+        counts = {"incidents": 0, "suivis": 0}
+        after = 0
+        while True:
+            ids, suivis = ArchiveService.archive_batch(db, cutoff, after, batch_size, held_back)
+            if not ids:
+                break
+            counts["incidents"] += len(ids)
+            counts["suivis"] += suivis
+            after = ids[-1]
+            logger.debug("Archived %s incidents up to id %s", len(ids), after)
+            if pause:
+                time.sleep(pause)
+
+        logger.info("Archived %s incidents, %s suivis", counts["incidents"], counts["suivis"])
+        return counts
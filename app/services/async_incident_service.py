@@ -0,0 +1,146 @@
+"""
+AsyncIncidentService — awaitable facade over IncidentService.
+
+With an AsyncSession, each call runs the IncidentService business logic through
+`AsyncSession.run_sync`: the ORM code executes on SQLAlchemy's greenlet bridge
+while the asyncio driver does the I/O on the event loop, so no worker thread is
+held while waiting on the database. With a plain Session (DATABASE_ASYNC off),
+the call is offloaded to the threadpool as before.
+
+Business rules live in IncidentService only; this module adds no logic.
+"""
+
+from typing import Any, Callable, Collection, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.database import DbSession
+from app.models.incident import Incident, StatutEnum
+from app.models.incident_archive import IncidentArchive
+from app.models.suivi_incident import SuiviIncident
+from app.schemas.incident import (
+    IncidentBulkResult, IncidentCreate, IncidentFilter, IncidentInclude, IncidentSort, IncidentStatusResult,
+    IncidentUpdate
+)
+from app.schemas.suivi_incident import SuiviCreate
+from app.services.incident_service import IncidentService
+
+
+async def run_db(db: DbSession, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run `method(session, *args, **kwargs)` without blocking the event loop."""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(method, *args, **kwargs)
+    return await run_in_threadpool(method, db, *args, **kwargs)
+
+
+class AsyncIncidentService:
+
+    # ─────────────────────────────────────────────
+    # INCIDENTS
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    async def create(db: DbSession, data: IncidentCreate) -> Incident:
+        return await run_db(db, IncidentService.create, data)
+
+    @staticmethod
+    async def create_many(db: DbSession, items: List[IncidentCreate]) -> IncidentBulkResult:
+        return await run_db(db, IncidentService.create_many, items)
+
+    @staticmethod
+    async def transition_many(
+        db: DbSession, statut: StatutEnum, ids: Optional[List[int]] = None, filters: Optional[IncidentFilter] = None
+    ) -> IncidentStatusResult:
+        return await run_db(db, IncidentService.transition_many, statut, ids=ids, filters=filters)
+
+    @staticmethod
+    async def get_by_id(db: DbSession, incident_id: int) -> Optional[Incident]:
+        return await run_db(db, IncidentService.get_by_id, incident_id)
+
+    @staticmethod
+    async def get_payload(db: DbSession, incident_id: int) -> Optional[bytes]:
+        return await run_db(db, IncidentService.get_payload, incident_id)
+
+    @staticmethod
+    async def get_detail(db: DbSession, incident_id: int, include: Collection[IncidentInclude]) -> Optional[Incident]:
+        return await run_db(db, IncidentService.get_detail, incident_id, include)
+
+    @staticmethod
+    async def get_archived(
+        db: DbSession, incident_id: int, include: Collection[IncidentInclude] = ()
+    ) -> Optional[IncidentArchive]:
+        return await run_db(db, IncidentService.get_archived, incident_id, include)
+
+    @staticmethod
+    async def warm_cache(db: DbSession, limit: int) -> int:
+        return await run_db(db, IncidentService.warm_cache, limit)
+
+    @staticmethod
+    async def incident_version(db: DbSession, incident_id: int) -> Optional[tuple]:
+        return await run_db(db, IncidentService.incident_version, incident_id)
+
+    @staticmethod
+    async def patient_incidents_version(db: DbSession, patient_id: int) -> Optional[tuple]:
+        return await run_db(db, IncidentService.patient_incidents_version, patient_id)
+
+    @staticmethod
+    async def get_by_patient(
+        db: DbSession, patient_id: int, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> List[Incident]:
+        return await run_db(db, IncidentService.get_by_patient, patient_id, limit=limit, cursor=cursor)
+
+    @staticmethod
+    async def count_by_patient(db: DbSession, patient_id: int) -> int:
+        return await run_db(db, IncidentService.count_by_patient, patient_id)
+
+    @staticmethod
+    async def get_all(
+        db: DbSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[IncidentFilter] = None,
+        sort: IncidentSort = IncidentSort.DATE_CREATION_DESC,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[Incident]:
+        return await run_db(
+            db, IncidentService.get_all, skip=skip, limit=limit, cursor=cursor, filters=filters, sort=sort,
+            fields=fields
+        )
+
+    @staticmethod
+    async def count_all(db: DbSession, filters: Optional[IncidentFilter] = None) -> int:
+        return await run_db(db, IncidentService.count_all, filters=filters)
+
+    @staticmethod
+    async def update(
+        db: DbSession, incident_id: int, data: IncidentUpdate, if_match: Optional[str] = None
+    ) -> Optional[Incident]:
+        return await run_db(db, IncidentService.update, incident_id, data, if_match=if_match)
+
+    @staticmethod
+    async def soft_delete(db: DbSession, incident_id: int) -> bool:
+        return await run_db(db, IncidentService.soft_delete, incident_id)
+
+    # ─────────────────────────────────────────────
+    # SUIVIS
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    async def suivis_version(db: DbSession, incident_id: int) -> Optional[tuple]:
+        return await run_db(db, IncidentService.suivis_version, incident_id)
+
+    @staticmethod
+    async def add_suivi(db: DbSession, incident_id: int, data: SuiviCreate) -> Optional[SuiviIncident]:
+        return await run_db(db, IncidentService.add_suivi, incident_id, data)
+
+    @staticmethod
+    async def get_suivis(
+        db: DbSession, incident_id: int, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> List[SuiviIncident]:
+        return await run_db(db, IncidentService.get_suivis, incident_id, limit=limit, cursor=cursor)
+
+    @staticmethod
+    async def count_suivis(db: DbSession, incident_id: int) -> int:
+        return await run_db(db, IncidentService.count_suivis, incident_id)
@@ -0,0 +1,99 @@
+"""
+ExportService — streams query results as NDJSON or CSV.
+
+Rows are read from a server-side cursor (`stream_results`) in fixed-size
+partitions and serialized as they arrive, so memory use stays flat whatever
+the size of the export. The export runs on its own connection, independent of
+the request session's lifetime.
+"""
+
+import csv
+import enum
+import io
+import json
+import logging
+from datetime import date, datetime, time
+from typing import Any, AsyncIterator, Iterator, Sequence, Union
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import DbSession
+from app.schemas.incident import ExportFormat
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _cell(value: Any) -> Any:
+    """Convert a DB value to its JSON/CSV representation (same as the API responses)."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+
+    @staticmethod
+    def header(fields: Sequence[str], fmt: ExportFormat) -> str:
+        """Leading chunk of the export (CSV header line, nothing for NDJSON)."""
+        if fmt == ExportFormat.CSV:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(fields)
+            return buffer.getvalue()
+        return ""
+
+    @staticmethod
+    def encode(rows: Sequence[Sequence[Any]], fields: Sequence[str], fmt: ExportFormat) -> str:
+        """Serialize a partition of rows into one chunk."""
+        if fmt == ExportFormat.CSV:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows([_cell(v) for v in row] for row in rows)
+            return buffer.getvalue()
+        return "".join(
+            json.dumps(dict(zip(fields, map(_cell, row))), ensure_ascii=False, separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+    @staticmethod
+    def stream(db: DbSession, statement: Select, fmt: ExportFormat) -> Union[Iterator[str], AsyncIterator[str]]:
+        """Return a chunk iterator for StreamingResponse, async when `db` is an AsyncSession."""
+        if isinstance(db, AsyncSession):
+            return ExportService._stream_async(db, statement, fmt)
+        return ExportService._stream_sync(db, statement, fmt)
+
+    @staticmethod
+    def _stream_sync(db: DbSession, statement: Select, fmt: ExportFormat) -> Iterator[str]:
+        fields = [c.name for c in statement.selected_columns]
+        header = ExportService.header(fields, fmt)
+        if header:
+            yield header
+        count = 0
+        with db.get_bind().connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(statement)
+            for partition in result.partitions():
+                count += len(partition)
+                yield ExportService.encode(partition, fields, fmt)
+        logger.info("Export (%s) streamed %s rows", fmt.value, count)
+
+    @staticmethod
+    async def _stream_async(db: AsyncSession, statement: Select, fmt: ExportFormat) -> AsyncIterator[str]:
+        fields = [c.name for c in statement.selected_columns]
+        header = ExportService.header(fields, fmt)
+        if header:
+            yield header
+        count = 0
+        async with db.bind.connect() as conn:
+            result = await conn.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for partition in result.partitions():
+                count += len(partition)
+                yield ExportService.encode(partition, fields, fmt)
+        logger.info("Export (%s) streamed %s rows", fmt.value, count)
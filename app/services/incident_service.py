@@ -6,20 +6,134 @@ Validates business rules (patient existence, implant existence, etc.)
 Conforms to IEC 62304 Class B software requirements.
 """
 
+import json
 import logging
-from sqlalchemy.orm import Session
-from typing import List, Optional
-
+from collections import Counter
+from datetime import date, datetime, time
+from functools import lru_cache
+from pydantic import TypeAdapter, create_model
+from sqlalchemy import Select, func, insert, select, text, union_all, update
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Callable, Collection, List, Optional, Tuple, TypeVar
+
+from app.core.cache import incident_cache
+from app.core.conditional import PreconditionFailedError, VersionConflictError, etag_matches, strong_etag
+from app.core.pagination import SortKey, decode_cursor, keyset_predicate
+from app.database import utcnow
 from app.models.incident import Incident, StatutEnum
+from app.models.incident_archive import IncidentArchive, SuiviIncidentArchive
 from app.models.suivi_incident import SuiviIncident
-from app.schemas.incident import IncidentCreate, IncidentUpdate
+from app.schemas.incident import (
+    INCIDENT_FIELDS, IncidentBulkError, IncidentBulkResult, IncidentCreate, IncidentDetailResponse, IncidentFilter,
+    IncidentInclude, IncidentResponse, IncidentSort, IncidentStatusChange, IncidentStatusResult, IncidentUpdate,
+    ListFormat, StatusChangeOutcome
+)
 from app.schemas.suivi_incident import SuiviCreate
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
 
 logger = logging.getLogger(__name__)
 
+# Statuts an incident may move to from each statut (bulk transitions)
+STATUT_TRANSITIONS = {
+    StatutEnum.OUVERT: {StatutEnum.EN_COURS, StatutEnum.RESOLU, StatutEnum.FERME},
+    StatutEnum.EN_COURS: {StatutEnum.RESOLU, StatutEnum.FERME},
+    StatutEnum.RESOLU: {StatutEnum.EN_COURS, StatutEnum.FERME},
+    StatutEnum.FERME: set(),
+}
+# Incidents a bulk transition may select with a filter (same bound as its `ids`)
+STATUS_BATCH_LIMIT = 10000
+# Rows per multi-row INSERT of a bulk creation without RETURNING (MySQL)
+BULK_INSERT_CHUNK = 1000
+
+# Attempts of a write that raced another one, when the client sent no version
+VERSION_RETRIES = 5
+T = TypeVar("T")
+
+# Keyset sort keys — each must match the ORDER BY of its list query.
+INCIDENT_LIST_KEY = (Incident.dateCreation, Incident.id)
+# get_all sort orders — each has an index on (deleted, <columns>), see the Incident model
+INCIDENT_SORT_KEYS = {
+    IncidentSort.DATE_CREATION_DESC: SortKey(INCIDENT_LIST_KEY, (datetime, int), descending=True),
+    IncidentSort.DATE_CREATION: SortKey(INCIDENT_LIST_KEY, (datetime, int), descending=False),
+    IncidentSort.DATE_INCIDENT_DESC: SortKey(
+        (Incident.dateIncident, Incident.heureIncident, Incident.id), (date, time, int), descending=True
+    ),
+    IncidentSort.DATE_INCIDENT: SortKey(
+        (Incident.dateIncident, Incident.heureIncident, Incident.id), (date, time, int), descending=False
+    ),
+    IncidentSort.DATE_MODIFICATION_DESC: SortKey(
+        (Incident.dateModification, Incident.id), (datetime, int), descending=True
+    ),
+    IncidentSort.DATE_MODIFICATION: SortKey(
+        (Incident.dateModification, Incident.id), (datetime, int), descending=False
+    ),
+}
+# Whole-page serializer of the list routes (see serialize_list)
+INCIDENT_LIST_ADAPTER = TypeAdapter(List[IncidentResponse])
+
+
+@lru_cache(maxsize=64)
+def fields_adapter(fields: Tuple[str, ...], fmt: ListFormat) -> TypeAdapter:
+    """
+    Serializer of a sparse fieldset: a model holding only `fields` (typed as in
+    IncidentResponse), as a list of rows or, for `columnar`, one list per field.
+    """
+    annotations = {name: IncidentResponse.model_fields[name].annotation for name in fields}
+    if fmt is ListFormat.COLUMNAR:
+        return TypeAdapter(create_model(
+            "IncidentColumns", **{name: (List[annotation], ...) for name, annotation in annotations.items()}
+        ))
+    return TypeAdapter(List[create_model("IncidentFields", **{
+        name: (annotation, ...) for name, annotation in annotations.items()
+    })])
+
+
+PATIENT_INCIDENTS_KEY = (Incident.dateIncident, Incident.heureIncident, Incident.id)
+SUIVIS_KEY = (SuiviIncident.dateSuivi, SuiviIncident.id)
+
+# Columns written by the exports — IncidentResponse / SuiviResponse fields
+INCIDENT_EXPORT_COLUMNS = (
+    Incident.id, Incident.dateIncident, Incident.heureIncident, Incident.gravite, Incident.description,
+    Incident.statut, Incident.idPatient, Incident.idImplant, Incident.idProcesseur, Incident.idMedecin,
+    Incident.dateCreation, Incident.dateModification, Incident.deleted, Incident.version,
+)
+SUIVI_EXPORT_COLUMNS = (
+    SuiviIncident.id, SuiviIncident.dateSuivi, SuiviIncident.actionsPrises, SuiviIncident.idIncident,
+    SuiviIncident.idMedecin, SuiviIncident.dateCreation,
+)
+
+# Loader per `include=` value: many-to-one are joined into the incident SELECT,
+# suivis come with one extra IN query (no row multiplication of the incident).
+INCLUDE_LOADERS = {
+    IncidentInclude.PATIENT: joinedload(Incident.patient),
+    IncidentInclude.MEDECIN: joinedload(Incident.medecin),
+    IncidentInclude.SUIVIS: selectinload(Incident.suivis),
+}
+ARCHIVE_INCLUDE_LOADERS = {
+    IncidentInclude.PATIENT: joinedload(IncidentArchive.patient),
+    IncidentInclude.MEDECIN: joinedload(IncidentArchive.medecin),
+    IncidentInclude.SUIVIS: selectinload(IncidentArchive.suivis),
+}
+
 
 class IncidentService:
 
+    # ─────────────────────────────────────────────
+    # CURSORS
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def patient_incidents_cursor(incident: Incident) -> tuple:
+        """Sort-key values of an incident in `get_by_patient` order."""
+        return (incident.dateIncident, incident.heureIncident, incident.id)
+
+    @staticmethod
+    def suivis_cursor(suivi: SuiviIncident) -> tuple:
+        """Sort-key values of a suivi in `get_suivis` order."""
+        return (suivi.dateSuivi, suivi.id)
+
     # ─────────────────────────────────────────────
     # INCIDENTS
     # ─────────────────────────────────────────────
@@ -32,111 +146,464 @@ class IncidentService:
         """
         from app.models.patient import Patient
 
-        logger.info(f"Creating incident for patient {data.idPatient}")
+        logger.info("Creating incident for patient %s", data.idPatient)
 
         # Business rule: patient must exist
         patient = db.query(Patient).filter(Patient.id == data.idPatient).first()
         if not patient:
-            logger.warning(f"Incident creation failed: patient {data.idPatient} not found")
+            logger.warning("Incident creation failed: patient %s not found", data.idPatient)
             raise ValueError(f"Patient avec l'ID {data.idPatient} introuvable.")
 
         # Business rule: implant must belong to patient if provided
         if data.idImplant and patient.idImplant != data.idImplant:
-            logger.warning(f"Implant {data.idImplant} does not belong to patient {data.idPatient}")
+            logger.warning("Implant %s does not belong to patient %s", data.idImplant, data.idPatient)
             raise ValueError(f"L'implant {data.idImplant} n'appartient pas au patient {data.idPatient}.")
 
         incident = Incident(**data.model_dump())
         db.add(incident)
+        db.flush()
+        StatsService.record(db, {}, StatsService.of(incident))
+        SearchService.index_incidents(db, [(incident.id, incident.description)])
+        # Defaults were computed client-side and the id read at INSERT: the object
+        # is complete, and stays loaded after commit (expire_on_commit=False)
         db.commit()
-        db.refresh(incident)
 
-        logger.info(f"Incident {incident.id} created successfully (gravite={incident.gravite})")
+        logger.info("Incident %s created successfully (gravite=%s)", incident.id, incident.gravite)
         return incident
 
+    @staticmethod
+    def create_many(db: Session, items: List[IncidentCreate]) -> IncidentBulkResult:
+        """
+        Create many incidents in one transaction.
+        Patient existence and implant ownership are checked for the whole batch
+        with a single query; valid rows are inserted with one executemany
+        (multi-row VALUES). Rows breaking a business rule are reported, not raised.
+        """
+        from app.models.patient import Patient
+
+        logger.info("Bulk-creating %s incidents", len(items))
+
+        patient_ids = {item.idPatient for item in items}
+        implants = dict(db.execute(
+            select(Patient.id, Patient.idImplant).where(Patient.id.in_(patient_ids))
+        ).all())
+
+        rows, errors = [], []
+        for index, item in enumerate(items):
+            if item.idPatient not in implants:
+                errors.append(IncidentBulkError(index=index, detail=f"Patient avec l'ID {item.idPatient} introuvable."))
+            elif item.idImplant and implants[item.idPatient] != item.idImplant:
+                errors.append(IncidentBulkError(
+                    index=index,
+                    detail=f"L'implant {item.idImplant} n'appartient pas au patient {item.idPatient}."
+                ))
+            else:
+                rows.append(item.model_dump())
+
+        ids = None
+        if rows:
+            ids = IncidentService._insert_rows(db, rows)
+            # New rows get the column defaults: active, statut OUVERT
+            StatsService.record_many(db, (StatsService.buckets(statut=StatutEnum.OUVERT, **row) for row in rows))
+            if ids:
+                SearchService.index_incidents(db, zip(ids, (row["description"] for row in rows)))
+            db.commit()
+
+        logger.info("Bulk creation done: %s created, %s rejected", len(rows), len(errors))
+        return IncidentBulkResult(created=len(rows), ids=ids, errors=errors)
+
+    @staticmethod
+    def _insert_rows(db: Session, rows: List[dict]) -> Optional[List[int]]:
+        """
+        Insert incident rows; returns their ids in row order.
+        With INSERT … RETURNING (SQLite, PostgreSQL) the ids come back with the rows,
+        matched to them by SQLAlchemy (sort_by_parameter_order): batched statements
+        with a sentinel where the dialect has one (PostgreSQL), row by row otherwise.
+        On MySQL each chunk is one multi-row INSERT: a "simple insert" for which
+        InnoDB reserves consecutive ids in every auto-increment lock mode, the
+        first one being LAST_INSERT_ID() (cursor.lastrowid). Other dialects: None.
+        """
+        dialect = db.get_bind().dialect
+        if dialect.insert_executemany_returning:
+            # Neither batches nor sequences guarantee ids in VALUES order: let SQLAlchemy match them
+            return list(db.scalars(insert(Incident).returning(Incident.id, sort_by_parameter_order=True), rows))
+        if dialect.name != "mysql":
+            db.execute(insert(Incident), rows)
+            return None
+        step = db.execute(text("SELECT @@auto_increment_increment")).scalar()
+        ids = []
+        for start in range(0, len(rows), BULK_INSERT_CHUNK):
+            chunk = rows[start:start + BULK_INSERT_CHUNK]
+            first = db.execute(insert(Incident).values(chunk)).lastrowid
+            ids.extend(range(first, first + step * len(chunk), step))
+        return ids
+
     @staticmethod
     def get_by_id(db: Session, incident_id: int) -> Optional[Incident]:
         """
         Retrieve an active (non-deleted) incident by its ID.
         Returns None if not found or soft-deleted.
         """
-        logger.debug(f"Fetching incident {incident_id}")
+        logger.debug("Fetching incident %s", incident_id)
         return db.query(Incident).filter(
             Incident.id == incident_id,
             Incident.deleted == 0
         ).first()
 
     @staticmethod
-    def get_by_patient(db: Session, patient_id: int) -> List[Incident]:
+    def serialize(incident: Incident) -> bytes:
+        """JSON payload of an incident, identical to the IncidentResponse body."""
+        return IncidentResponse.model_validate(incident).model_dump_json().encode("utf-8")
+
+    @staticmethod
+    def serialize_list(incidents: List[Incident]) -> bytes:
         """
-        Retrieve all active incidents for a given patient, ordered by date descending.
+        JSON array of IncidentResponse for a page of freshly queried incidents,
+        validated and encoded by pydantic-core in one call each. Column values
+        are read from the instance __dict__ (all loaded by the list queries)
+        rather than through the ORM attribute descriptors.
+        Byte-identical to the response_model path of the routes.
         """
-        logger.debug(f"Fetching incidents for patient {patient_id}")
-        return db.query(Incident).filter(
+        return INCIDENT_LIST_ADAPTER.dump_json(INCIDENT_LIST_ADAPTER.validate_python([vars(i) for i in incidents]))
+
+    @staticmethod
+    def serialize_fields(incidents: List[Incident], fields: Collection[str], fmt: ListFormat) -> bytes:
+        """
+        JSON of a page restricted to `fields` (in IncidentResponse order): an
+        array of objects, or for `columnar` an object of one array per field.
+        The values are those loaded by get_all(fields=...).
+        """
+        names = tuple(name for name in INCIDENT_FIELDS if name in fields)
+        adapter = fields_adapter(names, fmt)
+        if fmt is ListFormat.COLUMNAR:
+            rows = {name: [vars(i)[name] for i in incidents] for name in names}
+        else:
+            rows = [vars(i) for i in incidents]
+        return adapter.dump_json(adapter.validate_python(rows))
+
+    @staticmethod
+    def get_payload(db: Session, incident_id: int) -> Optional[bytes]:
+        """
+        Read-through cached JSON payload of an active incident.
+        Returns None if not found or soft-deleted.
+        A replica session reads through without filling the cache: a lagging
+        replica would put back a version a write has just invalidated. For the
+        same reason, the fill is skipped when an invalidation ran while loading.
+        """
+        generation = incident_cache.generation()
+        payload = incident_cache.get(incident_id)
+        if payload is not None:
+            return payload
+
+        incident = IncidentService.get_by_id(db, incident_id)
+        if not incident:
+            return None
+        payload = IncidentService.serialize(incident)
+        if not db.info.get("replica"):
+            incident_cache.put(incident_id, payload, generation)
+        return payload
+
+    @staticmethod
+    def get_detail(db: Session, incident_id: int, include: Collection[IncidentInclude]) -> Optional[Incident]:
+        """
+        Retrieve an active incident with the requested relationships eager-loaded:
+        one statement for the incident with patient/medecin, plus one for suivis.
+        Any other relationship access raises instead of lazy-loading.
+        Returns None if not found or soft-deleted.
+        """
+        logger.debug("Fetching incident %s detail (include=%s)", incident_id, sorted(i.value for i in include))
+        return db.execute(
+            select(Incident)
+            .options(*(INCLUDE_LOADERS[i] for i in include), raiseload("*"))
+            .where(Incident.id == incident_id, Incident.deleted == 0)
+        ).unique().scalar_one_or_none()
+
+    @staticmethod
+    def get_archived(
+        db: Session, incident_id: int, include: Collection[IncidentInclude] = ()
+    ) -> Optional[IncidentArchive]:
+        """
+        Retrieve an archived (moved by ArchiveService), non-deleted incident,
+        loaded like get_detail. Returns None if not in the archive.
+        """
+        logger.debug("Fetching archived incident %s", incident_id)
+        return db.execute(
+            select(IncidentArchive)
+            .options(*(ARCHIVE_INCLUDE_LOADERS[i] for i in include), raiseload("*"))
+            .where(IncidentArchive.id == incident_id, IncidentArchive.deleted == 0)
+        ).unique().scalar_one_or_none()
+
+    @staticmethod
+    def serialize_detail(incident: Incident, include: Collection[IncidentInclude]) -> bytes:
+        """JSON payload of an IncidentDetailResponse holding only the included relationships."""
+        detail = IncidentDetailResponse.model_validate({
+            **IncidentResponse.model_validate(incident).model_dump(),
+            **{i.value: getattr(incident, i.value) for i in include},
+        }, from_attributes=True)
+        return detail.model_dump_json(exclude={i.value for i in IncidentInclude if i not in include}).encode("utf-8")
+
+    @staticmethod
+    def warm_cache(db: Session, limit: int) -> int:
+        """Load the most recently modified open incidents into the cache. Returns the count."""
+        incidents = db.query(Incident).filter(
+            Incident.deleted == 0,
+            Incident.statut.in_([StatutEnum.OUVERT, StatutEnum.EN_COURS])
+        ).order_by(Incident.dateModification.desc()).limit(limit).all()
+        for incident in incidents:
+            incident_cache.put(incident.id, IncidentService.serialize(incident))
+        logger.info("Cache warmed with %s open incidents", len(incidents))
+        return len(incidents)
+
+    @staticmethod
+    def get_by_patient(
+        db: Session, patient_id: int, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> List[Incident]:
+        """
+        Retrieve active incidents for a given patient, ordered by date descending.
+        Pages with a keyset cursor on (dateIncident, heureIncident, id) when given.
+        Raises InvalidCursorError if the cursor is malformed.
+        """
+        logger.debug("Fetching incidents for patient %s (limit=%s, cursor=%s)", patient_id, limit, cursor)
+        query = db.query(Incident).filter(
             Incident.idPatient == patient_id,
             Incident.deleted == 0
-        ).order_by(Incident.dateIncident.desc(), Incident.heureIncident.desc()).all()
+        )
+        if cursor:
+            values = decode_cursor(cursor, (date, time, int))
+            query = query.filter(keyset_predicate(PATIENT_INCIDENTS_KEY, values, descending=True))
+        query = query.order_by(*(column.desc() for column in PATIENT_INCIDENTS_KEY))
+        if limit:
+            query = query.limit(limit)
+        return query.all()
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Incident]:
+    def count_by_patient(db: Session, patient_id: int) -> int:
+        """Count active incidents for a given patient."""
+        return db.query(func.count(Incident.id)).filter(
+            Incident.idPatient == patient_id,
+            Incident.deleted == 0
+        ).scalar()
+
+    @staticmethod
+    def get_all(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[IncidentFilter] = None,
+        sort: IncidentSort = IncidentSort.DATE_CREATION_DESC,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[Incident]:
         """
-        Retrieve all active incidents with pagination support.
+        Retrieve active incidents matching `filters`, in `sort` order (most recent first by default).
+        Pages with a keyset cursor on the sort columns when given; `skip` is kept
+        for backward compatibility but costs a scan of every skipped row.
+        With `fields` (IncidentResponse field names), only those columns and the
+        sort key are selected: the other attributes stay deferred.
+        Raises InvalidCursorError if the cursor is malformed.
         """
-        logger.debug(f"Fetching all incidents (skip={skip}, limit={limit})")
-        return db.query(Incident).filter(
-            Incident.deleted == 0
-        ).order_by(Incident.dateCreation.desc()).offset(skip).limit(limit).all()
+        logger.debug("Fetching all incidents (skip=%s, limit=%s, cursor=%s, sort=%s)", skip, limit, cursor, sort.value)
+        key = INCIDENT_SORT_KEYS[sort]
+        query = db.query(Incident).filter(*IncidentService.filter_clauses(filters or IncidentFilter()))
+        if fields:
+            query = query.options(load_only(*{getattr(Incident, name) for name in fields}, *key.columns))
+        if cursor:
+            query = query.filter(key.predicate(cursor))
+        query = query.order_by(*key.order_by())
+        if skip:
+            query = query.offset(skip)
+        return query.limit(limit).all()
+
+    @staticmethod
+    def list_cursor(sort: IncidentSort = IncidentSort.DATE_CREATION_DESC) -> Callable[[Incident], tuple]:
+        """Cursor key function of `get_all` for a sort order."""
+        return INCIDENT_SORT_KEYS[sort].values
 
     @staticmethod
-    def update(db: Session, incident_id: int, data: IncidentUpdate) -> Optional[Incident]:
+    def count_all(db: Session, filters: Optional[IncidentFilter] = None) -> int:
+        """Count active incidents matching `filters`."""
+        return db.query(func.count(Incident.id)).filter(
+            *IncidentService.filter_clauses(filters or IncidentFilter())
+        ).scalar()
+
+    @staticmethod
+    def update(
+        db: Session, incident_id: int, data: IncidentUpdate, if_match: Optional[str] = None
+    ) -> Optional[Incident]:
         """
         Partially update an incident. Only provided fields are updated.
+        When `if_match` (If-Match header value) is given, the current ETag of
+        the row is checked first; raises PreconditionFailedError on mismatch,
+        and also when the incident changes before the UPDATE.
+        Otherwise, when `data.version` is given, raises VersionConflictError if
+        the incident is at another version or changes before the UPDATE;
+        without it, a concurrent write is retried on the fresh row.
         Returns None if incident not found or is soft-deleted.
         """
-        logger.info(f"Updating incident {incident_id}")
-
-        incident = db.query(Incident).filter(
-            Incident.id == incident_id,
-            Incident.deleted == 0
-        ).first()
+        logger.info("Updating incident %s", incident_id)
+        try:
+            return IncidentService._versioned_write(
+                db, incident_id, data.version is None and if_match is None,
+                lambda: IncidentService._update(db, incident_id, data, if_match)
+            )
+        except VersionConflictError as e:
+            if if_match is None:
+                raise
+            # The client made the write conditional with If-Match: 412, not 409
+            raise PreconditionFailedError(str(e)) from e
 
+    @staticmethod
+    def _update(db: Session, incident_id: int, data: IncidentUpdate, if_match: Optional[str]) -> Optional[Incident]:
+        incident = IncidentService._get_current(db, incident_id, data.version)
         if not incident:
-            logger.warning(f"Update failed: incident {incident_id} not found")
+            logger.warning("Update failed: incident %s not found", incident_id)
             return None
 
-        updated_fields = data.model_dump(exclude_none=True)
+        if if_match is not None and not etag_matches(
+            if_match, IncidentService.incident_etag(incident.id, incident.version)
+        ):
+            db.rollback()
+            logger.warning("Update refused: incident %s changed since If-Match version", incident_id)
+            raise PreconditionFailedError(f"L'incident {incident_id} a été modifié entre-temps.")
+
+        before = StatsService.of(incident)
+        updated_fields = data.model_dump(exclude_none=True, exclude={"version"})
         for field, value in updated_fields.items():
             setattr(incident, field, value)
+        StatsService.record(db, before, StatsService.of(incident))
+        if "description" in updated_fields:
+            SearchService.index_incidents(db, [(incident.id, incident.description)])
 
+        # dateModification (onupdate) and version were set on the object by the UPDATE
         db.commit()
-        db.refresh(incident)
+        incident_cache.invalidate(incident_id)
 
-        logger.info(f"Incident {incident_id} updated: {list(updated_fields.keys())}")
+        logger.info("Incident %s updated: %s", incident_id, list(updated_fields.keys()))
         return incident
 
+    @staticmethod
+    def transition_many(
+        db: Session, statut: StatutEnum, ids: Optional[List[int]] = None, filters: Optional[IncidentFilter] = None
+    ) -> IncidentStatusResult:
+        """
+        Move many incidents to `statut` in one transaction: one locking SELECT
+        of the current statuts, one set-based UPDATE, one stats upsert.
+        Targets are `ids`, or the active incidents matching `filters` (raises
+        ValueError beyond STATUS_BATCH_LIMIT). Soft-deleted and unknown ids are
+        not_found; incidents whose statut cannot move to `statut` (see
+        STATUT_TRANSITIONS) are left unchanged and reported.
+        """
+        sources = [source for source, targets in STATUT_TRANSITIONS.items() if statut in targets]
+        query = select(Incident.id, Incident.statut).with_for_update()
+        if ids is not None:
+            ids = list(dict.fromkeys(ids))
+            query = query.where(Incident.id.in_(ids), Incident.deleted == 0)
+        else:
+            active = filters.model_copy(update={"include_deleted": False})
+            query = query.where(*IncidentService.filter_clauses(active)).order_by(Incident.id)
+            query = query.limit(STATUS_BATCH_LIMIT + 1)
+        current = dict(db.execute(query).all())
+        if ids is None:
+            if len(current) > STATUS_BATCH_LIMIT:
+                db.rollback()
+                raise ValueError(f"Le filtre retient plus de {STATUS_BATCH_LIMIT} incidents : affinez-le.")
+            ids = list(current)
+
+        moving = [incident_id for incident_id, source in current.items() if source in sources]
+        if moving:
+            # Soft-delete flag and allowed transitions enforced by the UPDATE itself
+            db.execute(update(Incident).where(
+                Incident.id.in_(moving), Incident.deleted == 0, Incident.statut.in_(sources)
+            ).values(statut=statut, dateModification=utcnow(), version=Incident.version + 1))
+            StatsService.record_moves(db, "statut", Counter((current[i], statut) for i in moving))
+        db.commit()
+        incident_cache.invalidate_many(moving)
+
+        results = []
+        for incident_id in ids:
+            source = current.get(incident_id)
+            if source is None:
+                outcome, after = StatusChangeOutcome.NOT_FOUND, None
+            elif source == statut:
+                outcome, after = StatusChangeOutcome.UNCHANGED, source
+            elif source in sources:
+                outcome, after = StatusChangeOutcome.UPDATED, statut
+            else:
+                outcome, after = StatusChangeOutcome.FORBIDDEN, source
+            results.append(IncidentStatusChange(id=incident_id, outcome=outcome, statut=after))
+
+        logger.info("Bulk transition to %s: %s updated out of %s", statut.value, len(moving), len(ids))
+        return IncidentStatusResult(statut=statut, updated=len(moving), results=results)
+
     @staticmethod
     def soft_delete(db: Session, incident_id: int) -> bool:
         """
         Soft-delete an incident by setting deleted=1 and statut=Fermé.
         Returns False if incident not found or already deleted.
         """
-        logger.info(f"Soft-deleting incident {incident_id}")
-
-        incident = db.query(Incident).filter(
-            Incident.id == incident_id,
-            Incident.deleted == 0
-        ).first()
+        logger.info("Soft-deleting incident %s", incident_id)
+        return IncidentService._versioned_write(
+            db, incident_id, True, lambda: IncidentService._soft_delete(db, incident_id)
+        )
 
+    @staticmethod
+    def _soft_delete(db: Session, incident_id: int) -> bool:
+        incident = IncidentService._get_current(db, incident_id)
         if not incident:
-            logger.warning(f"Soft-delete failed: incident {incident_id} not found")
+            logger.warning("Soft-delete failed: incident %s not found", incident_id)
             return False
 
+        StatsService.record(db, StatsService.of(incident), {})
+        SearchService.unindex_incident(db, incident_id)
         incident.deleted = 1
         incident.statut = StatutEnum.FERME
         db.commit()
+        incident_cache.invalidate(incident_id)
 
-        logger.info(f"Incident {incident_id} soft-deleted successfully")
+        logger.info("Incident %s soft-deleted successfully", incident_id)
         return True
 
+    # ─────────────────────────────────────────────
+    # OPTIMISTIC CONCURRENCY
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def _get_current(db: Session, incident_id: int, expected_version: Optional[int] = None) -> Optional[Incident]:
+        """
+        Active incident reloaded from the database, even if already in the
+        session (objects are not expired at commit): the version checks and
+        the stats deltas need the committed values. No row lock is taken.
+        Raises VersionConflictError if it is not at `expected_version`.
+        """
+        incident = db.query(Incident).filter(
+            Incident.id == incident_id,
+            Incident.deleted == 0
+        ).populate_existing().first()
+        if incident and expected_version is not None and incident.version != expected_version:
+            db.rollback()
+            logger.warning(
+                "Write refused: incident %s is at version %s, not %s", incident_id, incident.version, expected_version
+            )
+            raise VersionConflictError(f"L'incident {incident_id} a été modifié entre-temps (version {incident.version}).")
+        return incident
+
+    @staticmethod
+    def _versioned_write(db: Session, incident_id: int, retry: bool, write: Callable[[], T]) -> T:
+        """
+        Run `write` (read, change, commit) and turn a concurrent write caught by
+        the version check of the UPDATE into VersionConflictError, or, when
+        `retry` (the client sent no version), run it again on the fresh row.
+        """
+        for attempt in range(1, VERSION_RETRIES + 1):
+            try:
+                return write()
+            except StaleDataError:
+                db.rollback()
+                if not retry or attempt == VERSION_RETRIES:
+                    logger.warning("Write refused: incident %s changed concurrently", incident_id)
+                    raise VersionConflictError(f"L'incident {incident_id} a été modifié entre-temps.")
+                logger.info("Incident %s changed concurrently, retrying (attempt %s)", incident_id, attempt + 1)
+
     # ─────────────────────────────────────────────
     # SUIVIS
     # ─────────────────────────────────────────────
@@ -146,38 +613,184 @@ class IncidentService:
         """
         Add a follow-up action to an existing incident.
         Also transitions incident status to EnCours if it was Ouvert.
+        When `data.versionIncident` is given, raises VersionConflictError if
+        the incident is at another version or the transition races another
+        write; without it, the transition is retried on the fresh row.
         Returns None if the incident is not found or is soft-deleted.
         """
-        logger.info(f"Adding suivi to incident {incident_id}")
-
-        incident = db.query(Incident).filter(
-            Incident.id == incident_id,
-            Incident.deleted == 0
-        ).first()
+        logger.info("Adding suivi to incident %s", incident_id)
+        return IncidentService._versioned_write(
+            db, incident_id, data.versionIncident is None, lambda: IncidentService._add_suivi(db, incident_id, data)
+        )
 
+    @staticmethod
+    def _add_suivi(db: Session, incident_id: int, data: SuiviCreate) -> Optional[SuiviIncident]:
+        incident = IncidentService._get_current(db, incident_id, data.versionIncident)
         if not incident:
-            logger.warning(f"Add suivi failed: incident {incident_id} not found")
+            logger.warning("Add suivi failed: incident %s not found", incident_id)
             return None
 
         # Business rule: auto-transition to EnCours when first suivi is added
         if incident.statut == StatutEnum.OUVERT:
+            before = StatsService.of(incident)
             incident.statut = StatutEnum.EN_COURS
-            logger.info(f"Incident {incident_id} status transitioned to EnCours")
+            StatsService.record(db, before, StatsService.of(incident))
+            logger.info("Incident %s status transitioned to EnCours", incident_id)
 
-        suivi = SuiviIncident(idIncident=incident_id, **data.model_dump())
+        suivi = SuiviIncident(idIncident=incident_id, **data.model_dump(exclude={"versionIncident"}))
         db.add(suivi)
+        db.flush()
+        SearchService.index_suivis(db, [(suivi.id, incident_id, suivi.actionsPrises)])
         db.commit()
-        db.refresh(suivi)
+        # statut, dateModification and version may have changed
+        incident_cache.invalidate(incident_id)
 
-        logger.info(f"Suivi {suivi.id} added to incident {incident_id}")
+        logger.info("Suivi %s added to incident %s", suivi.id, incident_id)
         return suivi
 
     @staticmethod
-    def get_suivis(db: Session, incident_id: int) -> List[SuiviIncident]:
+    def get_suivis(
+        db: Session, incident_id: int, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> List[SuiviIncident]:
         """
-        Retrieve all follow-ups for a given incident, ordered by date ascending.
+        Retrieve follow-ups for a given incident, ordered by date ascending.
+        Pages with a keyset cursor on (dateSuivi, id) when given.
+        Raises InvalidCursorError if the cursor is malformed.
         """
-        logger.debug(f"Fetching suivis for incident {incident_id}")
-        return db.query(SuiviIncident).filter(
+        logger.debug("Fetching suivis for incident %s (limit=%s, cursor=%s)", incident_id, limit, cursor)
+        query = db.query(SuiviIncident).filter(SuiviIncident.idIncident == incident_id)
+        if cursor:
+            values = decode_cursor(cursor, (date, int))
+            query = query.filter(keyset_predicate(SUIVIS_KEY, values, descending=False))
+        query = query.order_by(*(column.asc() for column in SUIVIS_KEY))
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def count_suivis(db: Session, incident_id: int) -> int:
+        """Count follow-ups for a given incident."""
+        return db.query(func.count(SuiviIncident.id)).filter(
             SuiviIncident.idIncident == incident_id
-        ).order_by(SuiviIncident.dateSuivi.asc()).all()
\ No newline at end of file
+        ).scalar()
+
+    # ─────────────────────────────────────────────
+    # VALIDATORS (ETag / Last-Modified)
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def incident_etag(incident_id: int, version: int) -> str:
+        """
+        Strong ETag of an incident representation, from its version counter:
+        bumped by every write, unlike dateModification whose precision (one
+        second on MySQL DATETIME) cannot tell two writes of the same second apart.
+        """
+        return strong_etag("incident", incident_id, version)
+
+    @staticmethod
+    def incident_version(db: Session, incident_id: int) -> Optional[tuple]:
+        """
+        (version, dateModification) of an active incident, None if not found or soft-deleted.
+        Read from the cached payload when present, else with a two-column query.
+        """
+        payload = incident_cache.get(incident_id)
+        if payload is not None:
+            return IncidentService.payload_version(payload)
+        row = db.execute(
+            select(Incident.version, Incident.dateModification).where(Incident.id == incident_id, Incident.deleted == 0)
+        ).first()
+        return tuple(row) if row else None
+
+    @staticmethod
+    def payload_version(payload: bytes) -> tuple:
+        """(version, dateModification) of a serialized incident."""
+        data = json.loads(payload)
+        return data["version"], datetime.fromisoformat(data["dateModification"])
+
+    @staticmethod
+    def patient_incidents_version(db: Session, patient_id: int) -> Optional[tuple]:
+        """
+        (active count, row count, max id, sum of versions, max dateModification)
+        of a patient's incidents, None if the patient does not exist.
+        Every write bumps one version (soft deletes included), creations raise
+        the max id and archiving lowers the row count: the first four values
+        identify the list version whatever the timestamp precision.
+        """
+        from app.models.patient import Patient
+
+        patient = Incident.idPatient == patient_id
+        row = db.execute(select(
+            select(func.count(Incident.id)).where(patient, Incident.deleted == 0).scalar_subquery(),
+            select(func.count(Incident.id)).where(patient).scalar_subquery(),
+            select(func.max(Incident.id)).where(patient).scalar_subquery(),
+            select(func.sum(Incident.version)).where(patient).scalar_subquery(),
+            select(func.max(Incident.dateModification)).where(patient).scalar_subquery(),
+        ).where(Patient.id == patient_id)).first()
+        return tuple(row) if row else None
+
+    @staticmethod
+    def suivis_version(db: Session, incident_id: int) -> Optional[tuple]:
+        """
+        (count, max id, max dateCreation) of an incident's suivis, None if the
+        incident is not found or soft-deleted. Suivis are append-only.
+        """
+        suivis = SuiviIncident.idIncident == incident_id
+        row = db.execute(select(
+            select(func.count(SuiviIncident.id)).where(suivis).scalar_subquery(),
+            select(func.max(SuiviIncident.id)).where(suivis).scalar_subquery(),
+            select(func.max(SuiviIncident.dateCreation)).where(suivis).scalar_subquery(),
+        ).where(Incident.id == incident_id, Incident.deleted == 0)).first()
+        return tuple(row) if row else None
+
+    # ─────────────────────────────────────────────
+    # EXPORT
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def filter_clauses(filters: IncidentFilter, model=Incident) -> list:
+        """Translate an IncidentFilter into WHERE clauses on Incident (or IncidentArchive)."""
+        clauses = []
+        if not filters.include_deleted:
+            clauses.append(model.deleted == 0)
+        if filters.date_from:
+            clauses.append(model.dateIncident >= filters.date_from)
+        if filters.date_to:
+            clauses.append(model.dateIncident <= filters.date_to)
+        if filters.gravite:
+            clauses.append(model.gravite.in_(filters.gravite))
+        if filters.statut:
+            clauses.append(model.statut.in_(filters.statut))
+        if filters.idMedecin is not None:
+            clauses.append(model.idMedecin == filters.idMedecin)
+        if filters.idImplant is not None:
+            clauses.append(model.idImplant == filters.idImplant)
+        if filters.idProcesseur is not None:
+            clauses.append(model.idProcesseur == filters.idProcesseur)
+        return clauses
+
+    @staticmethod
+    def export_incidents_statement(filters: IncidentFilter) -> Select:
+        """
+        Column-only SELECT of the incidents matching `filters`, in id order:
+        the current table and the archive (ids are kept when archiving).
+        """
+        rows = union_all(
+            select(*INCIDENT_EXPORT_COLUMNS).where(*IncidentService.filter_clauses(filters)),
+            select(*(getattr(IncidentArchive, c.key) for c in INCIDENT_EXPORT_COLUMNS)).where(
+                *IncidentService.filter_clauses(filters, IncidentArchive)
+            ),
+        ).subquery("export")
+        return select(rows).order_by(rows.c.id)
+
+    @staticmethod
+    def export_suivis_statement(filters: IncidentFilter) -> Select:
+        """Column-only SELECT of the suivis whose incident matches `filters`, archived ones included, in id order."""
+        rows = union_all(
+            select(*SUIVI_EXPORT_COLUMNS).join(
+                Incident, Incident.id == SuiviIncident.idIncident
+            ).where(*IncidentService.filter_clauses(filters)),
+            select(*(getattr(SuiviIncidentArchive, c.key) for c in SUIVI_EXPORT_COLUMNS)).join(
+                IncidentArchive, IncidentArchive.id == SuiviIncidentArchive.idIncident
+            ).where(*IncidentService.filter_clauses(filters, IncidentArchive)),
+        ).subquery("export")
+        return select(rows).order_by(rows.c.id)
@@ -0,0 +1,241 @@
+"""
+SearchService — full-text search over incident descriptions and suivi actions.
+
+Every search term must match (as a word prefix, so "électrode" also finds
+"électrodes"), accents and case ignored. Results are ranked by relevance
+(BM25 on SQLite FTS5, MATCH … AGAINST score on MySQL). Soft-deleted
+incidents and their suivis are excluded. Other databases fall back to an
+unranked ILIKE scan (substring match, accent-sensitive), most recent first.
+
+Only the SQLite FTS5 table needs explicit maintenance: IncidentService calls
+`index_*` on create and update and `unindex_incident` on soft delete, so the
+FTS5 query needs no join. MySQL FULLTEXT indexes are maintained by InnoDB,
+those calls are no-ops there and deleted incidents are filtered by a join.
+"""
+
+import html
+import logging
+import re
+import unicodedata
+from typing import Collection, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import delete, desc, func, insert, literal, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.models.incident import Incident
+from app.models.incident_search import INCIDENT_SEARCH_TABLE, incident_search
+from app.models.suivi_incident import SuiviIncident
+from app.schemas.search import SearchHit
+
+logger = logging.getLogger(__name__)
+
+# Shorter words are not indexed by InnoDB (innodb_ft_min_token_size) — ignored on both backends
+MIN_TERM_LENGTH = 3
+SNIPPET_WORDS = 16
+MARK_OPEN, MARK_CLOSE, ELLIPSIS = "<mark>", "</mark>", "…"
+# Placeholders for the marks in FTS5 snippets, replaced once the text is HTML-escaped
+# (Unicode private-use characters: never produced by clients' text input)
+SENTINEL_OPEN, SENTINEL_CLOSE = "\ue000", "\ue001"
+
+
+def mark_snippet(snippet: str) -> str:
+    """HTML-escape an FTS5 snippet built with the sentinels, then turn them into marks."""
+    return html.escape(snippet, quote=False).replace(SENTINEL_OPEN, MARK_OPEN).replace(SENTINEL_CLOSE, MARK_CLOSE)
+
+
+def _fold(value: str) -> str:
+    """Lower-case and strip accents, one output character per input character."""
+    return "".join(unicodedata.normalize("NFKD", c)[0] for c in value.lower())
+
+
+def highlight(body: str, terms: Sequence[str], words: int = SNIPPET_WORDS) -> str:
+    """
+    HTML snippet: window of `words` words around the first match, the text
+    HTML-escaped and each matching word wrapped in marks.
+    """
+    tokens = list(re.finditer(r"\w+", body))
+    if not tokens:
+        return html.escape(body, quote=False)
+    folded_terms = [_fold(term) for term in terms]
+    hits = [i for i, token in enumerate(tokens) if any(_fold(token.group()).startswith(t) for t in folded_terms)]
+    first = max(0, (hits[0] if hits else 0) - words // 4)
+    last = min(len(tokens), first + words)
+
+    # Whole text before the first word / after the last one when the window reaches them
+    parts, position = [], tokens[first].start() if first else 0
+    for i in range(first, last):
+        token = tokens[i]
+        parts.append(html.escape(body[position:token.start()], quote=False))
+        word = html.escape(token.group(), quote=False)
+        parts.append(f"{MARK_OPEN}{word}{MARK_CLOSE}" if i in hits else word)
+        position = token.end()
+    if last == len(tokens):
+        parts.append(html.escape(body[position:], quote=False))
+    return (ELLIPSIS if first else "") + "".join(parts) + (ELLIPSIS if last < len(tokens) else "")
+
+
+class SearchService:
+
+    @staticmethod
+    def terms(query: str) -> List[str]:
+        """Words of a user query that are long enough to be searched."""
+        return [word for word in re.findall(r"\w+", query) if len(word) >= MIN_TERM_LENGTH]
+
+    @staticmethod
+    def _fts5(db: Session) -> bool:
+        return db.get_bind().dialect.name == "sqlite"
+
+    # ─────────────────────────────────────────────
+    # SEARCH
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def search(db: Session, query: str, limit: int = 20) -> List[SearchHit]:
+        """
+        Ranked matches of `query` in active incidents and their suivis.
+        Raises ValueError if the query has no searchable word.
+        """
+        terms = SearchService.terms(query)
+        if not terms:
+            raise ValueError(f"La recherche doit contenir au moins un mot de {MIN_TERM_LENGTH} caractères.")
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            hits = SearchService._search_fts5(db, terms, limit)
+        elif dialect == "mysql":
+            hits = SearchService._search_mysql(db, terms, limit)
+        else:
+            hits = SearchService._search_like(db, terms, limit)
+        logger.debug("Search %s → %s hits", terms, len(hits))
+        return hits
+
+    @staticmethod
+    def _search_fts5(db: Session, terms: List[str], limit: int) -> List[SearchHit]:
+        # Each term quoted (no FTS5 syntax from user input) and prefix-matched; implicit AND
+        match = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        rows = db.execute(text(
+            f"SELECT kind, ref_id, incident_id, -bm25({INCIDENT_SEARCH_TABLE}) AS score, "
+            f"snippet({INCIDENT_SEARCH_TABLE}, 0, :open, :close, :ellipsis, :words) AS snippet "
+            f"FROM {INCIDENT_SEARCH_TABLE} WHERE {INCIDENT_SEARCH_TABLE} MATCH :match "
+            f"ORDER BY bm25({INCIDENT_SEARCH_TABLE}) LIMIT :limit"
+        ), {
+            "match": match, "limit": limit, "words": SNIPPET_WORDS,
+            "open": SENTINEL_OPEN, "close": SENTINEL_CLOSE, "ellipsis": ELLIPSIS,
+        }).all()
+        return [
+            SearchHit(type=kind, id=ref_id, idIncident=incident_id, score=score, snippet=mark_snippet(snippet))
+            for kind, ref_id, incident_id, score, snippet in rows
+        ]
+
+    @staticmethod
+    def _search_mysql(db: Session, terms: List[str], limit: int) -> List[SearchHit]:
+        from sqlalchemy.dialects.mysql import match
+
+        against = " ".join(f"+{term}*" for term in terms)
+        on_incident = match(Incident.description, against=against).in_boolean_mode()
+        on_suivi = match(SuiviIncident.actionsPrises, against=against).in_boolean_mode()
+        statement = union_all(
+            select(
+                literal("incident").label("kind"), Incident.id.label("ref_id"), Incident.id.label("incident_id"),
+                on_incident.label("score"), Incident.description.label("body")
+            ).where(on_incident, Incident.deleted == 0),
+            select(
+                literal("suivi").label("kind"), SuiviIncident.id, SuiviIncident.idIncident,
+                on_suivi, SuiviIncident.actionsPrises
+            ).join(Incident, Incident.id == SuiviIncident.idIncident).where(on_suivi, Incident.deleted == 0),
+        ).order_by(desc("score")).limit(limit)
+        return [
+            SearchHit(type=kind, id=ref_id, idIncident=incident_id, score=score, snippet=highlight(body, terms))
+            for kind, ref_id, incident_id, score, body in db.execute(statement).all()
+        ]
+
+    @staticmethod
+    def _search_like(db: Session, terms: List[str], limit: int) -> List[SearchHit]:
+        """Fallback without a full-text index: every term as a case-insensitive substring, score 0."""
+        def matches(column) -> list:
+            # Terms are \w+ words: "_" is the only LIKE wildcard they can hold
+            return [column.ilike("%{}%".format(term.replace("_", "\\_")), escape="\\") for term in terms]
+
+        statement = union_all(
+            select(
+                literal("incident").label("kind"), Incident.id.label("ref_id"), Incident.id.label("incident_id"),
+                Incident.description.label("body")
+            ).where(*matches(Incident.description), Incident.deleted == 0),
+            select(
+                literal("suivi"), SuiviIncident.id, SuiviIncident.idIncident, SuiviIncident.actionsPrises
+            ).join(Incident, Incident.id == SuiviIncident.idIncident).where(
+                *matches(SuiviIncident.actionsPrises), Incident.deleted == 0
+            ),
+        ).order_by(desc("incident_id"), desc("ref_id")).limit(limit)
+        return [
+            SearchHit(type=kind, id=ref_id, idIncident=incident_id, score=0.0, snippet=highlight(body, terms))
+            for kind, ref_id, incident_id, body in db.execute(statement).all()
+        ]
+
+    # ─────────────────────────────────────────────
+    # INDEX MAINTENANCE (FTS5)
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def _write(db: Session, rows: List[dict]) -> None:
+        if rows:
+            db.execute(insert(incident_search).prefix_with("OR REPLACE"), rows)
+
+    @staticmethod
+    def index_incidents(db: Session, incidents: Iterable[Tuple[int, str]]) -> None:
+        """(Re)index (id, description) pairs. Does not commit."""
+        if SearchService._fts5(db):
+            SearchService._write(db, [
+                {"rowid": 2 * incident_id, "body": description, "kind": "incident",
+                 "ref_id": incident_id, "incident_id": incident_id}
+                for incident_id, description in incidents
+            ])
+
+    @staticmethod
+    def index_suivis(db: Session, suivis: Iterable[Tuple[int, int, str]]) -> None:
+        """(Re)index (id, idIncident, actionsPrises) triples. Does not commit."""
+        if SearchService._fts5(db):
+            SearchService._write(db, [
+                {"rowid": 2 * suivi_id + 1, "body": actions, "kind": "suivi",
+                 "ref_id": suivi_id, "incident_id": incident_id}
+                for suivi_id, incident_id, actions in suivis
+            ])
+
+    @staticmethod
+    def unindex_incident(db: Session, incident_id: int) -> None:
+        """Remove an incident and its suivis from the index. Does not commit."""
+        SearchService.unindex_incidents(db, [incident_id])
+
+    @staticmethod
+    def unindex_incidents(db: Session, incident_ids: Collection[int]) -> None:
+        """Remove incidents and their suivis from the index, before the suivis rows are deleted. Does not commit."""
+        if incident_ids and SearchService._fts5(db):
+            db.execute(delete(incident_search).where(incident_search.c.rowid.in_(
+                select(2 * SuiviIncident.id + 1).where(SuiviIncident.idIncident.in_(incident_ids))
+                .union_all(select(2 * Incident.id).where(Incident.id.in_(incident_ids)))
+            )))
+
+    @staticmethod
+    def reindex(db: Session) -> int:
+        """Rebuild the index from active incidents and their suivis. Returns the number of indexed texts."""
+        if SearchService._fts5(db):
+            columns = ["rowid", "body", "kind", "ref_id", "incident_id"]
+            db.execute(delete(incident_search))
+            db.execute(insert(incident_search).from_select(columns, select(
+                2 * Incident.id, Incident.description, literal("incident"), Incident.id, Incident.id
+            ).where(Incident.deleted == 0)))
+            db.execute(insert(incident_search).from_select(columns, select(
+                2 * SuiviIncident.id + 1, SuiviIncident.actionsPrises, literal("suivi"),
+                SuiviIncident.id, SuiviIncident.idIncident
+            ).join(Incident, Incident.id == SuiviIncident.idIncident).where(Incident.deleted == 0)))
+        elif db.get_bind().dialect.name == "mysql":
+            # InnoDB maintains FULLTEXT indexes; OPTIMIZE merges their pending changes
+            db.execute(text("OPTIMIZE TABLE incidents, suivis_incidents"))
+        db.commit()
+
+        count = db.execute(select(func.count(Incident.id)).where(Incident.deleted == 0)).scalar() + db.execute(
+            select(func.count(SuiviIncident.id))
+            .join(Incident, Incident.id == SuiviIncident.idIncident).where(Incident.deleted == 0)
+        ).scalar()
+        logger.info("Search index rebuilt: %s texts", count)
+        return count
@@ -0,0 +1,209 @@
+"""
+StatsService — incident counts maintained incrementally in `incident_stats`.
+
+Each active (non-deleted) incident counts once in every dimension:
+total, gravite, statut, mois (YYYY-MM of dateIncident), idImplant and
+idProcesseur (incidents without implant / processor are not counted there).
+
+IncidentService records the bucket changes of each write in the same
+transaction as the write itself, as `count = count ± n` upserts, so reads
+never touch the incidents table. `rebuild` and `check` recompute everything
+from the incidents table for the admin command (python -m app.tools.stats).
+Archived incidents (incidents_archive) keep counting: moving an incident to
+the archive leaves the counts unchanged.
+"""
+
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Mapping, Tuple
+
+from sqlalchemy import delete, extract, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.incident import Incident
+from app.models.incident_archive import IncidentArchive
+from app.models.incident_stat import IncidentStat
+from app.schemas.stats import IncidentStatsResponse
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ("total", "gravite", "statut", "mois", "idImplant", "idProcesseur")
+TOTAL_BUCKET = "all"
+
+
+def _label(value) -> str:
+    return getattr(value, "value", value)
+
+
+class StatsService:
+
+    # ─────────────────────────────────────────────
+    # INCREMENTAL MAINTENANCE
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def buckets(gravite, statut, dateIncident, idImplant=None, idProcesseur=None, **_) -> Dict[str, str]:
+        """Bucket of an active incident in each dimension, from its column values."""
+        buckets = {
+            "total": TOTAL_BUCKET,
+            "gravite": _label(gravite),
+            "statut": _label(statut),
+            "mois": dateIncident.strftime("%Y-%m"),
+        }
+        if idImplant is not None:
+            buckets["idImplant"] = str(idImplant)
+        if idProcesseur is not None:
+            buckets["idProcesseur"] = str(idProcesseur)
+        return buckets
+
+    @staticmethod
+    def of(incident: Incident) -> Dict[str, str]:
+        """Buckets an incident currently counts in (none once soft-deleted)."""
+        if incident.deleted:
+            return {}
+        return StatsService.buckets(
+            gravite=incident.gravite, statut=incident.statut, dateIncident=incident.dateIncident,
+            idImplant=incident.idImplant, idProcesseur=incident.idProcesseur
+        )
+
+    @staticmethod
+    def record(db: Session, before: Mapping[str, str], after: Mapping[str, str]) -> None:
+        """Move one incident from its `before` buckets to its `after` buckets. Does not commit."""
+        deltas = Counter()
+        for dimension, bucket in before.items():
+            deltas[(dimension, bucket)] -= 1
+        for dimension, bucket in after.items():
+            deltas[(dimension, bucket)] += 1
+        StatsService._apply(db, deltas)
+
+    @staticmethod
+    def record_many(db: Session, created: Iterable[Mapping[str, str]]) -> None:
+        """Count a batch of new incidents with one upsert. Does not commit."""
+        deltas = Counter()
+        for buckets in created:
+            for dimension, bucket in buckets.items():
+                deltas[(dimension, bucket)] += 1
+        StatsService._apply(db, deltas)
+
+    @staticmethod
+    def record_moves(db: Session, dimension: str, moves: Mapping[Tuple[str, str], int]) -> None:
+        """Move active incidents within one dimension: n from `before` to `after` per ((before, after), n). Does not commit."""
+        deltas = Counter()
+        for (before, after), n in moves.items():
+            deltas[(dimension, _label(before))] -= n
+            deltas[(dimension, _label(after))] += n
+        StatsService._apply(db, deltas)
+
+    @staticmethod
+    def _apply(db: Session, deltas: Counter) -> None:
+        rows = [
+            {"dimension": dimension, "bucket": bucket, "count": delta}
+            for (dimension, bucket), delta in sorted(deltas.items()) if delta
+        ]
+        if not rows:
+            return
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+            statement = mysql_insert(IncidentStat)
+            statement = statement.on_duplicate_key_update(count=IncidentStat.count + statement.inserted.count)
+            db.execute(statement, rows)
+        elif dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as upsert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as upsert
+
+            statement = upsert(IncidentStat)
+            statement = statement.on_conflict_do_update(
+                index_elements=[IncidentStat.dimension, IncidentStat.bucket],
+                set_={"count": IncidentStat.count + statement.excluded.count}
+            )
+            db.execute(statement, rows)
+        else:
+            for row in rows:
+                result = db.execute(update(IncidentStat).where(
+                    IncidentStat.dimension == row["dimension"], IncidentStat.bucket == row["bucket"]
+                ).values(count=IncidentStat.count + row["count"]))
+                if not result.rowcount:
+                    db.execute(insert(IncidentStat).values(**row))
+
+    # ─────────────────────────────────────────────
+    # READ
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def stored(db: Session) -> Dict[tuple, int]:
+        """Non-zero counts of the summary table, keyed by (dimension, bucket)."""
+        rows = db.execute(select(IncidentStat.dimension, IncidentStat.bucket, IncidentStat.count)).all()
+        return {(dimension, bucket): count for dimension, bucket, count in rows if count}
+
+    @staticmethod
+    def get(db: Session) -> IncidentStatsResponse:
+        """Incident counts per dimension, read from the summary table only."""
+        counts = {dimension: {} for dimension in DIMENSIONS}
+        for (dimension, bucket), count in sorted(StatsService.stored(db).items()):
+            if dimension in counts:
+                counts[dimension][bucket] = count
+        total = counts.pop("total").get(TOTAL_BUCKET, 0)
+        return IncidentStatsResponse(total=total, **counts)
+
+    # ─────────────────────────────────────────────
+    # FULL RECOUNT (admin)
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def recount(db: Session) -> Dict[tuple, int]:
+        """Counts recomputed with GROUP BY queries over the incidents and incidents_archive tables."""
+        counts = Counter()
+        for model in (Incident, IncidentArchive):
+            counts.update(StatsService._recount(db, model))
+        return {key: count for key, count in counts.items() if count}
+
+    @staticmethod
+    def _recount(db: Session, model) -> Dict[tuple, int]:
+        active = model.deleted == 0
+        counts = {("total", TOTAL_BUCKET): db.execute(select(func.count(model.id)).where(active)).scalar()}
+        for dimension, column in (
+            ("gravite", model.gravite), ("statut", model.statut),
+            ("idImplant", model.idImplant), ("idProcesseur", model.idProcesseur),
+        ):
+            rows = db.execute(
+                select(column, func.count(model.id)).where(active, column.is_not(None)).group_by(column)
+            ).all()
+            counts.update({(dimension, str(_label(value))): count for value, count in rows})
+
+        year, month = extract("year", model.dateIncident), extract("month", model.dateIncident)
+        rows = db.execute(select(year, month, func.count(model.id)).where(active).group_by(year, month)).all()
+        counts.update({("mois", f"{int(y):04d}-{int(m):02d}"): count for y, m, count in rows})
+        return counts
+
+    @staticmethod
+    def check(db: Session) -> Dict[tuple, tuple]:
+        """Differences between the summary table and a full recount: {key: (stored, actual)}."""
+        stored, actual = StatsService.stored(db), StatsService.recount(db)
+        return {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in sorted(stored.keys() | actual.keys())
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Replace the summary table with a full recount, in one transaction.
+        Returns the number of buckets. Writes committed while it runs may be
+        missed: run it off-peak and confirm with `check`.
+        """
+        counts = StatsService.recount(db)
+        db.execute(delete(IncidentStat))
+        if counts:
+            db.execute(insert(IncidentStat), [
+                {"dimension": dimension, "bucket": bucket, "count": count}
+                for (dimension, bucket), count in sorted(counts.items())
+            ])
+        db.commit()
+        logger.info("Incident stats rebuilt: %s buckets", len(counts))
+        return len(counts)
@@ -0,0 +1 @@
+"""Administration commands, run with `python -m app.tools.<command>`."""
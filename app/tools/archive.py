@@ -0,0 +1,39 @@
+"""
+Move soft-deleted and long-closed incidents to the archive tables.
+
+    python -m app.tools.archive                       # FERME for ARCHIVE_AFTER_MONTHS months, and deleted
+    python -m app.tools.archive --months 36 --pause 0.5
+"""
+
+import argparse
+import logging
+import sys
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.services.archive_service import ArchiveService
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.archive", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--months", type=int, default=settings.ARCHIVE_AFTER_MONTHS,
+                        help="archive incidents closed (FERME) with no change for this many months")
+    parser.add_argument("--batch", type=int, default=settings.ARCHIVE_BATCH_SIZE,
+                        help="incidents moved per transaction")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="seconds to sleep between batches, to leave room for the live traffic")
+    args = parser.parse_args(argv)
+    if args.months < 0 or args.batch < 1 or args.pause < 0:
+        parser.error("--months and --pause must be ≥ 0, --batch ≥ 1")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    with SessionLocal() as db:
+        counts = ArchiveService.run(db, args.months, args.batch, pause=args.pause)
+    print(f"archived: {counts['incidents']} incidents, {counts['suivis']} suivis")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""
+Maintain the full-text search index.
+
+    python -m app.tools.search reindex   # rebuild the index from incidents and suivis
+"""
+
+import argparse
+import logging
+import sys
+
+from app.database import SessionLocal
+from app.services.search_service import SearchService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.search", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["reindex"])
+    parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    with SessionLocal() as db:
+        count = SearchService.reindex(db)
+    print(f"search index rebuilt: {count} texts")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
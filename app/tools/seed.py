@@ -0,0 +1,298 @@
+"""
+Fill DATABASE_URL with a synthetic, production-shaped dataset (load and capacity testing).
+
+    python -m app.tools.seed                                    # 10k patients, 1M incidents, ~5M suivis
+    python -m app.tools.seed --scale 0.1 --workers 4            # a tenth of it, 4 writer processes
+    python -m app.tools.seed --incidents 5000000 --suivis 20000000 --seed 7 --reset
+
+Shape:
+- incidents per patient follow a power law: the first 1 % of the patients
+  (the "hot" ones) carry about a fifth of the incidents;
+- suivis per incident are exponentially distributed around suivis / incidents,
+  so the suivis total is approximate;
+- gravite / statut follow the register's proportions (mostly MINEUR, mostly
+  resolved); 2 % of the incidents are soft-deleted;
+- nine patients in ten have an implant.
+
+Rows get explicit ids and are written with executemany Core inserts, one
+transaction per batch. Each table is cut into fixed chunks, each generated
+from its own random stream (seed, table, chunk): the data depends only on the
+seed and the volumes, not on --workers. The incident_stats table and the
+search index are rebuilt at the end.
+
+The tables must be empty; --reset drops and recreates them (all data is lost).
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from bisect import bisect
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta
+from itertools import accumulate
+from typing import Callable, Iterator, List, Tuple
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.database import Base
+from app.models import Incident, Medecin, Patient, SuiviIncident
+from app.models.incident import GraviteEnum, StatutEnum
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+BATCH = 10000
+# Rows of a table generated from one random stream, by one worker
+CHUNK = 50000
+FIRST_DAY = date(2019, 1, 1)
+DAYS = 7 * 365
+
+GRAVITES = (GraviteEnum.MINEUR, GraviteEnum.MODERE, GraviteEnum.MAJEUR, GraviteEnum.CRITIQUE)
+GRAVITE_WEIGHTS = (55, 28, 13, 4)
+STATUTS = (StatutEnum.OUVERT, StatutEnum.EN_COURS, StatutEnum.RESOLU, StatutEnum.FERME)
+STATUT_WEIGHTS = (15, 20, 40, 25)
+
+NOMS = ("Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau")
+PRENOMS = ("Jean", "Claire", "Louis", "Emma", "Hugo", "Léa", "Paul", "Chloé", "Lucas", "Manon")
+# Descriptions: ordinary words plus one or two clinical terms, so each term
+# occurs in a few percent of the rows as in the real register
+FILLER = (
+    "le la les un une des du de patient signale depuis hier matin soir lors après avant pendant "
+    "séance contrôle côté droit gauche léger important intermittent permanent constaté rapporté "
+    "par famille médecin audioprothésiste rendez-vous semaine dernière suite changement"
+).split()
+CLINICAL = (
+    "calibration processeur électrode impédance aimant douleur migration antenne volume acouphène "
+    "vertige infection cicatrice batterie câble microphone mapping seuil stimulation grésillement"
+).split() + ["perte de son", "son faible"]
+ACTIONS = (
+    "Recalibration effectuée", "Changement de l'antenne", "Mesure des impédances", "Remplacement du câble",
+    "Réglage du mapping", "Orientation vers l'ORL", "Contrôle radiologique", "Appel du patient",
+)
+
+
+@dataclass(frozen=True)
+class Volumes:
+    patients: int = 10_000
+    incidents: int = 1_000_000
+    suivis: int = 5_000_000
+
+    @property
+    def medecins(self) -> int:
+        return max(10, self.patients // 200)
+
+    def scaled(self, factor: float) -> "Volumes":
+        return Volumes(*(max(1, int(n * factor)) for n in (self.patients, self.incidents, self.suivis)))
+
+
+def _rng(seed: int, table: str, chunk: int) -> random.Random:
+    return random.Random(f"{seed}/{table}/{chunk}")
+
+
+def _weighted(rng: random.Random, values: tuple, weights: tuple) -> Callable[[], object]:
+    cumulative = list(accumulate(weights))
+    total = cumulative[-1]
+    return lambda: values[bisect(cumulative, rng.random() * total)]
+
+
+def hot_patient(rng: random.Random, patients: int) -> int:
+    """Patient id drawn with the incidents' power-law skew (low ids are the hot patients)."""
+    return int(patients * rng.random() ** 3) + 1
+
+
+def _description(rng: random.Random) -> str:
+    words = rng.choices(FILLER, k=rng.randint(6, 30))
+    for term in rng.sample(CLINICAL, rng.randint(1, 2)):
+        words.insert(rng.randrange(len(words)), term)
+    return " ".join(words).capitalize()
+
+
+# ─────────────────────────────────────────────
+# ROWS — one chunk of a table, ids [first, last]
+# ─────────────────────────────────────────────
+
+def _medecins(seed: int, chunk: int, first: int, last: int, volumes: Volumes) -> Iterator[dict]:
+    for i in range(first, last + 1):
+        yield {"id": i, "nom": NOMS[i % len(NOMS)], "prenom": PRENOMS[i % len(PRENOMS)], "specialite": "ORL"}
+
+
+def _patients(seed: int, chunk: int, first: int, last: int, volumes: Volumes) -> Iterator[dict]:
+    rng = _rng(seed, "patients", chunk)
+    for i in range(first, last + 1):
+        yield {
+            "id": i, "nom": rng.choice(NOMS), "prenom": rng.choice(PRENOMS),
+            "dateNaissance": date(1940, 1, 1) + timedelta(days=rng.randrange(80 * 365)),
+            "sexe": rng.choice(("Masculin", "Féminin")),
+            # Implant id = patient id
+            "idImplant": i if rng.random() < 0.9 else None,
+        }
+
+
+def _incidents(seed: int, chunk: int, first: int, last: int, volumes: Volumes) -> Iterator[dict]:
+    rng = _rng(seed, "incidents", chunk)
+    gravite = _weighted(rng, GRAVITES, GRAVITE_WEIGHTS)
+    statut = _weighted(rng, STATUTS, STATUT_WEIGHTS)
+    for i in range(first, last + 1):
+        patient = hot_patient(rng, volumes.patients)
+        day = FIRST_DAY + timedelta(days=rng.randrange(DAYS))
+        created = datetime.combine(day, dtime(rng.randrange(24), rng.randrange(60)))
+        yield {
+            "id": i, "dateIncident": day, "heureIncident": created.time(), "gravite": gravite(), "statut": statut(),
+            "description": _description(rng), "idPatient": patient,
+            "idImplant": patient if rng.random() < 0.8 else None,
+            "idProcesseur": rng.randrange(1, 2 * volumes.patients) if rng.random() < 0.7 else None,
+            "idMedecin": rng.randrange(1, volumes.medecins + 1),
+            "dateCreation": created, "dateModification": created + timedelta(days=rng.randrange(30)),
+            "deleted": int(rng.random() < 0.02),
+        }
+
+
+def suivi_counts(seed: int, chunk: int, first: int, last: int, volumes: Volumes) -> List[int]:
+    """Number of suivis of each incident of an incident chunk."""
+    rng = _rng(seed, "suivi-counts", chunk)
+    rate = volumes.incidents / volumes.suivis
+    return [int(rng.expovariate(rate) + 0.5) for _ in range(first, last + 1)]
+
+
+def _suivis(seed: int, chunk: int, first: int, last: int, volumes: Volumes, first_suivi: int) -> Iterator[dict]:
+    rng = _rng(seed, "suivis", chunk)
+    start = datetime.combine(FIRST_DAY, dtime())
+    suivi_id = first_suivi
+    for incident, count in zip(range(first, last + 1), suivi_counts(seed, chunk, first, last, volumes)):
+        for k in range(count):
+            yield {
+                "id": suivi_id, "dateSuivi": FIRST_DAY + timedelta(days=rng.randrange(DAYS)),
+                "actionsPrises": f"{rng.choice(ACTIONS)} ({k + 1})", "idIncident": incident,
+                "idMedecin": rng.randrange(1, volumes.medecins + 1),
+                "dateCreation": start + timedelta(minutes=suivi_id),
+            }
+            suivi_id += 1
+
+
+TABLES = {"medecins": (Medecin, _medecins), "patients": (Patient, _patients),
+          "incidents": (Incident, _incidents), "suivis": (SuiviIncident, _suivis)}
+
+
+# ─────────────────────────────────────────────
+# WRITERS
+# ─────────────────────────────────────────────
+
+def _engine(database_url: str):
+    connect_args = {}
+    if make_url(database_url).get_backend_name() == "sqlite":
+        # Writer processes take turns on the database lock
+        connect_args["timeout"] = 600
+    return create_engine(database_url, connect_args=connect_args)
+
+
+def write_chunk(database_url: str, table: str, chunk: int, first: int, last: int,
+                volumes: Volumes, seed: int, batch: int, *extra) -> int:
+    """Generate and insert one chunk, committing every `batch` rows. Returns the row count."""
+    model, rows = TABLES[table]
+    engine = _engine(database_url)
+    written = 0
+    try:
+        with engine.connect() as conn:
+            pending = []
+            for row in rows(seed, chunk, first, last, volumes, *extra):
+                pending.append(row)
+                if len(pending) == batch:
+                    conn.execute(insert(model), pending)
+                    conn.commit()
+                    written += len(pending)
+                    pending = []
+            if pending:
+                conn.execute(insert(model), pending)
+                conn.commit()
+                written += len(pending)
+    finally:
+        engine.dispose()
+    return written
+
+
+def _chunks(count: int) -> List[Tuple[int, int, int]]:
+    """(chunk, first id, last id) covering ids 1..count."""
+    return [(chunk, first, min(first + CHUNK - 1, count)) for chunk, first in enumerate(range(1, count + 1, CHUNK))]
+
+
+def generate(database_url: str, volumes: Volumes, seed: int = 42, workers: int = 1, batch: int = BATCH) -> dict:
+    """Insert the dataset into empty tables, then rebuild incident_stats and the search index. Returns row counts."""
+    jobs = [("medecins", *c) for c in _chunks(volumes.medecins)]
+    jobs += [("patients", *c) for c in _chunks(volumes.patients)]
+    jobs += [("incidents", *c) for c in _chunks(volumes.incidents)]
+    # Suivi ids of an incident chunk start after the suivis of the previous chunks
+    first_suivi = 1
+    for chunk, first, last in _chunks(volumes.incidents):
+        jobs.append(("suivis", chunk, first, last, first_suivi))
+        first_suivi += sum(suivi_counts(seed, chunk, first, last, volumes))
+
+    counts = dict.fromkeys(TABLES, 0)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (table, pool.submit(write_chunk, database_url, table, chunk, first, last, volumes, seed, batch, *extra))
+                for table, chunk, first, last, *extra in jobs
+            ]
+            for table, future in futures:
+                counts[table] += future.result()
+    else:
+        for table, chunk, first, last, *extra in jobs:
+            counts[table] += write_chunk(database_url, table, chunk, first, last, volumes, seed, batch, *extra)
+
+    engine = _engine(database_url)
+    try:
+        with sessionmaker(bind=engine)() as db:
+            StatsService.rebuild(db)
+            SearchService.reindex(db)
+    finally:
+        engine.dispose()
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.seed", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--patients", type=int, default=Volumes.patients)
+    parser.add_argument("--incidents", type=int, default=Volumes.incidents)
+    parser.add_argument("--suivis", type=int, default=Volumes.suivis, help="approximate total")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the three volumes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1, help="writer processes")
+    parser.add_argument("--batch", type=int, default=BATCH, help="rows per INSERT / transaction")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate the tables first")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    volumes = Volumes(args.patients, args.incidents, args.suivis).scaled(args.scale)
+    engine = _engine(settings.DATABASE_URL)
+    try:
+        if args.reset:
+            Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with engine.connect() as conn:
+            existing = conn.execute(select(func.count()).select_from(Incident)).scalar()
+    finally:
+        engine.dispose()
+    if existing:
+        print(f"{existing} incidents already present: run with --reset to replace them")
+        return 1
+
+    start = time.perf_counter()
+    counts = generate(settings.DATABASE_URL, volumes, args.seed, args.workers, args.batch)
+    elapsed = time.perf_counter() - start
+    rows = sum(counts.values())
+    print(", ".join(f"{n} {table}" for table, n in counts.items()))
+    print(f"{rows} rows in {elapsed:.1f}s ({rows / elapsed * 60:,.0f} rows/min, stats and search index included)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
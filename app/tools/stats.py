@@ -0,0 +1,40 @@
+"""
+Maintain the incident statistics summary table.
+
+    python -m app.tools.stats check     # compare with a full recount, exit 1 on drift
+    python -m app.tools.stats rebuild   # recompute from the incidents (and archive) tables
+"""
+
+import argparse
+import logging
+import sys
+
+from app.database import SessionLocal
+from app.services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.stats", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["check", "rebuild"])
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    with SessionLocal() as db:
+        if args.command == "rebuild":
+            buckets = StatsService.rebuild(db)
+            print(f"incident_stats rebuilt: {buckets} buckets")
+
+        differences = StatsService.check(db)
+        for (dimension, bucket), (stored, actual) in differences.items():
+            print(f"{dimension}={bucket}: stored {stored}, actual {actual}")
+        if differences:
+            print(f"incident_stats: {len(differences)} bucket(s) out of sync")
+            return 1
+        print("incident_stats: in sync")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
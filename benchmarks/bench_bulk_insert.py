@@ -0,0 +1,93 @@
+"""
+Benchmark: POST /api/incidents/ in a loop vs one POST /api/incidents/bulk.
+
+Usage:
+    python -m benchmarks.bench_bulk_insert --rows 2000
+    python -m benchmarks.bench_bulk_insert --rows 5000 --database-url mysql+pymysql://...
+
+Without --database-url, a throwaway SQLite file is used.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+from app.models.patient import Patient
+
+
+def _payload(patient_id: int, i: int) -> dict:
+    return {
+        "dateIncident": "2024-03-20",
+        "heureIncident": "14:30:00",
+        "gravite": "MINEUR",
+        "description": f"Incident importé du fichier fabricant n°{i}",
+        "idPatient": patient_id,
+    }
+
+
+def run(database_url: str, rows: int) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    SessionBench = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with SessionBench() as db:
+        patient = Patient(nom="Bench", prenom="Patient")
+        db.add(patient)
+        db.commit()
+        patient_id = patient.id
+
+    def override_get_db():
+        with SessionBench() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)  # no lifespan: tables are created above
+    try:
+        start = time.perf_counter()
+        for i in range(rows):
+            client.post("/api/incidents/", json=_payload(patient_id, i)).raise_for_status()
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = client.post("/api/incidents/bulk", json={"items": [_payload(patient_id, i) for i in range(rows)]})
+        response.raise_for_status()
+        bulk = time.perf_counter() - start
+        assert response.json()["created"] == rows
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    return {
+        "rows": rows,
+        "single_rows_per_s": rows / single,
+        "bulk_rows_per_s": rows / bulk,
+        "speedup": single / bulk,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        result = run(url, args.rows)
+
+    print(f"rows              : {result['rows']}")
+    print(f"single endpoint   : {result['single_rows_per_s']:10.0f} rows/s")
+    print(f"bulk endpoint     : {result['bulk_rows_per_s']:10.0f} rows/s")
+    print(f"speedup           : {result['speedup']:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: GET /api/incidents payload size and latency, full rows vs sparse fieldsets.
+
+Usage:
+    python -m benchmarks.bench_fields --limit 500
+    python -m benchmarks.bench_fields --limit 500 --database-url mysql+pymysql://...
+
+Seeds --rows incidents with descriptions of up to 2000 characters, then
+requests one page of --limit incidents through the ASGI app (middlewares
+included, no network): every column as an array of objects, the dashboard
+fields (id, gravite, statut, dateIncident, idPatient) as objects, then the
+same fields with format=columnar. Reports the body size and the p50 latency.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+from app.models.incident import GraviteEnum, Incident, StatutEnum
+from app.models.patient import Patient
+
+DASHBOARD_FIELDS = "id,gravite,statut,dateIncident,idPatient"
+VARIANTS = {
+    "all fields, objects": "",
+    "dashboard fields, objects": f"&fields={DASHBOARD_FIELDS}",
+    "dashboard fields, columnar": f"&fields={DASHBOARD_FIELDS}&format=columnar",
+}
+
+
+def seed(engine, rows: int) -> None:
+    SessionBench = sessionmaker(bind=engine)
+    with SessionBench() as db:
+        patient = Patient(nom="Bench", prenom="Patient")
+        db.add(patient)
+        db.commit()
+        db.execute(insert(Incident), [{
+            "dateIncident": date(2024, 1, 1) + timedelta(days=i % 365), "heureIncident": dtime(12, 0),
+            "gravite": GraviteEnum.MAJEUR, "statut": StatutEnum.OUVERT, "idPatient": patient.id,
+            "dateCreation": datetime(2024, 1, 1) + timedelta(seconds=i),
+            "description": f"Perte de son côté droit après séance de réglage n°{i}. " * (1 + i % 35),
+        } for i in range(rows)])
+        db.commit()
+
+
+def run(database_url: str, rows: int, limit: int, repeat: int) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed(engine, rows)
+    SessionBench = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        with SessionBench() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    results = {}
+    try:
+        with TestClient(app) as client:
+            for name, query in VARIANTS.items():
+                url = f"/api/incidents/?limit={limit}{query}"
+                size = len(client.get(url).content)
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    client.get(url)
+                    timings.append(time.perf_counter() - start)
+                results[name] = (size, statistics.median(timings) * 1000)
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=500, help="page size (the route allows up to 500)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        results = run(url, args.rows, args.limit, args.repeat)
+
+    full_size, full_ms = results["all fields, objects"]
+    print(f"page size: {args.limit} incidents")
+    for name, (size, ms) in results.items():
+        print(f"{name:<28}: {size:>10,} bytes ({size / full_size:>5.1%})   p50 {ms:>7.2f} ms ({full_ms / ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: cost of a log call on the calling thread, before / after the queue pipeline.
+
+Usage:
+    python -m benchmarks.bench_logging --calls 100000
+
+- before   : logging.basicConfig-style StreamHandler (text format), f-string message
+- queue    : app.core.logs pipeline (QueueHandler → JSON on a listener thread), %-style arguments
+- sampled  : same pipeline with the logger sampled at --rate
+- disabled : %-style call below the logger level (arguments never formatted)
+
+Output goes to a temporary file, optionally slowed down by --sink-latency-us
+per write (a terminal, or a container log pipe under backpressure). Times are
+per call, measured on the caller; the queue variants also report the time the
+listener needed to drain.
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+from app.core.logs import RequestIdFilter, build_pipeline, request_id_var
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+
+class SlowStream:
+    """File wrapper spending `latency` seconds in each write."""
+
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data: str) -> None:
+        deadline = time.perf_counter() + self.latency
+        self.stream.write(data)
+        while time.perf_counter() < deadline:
+            pass
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def _logger(name: str, handler: logging.Handler, level=logging.INFO) -> logging.Logger:
+    logger = logging.getLogger(f"bench.{name}")
+    logger.handlers[:] = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+def _per_call_us(function, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        function(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(calls: int, rate: float, sink_latency: float) -> dict:
+    results = {}
+    with tempfile.TemporaryFile("w+") as file:
+        out = SlowStream(file, sink_latency) if sink_latency else file
+        handler = logging.StreamHandler(out)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt="%Y-%m-%d %H:%M:%S"))
+        handler.addFilter(RequestIdFilter())
+        logger = _logger("before", handler)
+        patient = 42
+        logging.logThreads = logging.logProcesses = logging.logMultiprocessing = True
+        before = _per_call_us(lambda i: logger.info(f"Creating incident {i} for patient {patient}"), calls)
+        results["before"] = (before, 0.0)
+
+        # As configure_logging does
+        logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+        for name, sampling in (("queue", None), ("sampled", {"bench.sampled": rate})):
+            queue_handler, listener = build_pipeline(out, fmt="json", sampling=sampling)
+            logger = _logger(name, queue_handler)
+            listener.start()
+            per_call = _per_call_us(lambda i: logger.info("Creating incident %s for patient %s", i, patient), calls)
+            start = time.perf_counter()
+            listener.stop()
+            results[name] = (per_call, time.perf_counter() - start)
+
+        logger = _logger("disabled", handler, level=logging.WARNING)
+        disabled = _per_call_us(lambda i: logger.debug("Creating incident %s for patient %s", i, patient), calls)
+        results["disabled"] = (disabled, 0.0)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--rate", type=float, default=0.1, help="sampling rate of the `sampled` variant")
+    parser.add_argument("--sink-latency-us", type=float, default=0.0, help="extra time spent in each write")
+    args = parser.parse_args()
+
+    token = request_id_var.set("bench")
+    try:
+        results = run(args.calls, args.rate, args.sink_latency_us / 1e6)
+    finally:
+        request_id_var.reset(token)
+
+    print(f"{'variant':10} {'caller µs/call':>15} {'listener drain':>15}")
+    for name, (per_call, drain) in results.items():
+        print(f"{name:10} {per_call:15.2f} {drain:14.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: GET /api/search latency (full-text index) vs a LIKE '%…%' scan.
+
+Usage:
+    python -m benchmarks.bench_search --rows 1000000
+    python -m benchmarks.bench_search --rows 1000000 --database-url mysql+pymysql://...
+
+Without --database-url, a throwaway SQLite file (FTS5 index) is used.
+Seeding 1M rows takes a few minutes; use --rows 100000 for a quick run.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, time as dtime
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.incident import GraviteEnum, Incident, StatutEnum
+from app.models.patient import Patient
+from app.services.search_service import SearchService
+
+# Descriptions: ordinary words plus one or two of the clinical terms, so each
+# term occurs in a few percent of the rows as in the real register
+FILLER = (
+    "le la les un une des du de patient signale depuis hier matin soir lors après avant pendant "
+    "séance contrôle côté droit gauche léger important intermittent permanent constaté rapporté "
+    "par famille médecin audioprothésiste rendez-vous semaine dernière suite changement"
+).split()
+CLINICAL = (
+    "calibration processeur électrode impédance aimant douleur migration antenne volume acouphène "
+    "vertige infection cicatrice batterie câble microphone mapping seuil stimulation grésillement"
+).split() + ["perte de son", "son faible"]
+QUERIES = ("calibration", "perte son", "électrode impédance", "grésillement microphone", "explantation")
+BATCH = 10000
+
+
+def _description(rng: random.Random) -> str:
+    words = rng.choices(FILLER, k=rng.randint(8, 40))
+    for term in rng.sample(CLINICAL, rng.randint(1, 2)):
+        words.insert(rng.randrange(len(words)), term)
+    return " ".join(words).capitalize()
+
+
+def seed(engine, rows: int) -> None:
+    rng = random.Random(42)
+    SessionBench = sessionmaker(bind=engine)
+    with SessionBench() as db:
+        patient = Patient(nom="Bench", prenom="Patient")
+        db.add(patient)
+        db.commit()
+        for start in range(0, rows, BATCH):
+            db.execute(insert(Incident), [{
+                "dateIncident": date(2024, 1, 1), "heureIncident": dtime(12, 0),
+                "gravite": GraviteEnum.MINEUR, "statut": StatutEnum.OUVERT, "idPatient": patient.id,
+                "description": _description(rng),
+            } for _ in range(min(BATCH, rows - start))])
+            db.commit()
+        SearchService.reindex(db)
+
+
+def _timings(function, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(database_url: str, rows: int, repeat: int) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    seed(engine, rows)
+    seeded = time.perf_counter() - start
+
+    results = {}
+    with sessionmaker(bind=engine)() as db:
+        for query in QUERIES:
+            terms = SearchService.terms(query)
+            # Ranking needs every match: the LIKE baseline reads them all (and is accent-sensitive)
+            like = select(Incident.id).where(
+                *(Incident.description.like(f"%{term}%") for term in terms), Incident.deleted == 0
+            )
+            full_text = _timings(lambda: SearchService.search(db, query, 20), repeat)
+            scan = _timings(lambda: db.execute(like).all(), max(1, repeat // 10))
+            results[query] = (statistics.median(full_text), sorted(full_text)[int(len(full_text) * 0.95) - 1],
+                              statistics.median(scan))
+    engine.dispose()
+    return {"rows": rows, "seed_s": seeded, "queries": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        result = run(url, args.rows, args.repeat)
+
+    print(f"rows              : {result['rows']} (seeded and indexed in {result['seed_s']:.1f}s)")
+    print(f"{'query':26} {'index p50':>10} {'index p95':>10} {'LIKE scan p50':>14}")
+    for query, (p50, p95, like) in result["queries"].items():
+        print(f"{query:26} {p50:8.2f}ms {p95:8.2f}ms {like:12.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: list response serialization, response_model path vs FAST_LIST_SERIALIZATION.
+
+Usage:
+    python -m benchmarks.bench_serialization --rows 500
+    python -m benchmarks.bench_serialization --rows 500 --database-url mysql+pymysql://...
+
+Loads one page of incidents through IncidentService.get_all, then encodes it
+repeatedly the way GET /api/incidents does: FastAPI's serialize_response
+(response_model validation + dump) followed by JSONResponse, versus
+IncidentService.serialize_list. Reports rows serialized per second.
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.main import app
+from app.models.incident import GraviteEnum, Incident, StatutEnum
+from app.models.patient import Patient
+from app.services.incident_service import IncidentService
+
+
+def seed(engine, rows: int) -> None:
+    SessionBench = sessionmaker(bind=engine)
+    with SessionBench() as db:
+        patient = Patient(nom="Bench", prenom="Patient")
+        db.add(patient)
+        db.commit()
+        db.execute(insert(Incident), [{
+            "dateIncident": date(2024, 1, 1) + timedelta(days=i % 365), "heureIncident": dtime(12, 0),
+            "gravite": GraviteEnum.MAJEUR, "statut": StatutEnum.OUVERT, "idPatient": patient.id,
+            "idProcesseur": i % 50 or None, "dateCreation": datetime(2024, 1, 1) + timedelta(seconds=i),
+            "description": f"Perte de son côté droit après séance de réglage n°{i}",
+        } for i in range(rows)])
+        db.commit()
+
+
+def response_model_body(loop, field, incidents) -> bytes:
+    content = loop.run_until_complete(serialize_response(field=field, response_content=incidents))
+    return JSONResponse(content).body
+
+
+def _rows_per_second(function, rows: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return rows / statistics.median(timings)
+
+
+def run(database_url: str, rows: int, repeat: int) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed(engine, rows)
+    [route] = [r for r in app.routes if getattr(r, "path", None) == "/api/incidents/" and "GET" in r.methods]
+
+    loop = asyncio.new_event_loop()
+    with sessionmaker(bind=engine)() as db:
+        incidents = IncidentService.get_all(db, limit=rows)
+        standard = lambda: response_model_body(loop, route.response_field, incidents)  # noqa: E731
+        assert standard() == IncidentService.serialize_list(incidents)
+        before = _rows_per_second(standard, rows, repeat)
+        after = _rows_per_second(lambda: IncidentService.serialize_list(incidents), rows, repeat)
+    loop.close()
+    engine.dispose()
+    return {"rows": rows, "before": before, "after": after}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="page size (the routes allow up to 500)")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        result = run(url, args.rows, args.repeat)
+
+    print(f"page size                     : {result['rows']} incidents (identical bytes)")
+    print(f"response_model + JSONResponse : {result['before']:>10,.0f} rows/s")
+    print(f"serialize_list                : {result['after']:>10,.0f} rows/s")
+    print(f"speed-up                      : {result['after'] / result['before']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
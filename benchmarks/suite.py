@@ -0,0 +1,279 @@
+"""
+Benchmark suite: latency and throughput of every API route on a seeded dataset.
+
+Usage:
+    python -m benchmarks.suite                                  # 10k patients, 1M incidents, 5M suivis
+    python -m benchmarks.suite --scale 0.01                     # same shape, 1 % of the volumes
+    python -m benchmarks.suite --database-url mysql+pymysql://... --skip-seed
+    python -m benchmarks.suite --scale 0.01 --update-baseline   # record benchmarks/baseline.json
+
+Seeds the database with app.tools.seed (deterministic for a given --seed),
+then replays --requests requests per route through the ASGI app (middlewares
+included, no network) and reports p50 / p95 / p99 latency and throughput.
+Results are written as JSON (--output) and compared with the baseline: the run
+fails (exit code 1) when a route's p50 or p95 exceeds the baseline by more than
+--tolerance and by at least --min-delta-ms (timer and scheduler noise). Baselines are only comparable on the same volumes and database,
+and on the same machine: record one with --update-baseline before comparing.
+
+Without --database-url, a throwaway SQLite file is used. Seeding the full
+volumes takes a while; --skip-seed reuses an already seeded database.
+"""
+
+import argparse
+import json
+import logging
+import math
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+from app.tools import seed as dataset
+from app.tools.seed import Volumes
+
+BASELINE = Path(__file__).with_name("baseline.json")
+WARMUP = 5
+DASHBOARD_FIELDS = "id,gravite,statut,dateIncident,idPatient"
+SEARCH_TERMS = ("calibration", "perte son", "électrode impédance", "grésillement microphone", "explantation")
+
+# (method, url, json body) for one request
+Request = Tuple[str, str, Optional[dict]]
+
+
+def _payload(rng: random.Random, volumes: Volumes, i: int) -> dict:
+    return {
+        "dateIncident": "2025-06-01", "heureIncident": "14:30:00", "gravite": "MINEUR",
+        "description": f"Incident de la suite de benchmarks n°{i}",
+        "idPatient": dataset.hot_patient(rng, volumes.patients),
+    }
+
+
+def _day(rng: random.Random) -> str:
+    return (dataset.FIRST_DAY + timedelta(days=rng.randrange(dataset.DAYS))).isoformat()
+
+
+def _incident(rng: random.Random, volumes: Volumes) -> int:
+    return rng.randrange(1, volumes.incidents + 1)
+
+
+# One request generator per route ("METHOD path template"), given (rng, volumes, i).
+# Writes touch existing rows or add a few; DELETE runs last so the others see the seeded rows.
+SCENARIOS: Dict[str, Callable[[random.Random, Volumes, int], Request]] = {
+    "GET /health": lambda rng, v, i: ("GET", "/health", None),
+    "GET /api/incidents/": lambda rng, v, i: ("GET", "/api/incidents/?limit=100", None),
+    "GET /api/incidents/ (filters)": lambda rng, v, i: (
+        "GET", f"/api/incidents/?limit=100&gravite=CRITIQUE&statut=OUVERT&date_from={_day(rng)}", None
+    ),
+    "GET /api/incidents/ (with_total)": lambda rng, v, i: ("GET", "/api/incidents/?limit=100&with_total=true", None),
+    "GET /api/incidents/ (fields, columnar)": lambda rng, v, i: (
+        "GET", f"/api/incidents/?limit=100&fields={DASHBOARD_FIELDS}&format=columnar", None
+    ),
+    "GET /api/incidents/{id}": lambda rng, v, i: ("GET", f"/api/incidents/{_incident(rng, v)}", None),
+    "GET /api/incidents/{id} (include)": lambda rng, v, i: (
+        "GET", f"/api/incidents/{_incident(rng, v)}?include=suivis,patient,medecin", None
+    ),
+    "GET /api/incidents/{id}/suivis": lambda rng, v, i: ("GET", f"/api/incidents/{_incident(rng, v)}/suivis", None),
+    "GET /api/patients/{id}/incidents": lambda rng, v, i: (
+        "GET", f"/api/patients/{dataset.hot_patient(rng, v.patients)}/incidents?limit=100", None
+    ),
+    "GET /api/incidents/export": lambda rng, v, i: (
+        "GET", f"/api/incidents/export?date_from={(day := _day(rng))}&date_to={day}", None
+    ),
+    "GET /api/incidents/export/suivis": lambda rng, v, i: (
+        "GET", f"/api/incidents/export/suivis?date_from={(day := _day(rng))}&date_to={day}", None
+    ),
+    "GET /api/stats/incidents": lambda rng, v, i: ("GET", "/api/stats/incidents", None),
+    "GET /api/search": lambda rng, v, i: ("GET", f"/api/search?q={rng.choice(SEARCH_TERMS)}", None),
+    "GET /metrics": lambda rng, v, i: ("GET", "/metrics", None),
+    "GET /ready": lambda rng, v, i: ("GET", "/ready", None),
+    "POST /api/incidents/": lambda rng, v, i: ("POST", "/api/incidents/", _payload(rng, v, i)),
+    "POST /api/incidents/bulk": lambda rng, v, i: (
+        "POST", "/api/incidents/bulk", {"items": [_payload(rng, v, 50 * i + k) for k in range(50)]}
+    ),
+    "PUT /api/incidents/{id}": lambda rng, v, i: (
+        "PUT", f"/api/incidents/{_incident(rng, v)}", {"statut": rng.choice(("EN_COURS", "RESOLU"))}
+    ),
+    "POST /api/incidents/{id}/suivis": lambda rng, v, i: (
+        "POST", f"/api/incidents/{_incident(rng, v)}/suivis",
+        {"dateSuivi": "2025-06-02", "actionsPrises": f"Suivi de la suite de benchmarks n°{i}"}
+    ),
+    "PATCH /api/incidents/status": lambda rng, v, i: (
+        "PATCH", "/api/incidents/status",
+        {"statut": rng.choice(("RESOLU", "FERME")), "ids": [_incident(rng, v) for _ in range(100)]}
+    ),
+    "DELETE /api/incidents/{id}": lambda rng, v, i: ("DELETE", f"/api/incidents/{_incident(rng, v)}", None),
+}
+
+
+def check_coverage() -> None:
+    """Every API route needs at least one scenario."""
+    names = {name.split(" (")[0] for name in SCENARIOS}
+    missing = [
+        f"{method} {route.path}" for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods if f"{method} {route.path}" not in names
+    ]
+    if missing:
+        raise SystemExit(f"Routes without a benchmark scenario: {', '.join(sorted(missing))}")
+
+
+def percentile(timings: List[float], p: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def measure(client: TestClient, scenario: Callable, volumes: Volumes, requests: int, rng: random.Random) -> dict:
+    for i in range(WARMUP):
+        method, url, body = scenario(rng, volumes, requests + i)
+        client.request(method, url, json=body)
+    timings, errors = [], 0
+    for i in range(requests):
+        method, url, body = scenario(rng, volumes, i)
+        start = time.perf_counter()
+        response = client.request(method, url, json=body)
+        timings.append(time.perf_counter() - start)
+        errors += response.status_code >= 500
+    return {
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "rps": round(len(timings) / sum(timings), 1),
+        "requests": requests,
+        "errors": errors,
+    }
+
+
+def run(database_url: str, volumes: Volumes, requests: int, seed: int, skip_seed: bool, workers: int = 1) -> dict:
+    engine = create_engine(database_url)
+    seeded_in = None
+    if not skip_seed:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        start = time.perf_counter()
+        dataset.generate(database_url, volumes, seed, workers)
+        seeded_in = round(time.perf_counter() - start, 1)
+    SessionBench = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        with SessionBench() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)  # no lifespan: tables are created above
+    rng = random.Random(seed)
+    routes = {}
+    try:
+        for name, scenario in SCENARIOS.items():
+            routes[name] = measure(client, scenario, volumes, requests, rng)
+            logging.getLogger(__name__).info("%s: %s", name, routes[name])
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    return {
+        "meta": {
+            "volumes": {"patients": volumes.patients, "incidents": volumes.incidents, "suivis": volumes.suivis},
+            "database": make_url(database_url).get_backend_name(),
+            "requests": requests,
+            "seed": seed,
+            "seeded_in_s": seeded_in,
+            "python": platform.python_version(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "routes": routes,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float, min_delta_ms: float = 0.0) -> List[str]:
+    """Regressions of `result` against `baseline`: p50 or p95 above both baseline × (1 + tolerance) and baseline + min_delta_ms."""
+    for key in ("volumes", "database"):
+        if result["meta"][key] != baseline["meta"][key]:
+            raise SystemExit(
+                f"Baseline not comparable: {key} {baseline['meta'][key]} vs {result['meta'][key]} "
+                "(run with the baseline's volumes, or --update-baseline)"
+            )
+    regressions = []
+    for name, current in result["routes"].items():
+        reference = baseline["routes"].get(name)
+        if reference is None:
+            continue
+        if current["errors"]:
+            regressions.append(f"{name}: {current['errors']} server errors")
+        for metric in ("p50_ms", "p95_ms"):
+            limit = max(reference[metric] * (1 + tolerance), reference[metric] + min_delta_ms)
+            if current[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {current[metric]:.2f} > {limit:.2f} "
+                    f"(baseline {reference[metric]:.2f}, tolerance {tolerance:.0%} / {min_delta_ms} ms)"
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=Volumes.patients)
+    parser.add_argument("--incidents", type=int, default=Volumes.incidents)
+    parser.add_argument("--suivis", type=int, default=Volumes.suivis)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the three volumes")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per route")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--workers", type=int, default=1, help="seeding processes")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in --database-url")
+    parser.add_argument("--output", type=Path, default=None, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = +25%%")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="smaller slowdowns are never regressions")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    # The app's logging pipeline is installed on import; only its level changes here
+    logging.getLogger().setLevel(args.log_level)
+    check_coverage()
+    volumes = Volumes(args.patients, args.incidents, args.suivis).scaled(args.scale)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        result = run(url, volumes, args.requests, args.seed, args.skip_seed and args.database_url is not None,
+                     args.workers)
+
+    meta = result["meta"]
+    print(f"dataset : {meta['volumes']} on {meta['database']} (seeded in {meta['seeded_in_s']}s)")
+    print(f"{'route':42} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'errors':>7}")
+    for name, r in result["routes"].items():
+        print(f"{name:42} {r['p50_ms']:7.2f}ms {r['p95_ms']:7.2f}ms {r['p99_ms']:7.2f}ms {r['rps']:9.1f} {r['errors']:7}")
+
+    document = json.dumps(result, indent=2, ensure_ascii=False) + "\n"
+    if args.output:
+        args.output.write_text(document, encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.write_text(document, encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}: nothing to compare")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(result, baseline, args.tolerance, args.min_delta_ms)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
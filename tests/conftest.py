@@ -1,10 +1,13 @@
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.core.cache import incident_cache
+from app.core.query_stats import instrument, normalize
 from app.database import Base, get_db
 
 # CRITIQUE : importer tous les models pour que SQLAlchemy les enregistre
@@ -12,6 +15,8 @@ from app.models.medecin import Medecin        # noqa
 from app.models.patient import Patient         # noqa
 from app.models.incident import Incident       # noqa
 from app.models.suivi_incident import SuiviIncident  # noqa
+from app.models.incident_stat import IncidentStat   # noqa
+from app.models.incident_archive import IncidentArchive, SuiviIncidentArchive  # noqa
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
@@ -20,12 +25,15 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument(engine)
+# Mêmes options que SessionLocal : objets non expirés au commit
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 @pytest.fixture(scope="function")
 def db():
     Base.metadata.create_all(bind=engine)
+    incident_cache.clear()
     session = TestingSessionLocal()
     try:
         yield session
@@ -48,6 +56,36 @@ def client(db):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def sql_statements():
+    """Capture les requêtes SQL émises sur le moteur de test : liste de (statement, parameters)."""
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _capture)
+
+
+@pytest.fixture
+def assert_max_queries(sql_statements):
+    """
+    Budget de requêtes SQL d'un bloc :
+        with assert_max_queries(2):
+            client.get(...)
+    """
+    @contextmanager
+    def check(limit):
+        start = len(sql_statements)
+        yield
+        executed = [normalize(statement) for statement, _ in sql_statements[start:]]
+        assert len(executed) <= limit, f"{len(executed)} requêtes SQL (maximum {limit}) :\n" + "\n".join(executed)
+
+    return check
+
+
 @pytest.fixture
 def patient_en_db(db):
     patient = Patient(
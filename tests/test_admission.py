@@ -0,0 +1,210 @@
+"""
+Tests - Contrôle d'admission et délestage
+"""
+import asyncio
+
+import pytest
+
+from app.core import admission as admission_module
+from app.core import metrics
+from app.core.admission import AdmissionController, AdmissionMiddleware, Rejected, TokenBuckets
+
+
+class LentApp:
+    """Application ASGI de test : répond 200 après `delay` secondes, note le maximum d'exécutions simultanées."""
+
+    def __init__(self, delay=0.1):
+        self.delay, self.running, self.max_running = delay, 0, 0
+
+    async def __call__(self, scope, receive, send):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+        finally:
+            self.running -= 1
+
+
+async def _appel(app, path="/api/incidents/", client="10.0.0.1", method="GET"):
+    """Appelle une application ASGI ; renvoie (statut, en-têtes)."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": [], "client": (client, 5000)}
+    await app(scope, receive, send)
+    return sent[0]["status"], dict(sent[0]["headers"])
+
+
+@pytest.fixture(autouse=True)
+def sans_limites(monkeypatch):
+    """Chaque test installe ses propres limites."""
+    monkeypatch.setattr(admission_module, "admission", None)
+    monkeypatch.setattr(admission_module, "rate_limiter", None)
+    metrics.registry.reset()
+
+
+class TestControleur:
+    """Tests de AdmissionController"""
+
+    def test_file_fifo(self):
+        """✅ Les créneaux libérés passent aux requêtes en attente, dans l'ordre"""
+        controller = AdmissionController(max_concurrent=1, max_queue=5, timeout_seconds=1)
+        ordre = []
+
+        async def requete(n):
+            await controller.acquire()
+            ordre.append(n)
+            await asyncio.sleep(0.01)
+            controller.release()
+
+        async def scenario():
+            await asyncio.gather(*(requete(n) for n in range(4)))
+
+        asyncio.run(scenario())
+        assert ordre == [0, 1, 2, 3]
+        assert controller.in_flight == 0 and controller.queued == 0
+
+    def test_file_pleine(self):
+        """❌ File pleine : refus immédiat"""
+        controller = AdmissionController(max_concurrent=1, max_queue=0, timeout_seconds=1)
+
+        async def scenario():
+            await controller.acquire()
+            with pytest.raises(Rejected) as e:
+                await controller.acquire()
+            return e.value.reason
+
+        assert asyncio.run(scenario()) == "queue_full"
+
+    def test_delai_depasse(self):
+        """❌ Attente au-delà du délai : refus, le créneau n'est pas perdu"""
+        controller = AdmissionController(max_concurrent=1, max_queue=5, timeout_seconds=0.05)
+
+        async def scenario():
+            await controller.acquire()
+            with pytest.raises(Rejected) as e:
+                await controller.acquire()
+            controller.release()
+            return e.value.reason
+
+        assert asyncio.run(scenario()) == "timeout"
+        assert controller.in_flight == 0 and controller.queued == 0
+
+    def test_annulation(self):
+        """✅ Un client parti pendant l'attente libère sa place dans la file"""
+        controller = AdmissionController(max_concurrent=1, max_queue=5, timeout_seconds=5)
+
+        async def scenario():
+            await controller.acquire()
+            attente = asyncio.ensure_future(controller.acquire())
+            await asyncio.sleep(0.01)
+            attente.cancel()
+            await asyncio.gather(attente, return_exceptions=True)
+            controller.release()
+
+        asyncio.run(scenario())
+        assert controller.in_flight == 0 and controller.queued == 0
+
+
+class TestSeauxDeJetons:
+    """Tests de TokenBuckets"""
+
+    def test_rafale_puis_debit(self):
+        """✅ `burst` requêtes d'un coup, puis une par 1/rate secondes"""
+        buckets = TokenBuckets(rate=2, burst=3)
+        assert [buckets.take("a", now=0) for _ in range(3)] == [0, 0, 0]
+        assert buckets.take("a", now=0) == pytest.approx(0.5)
+        assert buckets.take("a", now=0.5) == 0
+        assert buckets.take("b", now=0) == 0
+
+    def test_nombre_de_clients_borne(self):
+        """✅ Les clients les plus anciens sont oubliés au-delà de max_clients"""
+        buckets = TokenBuckets(rate=1, burst=1, max_clients=2)
+        for client in ("a", "b", "c"):
+            buckets.take(client, now=0)
+        assert buckets.take("a", now=0) == 0
+
+
+class TestMiddleware:
+    """Tests de AdmissionMiddleware"""
+
+    def test_limite_de_concurrence(self, monkeypatch):
+        """✅ Jamais plus de max_concurrent requêtes simultanées ; file bornée, 503 et Retry-After au-delà"""
+        monkeypatch.setattr(admission_module, "admission", AdmissionController(2, 3, timeout_seconds=5))
+        app = LentApp()
+        middleware = AdmissionMiddleware(app)
+
+        async def scenario():
+            return await asyncio.gather(*(_appel(middleware) for _ in range(8)))
+
+        reponses = asyncio.run(scenario())
+        statuts = sorted(status for status, _ in reponses)
+        assert statuts == [200] * 5 + [503] * 3
+        assert app.max_running == 2
+        assert all(headers[b"retry-after"] == b"1" for status, headers in reponses if status == 503)
+        assert 'admission_rejected_total{reason="queue_full"} 3' in metrics.registry.render()
+
+    def test_hors_api_non_limite(self, monkeypatch):
+        """✅ /health, /metrics et /ready ne passent pas par le contrôle d'admission"""
+        monkeypatch.setattr(admission_module, "admission", AdmissionController(1, 0, timeout_seconds=5))
+        middleware = AdmissionMiddleware(LentApp())
+
+        async def scenario():
+            return await asyncio.gather(*(_appel(middleware, path="/health") for _ in range(3)))
+
+        assert [status for status, _ in asyncio.run(scenario())] == [200] * 3
+
+    def test_options_non_limite(self, monkeypatch):
+        """✅ Les requêtes OPTIONS ne sont ni mises en file, ni délestées, ni limitées"""
+        monkeypatch.setattr(admission_module, "admission", AdmissionController(1, 0, timeout_seconds=5))
+        monkeypatch.setattr(admission_module, "rate_limiter", TokenBuckets(rate=0.5, burst=1))
+        middleware = AdmissionMiddleware(LentApp())
+
+        async def scenario():
+            return await asyncio.gather(*(_appel(middleware, method="OPTIONS") for _ in range(3)))
+
+        assert [status for status, _ in asyncio.run(scenario())] == [200] * 3
+
+    def test_limitation_par_client(self, monkeypatch):
+        """❌ Seau vide → 429 avec Retry-After, pour ce client seulement"""
+        monkeypatch.setattr(admission_module, "rate_limiter", TokenBuckets(rate=0.5, burst=2))
+        middleware = AdmissionMiddleware(LentApp(delay=0))
+
+        async def scenario():
+            return [await _appel(middleware, client=c) for c in ("10.0.0.1",) * 3 + ("10.0.0.2",)]
+
+        reponses = asyncio.run(scenario())
+        assert [status for status, _ in reponses] == [200, 200, 429, 200]
+        assert reponses[2][1][b"retry-after"] == b"2"
+        assert 'admission_rejected_total{reason="rate_limited"} 1' in metrics.registry.render()
+
+    def test_en_tetes_cors(self, client, monkeypatch):
+        """✅ Un 503 de délestage porte les en-têtes CORS ; le preflight passe même saturé"""
+        controller = AdmissionController(1, 0, timeout_seconds=5)
+        monkeypatch.setattr(admission_module, "admission", controller)
+        controller.in_flight = 1  # créneau occupé, file nulle : toute requête /api est délestée
+        response = client.get("/api/stats/incidents", headers={"Origin": "https://followup.example"})
+        assert response.status_code == 503
+        assert "access-control-allow-origin" in response.headers
+        assert "retry-after" in response.headers["access-control-expose-headers"].lower()
+        preflight = client.options("/api/incidents/", headers={
+            "Origin": "https://followup.example", "Access-Control-Request-Method": "POST"
+        })
+        assert preflight.status_code == 200
+        assert "access-control-allow-origin" in preflight.headers
+
+    def test_metriques_exposees(self, client, monkeypatch):
+        """✅ Profondeur de file et requêtes admises exportées sur /metrics"""
+        monkeypatch.setattr(admission_module, "admission", AdmissionController(30, 50, timeout_seconds=2))
+        client.get("/api/stats/incidents")
+        body = client.get("/metrics").text
+        assert "admission_queue_depth 0" in body
+        assert "admission_in_flight 0" in body
+        assert "# TYPE admission_rejected_total counter" in body
@@ -0,0 +1,187 @@
+"""
+Tests - Archivage des incidents supprimés ou fermés depuis longtemps
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from app.core.cache import incident_cache
+from app.models.incident import Incident, StatutEnum
+from app.models.incident_archive import IncidentArchive, SuiviIncidentArchive
+from app.models.suivi_incident import SuiviIncident
+from app.schemas.incident import IncidentCreate, IncidentUpdate
+from app.schemas.suivi_incident import SuiviCreate
+from app.services.archive_service import ArchiveService, months_before
+from app.services.incident_service import IncidentService
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
+
+MAINTENANT = datetime(2026, 6, 15, 12, 0)
+
+
+def _incident(patient_id, description):
+    return IncidentCreate(
+        dateIncident="2024-03-20",
+        heureIncident="14:30:00",
+        gravite="MAJEUR",
+        description=description,
+        idPatient=patient_id
+    )
+
+
+def _suivi(actions):
+    return SuiviCreate(dateSuivi="2024-03-25", actionsPrises=actions)
+
+
+def _fermer(db, incident_id, le):
+    IncidentService.update(db, incident_id, IncidentUpdate(statut="FERME"))
+    db.execute(update(Incident).where(Incident.id == incident_id).values(dateModification=le))
+    db.commit()
+
+
+@pytest.fixture
+def historique(db, patient_en_db):
+    """Un incident fermé il y a trois ans, un fermé récemment, un supprimé, un ouvert (le plus récent)."""
+    ancien = IncidentService.create(db, _incident(patient_en_db.id, "Perte de son après choc sur l'antenne"))
+    IncidentService.add_suivi(db, ancien.id, _suivi("Remplacement de l'antenne du processeur"))
+    IncidentService.add_suivi(db, ancien.id, _suivi("Contrôle de l'impédance des électrodes"))
+    _fermer(db, ancien.id, datetime(2023, 5, 1))
+
+    recent = IncidentService.create(db, _incident(patient_en_db.id, "Grésillements intermittents"))
+    _fermer(db, recent.id, datetime(2026, 1, 10))
+
+    supprime = IncidentService.create(db, _incident(patient_en_db.id, "Saisie en double"))
+    IncidentService.add_suivi(db, supprime.id, _suivi("Saisie annulée par le secrétariat"))
+    IncidentService.soft_delete(db, supprime.id)
+
+    ouvert = IncidentService.create(db, _incident(patient_en_db.id, "Douleur au niveau de l'aimant"))
+    IncidentService.add_suivi(db, ouvert.id, _suivi("Aimant remplacé par un modèle plus faible"))
+    return {"ancien": ancien.id, "recent": recent.id, "supprime": supprime.id, "ouvert": ouvert.id}
+
+
+class TestArchivageService:
+    """Tests de ArchiveService.run"""
+
+    def test_date_limite(self):
+        """✅ N mois avant, jour ramené à la fin des mois plus courts"""
+        assert months_before(datetime(2026, 6, 15, 12, 0), 24) == datetime(2024, 6, 15, 12, 0)
+        assert months_before(datetime(2026, 3, 31), 1) == datetime(2026, 2, 28)
+        assert months_before(datetime(2026, 1, 10), 13) == datetime(2024, 12, 10)
+
+    def test_deplace_les_incidents_et_leurs_suivis(self, db, historique):
+        """✅ Supprimés et fermés avant la date limite passent dans l'archive, avec leurs suivis"""
+        counts = ArchiveService.run(db, months=24, batch_size=1, now=MAINTENANT)
+        assert counts == {"incidents": 2, "suivis": 3}
+
+        archives = {a.id: a for a in db.query(IncidentArchive).all()}
+        assert sorted(archives) == sorted([historique["ancien"], historique["supprime"]])
+        assert archives[historique["ancien"]].description == "Perte de son après choc sur l'antenne"
+        assert archives[historique["ancien"]].statut == StatutEnum.FERME
+        assert archives[historique["supprime"]].deleted == 1
+        assert all(a.dateArchivage for a in archives.values())
+        assert {s.idIncident for s in db.query(SuiviIncidentArchive).all()} == set(archives)
+
+        restants = {i.id for i in db.query(Incident).all()}
+        assert restants == {historique["recent"], historique["ouvert"]}
+        assert {s.idIncident for s in db.query(SuiviIncident).all()} == {historique["ouvert"]}
+
+    def test_idempotent(self, db, historique):
+        """✅ Un second passage n'archive plus rien"""
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        assert ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT) == {"incidents": 0, "suivis": 0}
+
+    def test_statistiques_inchangees(self, db, historique):
+        """✅ Les incidents archivés restent comptés : le résumé reste juste"""
+        avant = StatsService.get(db)
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        assert StatsService.get(db) == avant
+        assert StatsService.check(db) == {}
+
+    def test_retires_de_la_recherche(self, db, historique):
+        """✅ Incidents et suivis archivés ne sortent plus dans la recherche"""
+        assert SearchService.search(db, "antenne")
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        assert SearchService.search(db, "antenne") == []
+        assert SearchService.search(db, "aimant")
+
+    def test_dernier_identifiant_conserve(self, db, historique):
+        """✅ Le plus grand id reste en place, pour qu'il ne soit pas réattribué (SQLite)"""
+        IncidentService.soft_delete(db, historique["ouvert"])
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        assert db.get(Incident, historique["ouvert"]) is not None
+
+    def test_cache_invalide(self, db, historique):
+        """✅ Les incidents archivés sortent du cache"""
+        IncidentService.get_payload(db, historique["ancien"])
+        assert incident_cache.get(historique["ancien"]) is not None
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        assert incident_cache.get(historique["ancien"]) is None
+
+
+class TestLectureArchiveApi:
+    """Tests de GET /api/incidents/{id}?include_archived=true"""
+
+    def test_introuvable_sans_option(self, client, db, historique):
+        """❌ Un incident archivé n'est plus servi par défaut"""
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        assert client.get(f"/api/incidents/{historique['ancien']}").status_code == 404
+
+    def test_lu_depuis_l_archive(self, client, db, historique):
+        """✅ Avec include_archived, même corps qu'avant l'archivage"""
+        avant = client.get(f"/api/incidents/{historique['ancien']}").json()
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        response = client.get(f"/api/incidents/{historique['ancien']}", params={"include_archived": "true"})
+        assert response.status_code == 200
+        assert response.json() == avant
+
+    def test_lu_depuis_l_archive_avec_suivis(self, client, db, historique):
+        """✅ include=suivis lit aussi les suivis archivés"""
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        response = client.get(
+            f"/api/incidents/{historique['ancien']}", params={"include_archived": "true", "include": "suivis"}
+        )
+        assert response.status_code == 200
+        assert [s["actionsPrises"] for s in response.json()["suivis"]] == [
+            "Remplacement de l'antenne du processeur", "Contrôle de l'impédance des électrodes"
+        ]
+
+    def test_supprime_reste_introuvable(self, client, db, historique):
+        """❌ Un incident supprimé puis archivé reste en 404"""
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        response = client.get(f"/api/incidents/{historique['supprime']}", params={"include_archived": "true"})
+        assert response.status_code == 404
+
+    def test_incident_courant_inchange(self, client, historique):
+        """✅ Un incident courant est servi normalement avec l'option"""
+        response = client.get(f"/api/incidents/{historique['ouvert']}", params={"include_archived": "true"})
+        assert response.status_code == 200
+        assert response.headers.get("etag")
+
+
+class TestExportArchive:
+    """Tests des exports après archivage"""
+
+    def test_incidents_archives_exportes(self, client, db, historique):
+        """✅ L'export contient les incidents archivés, dans l'ordre des ids"""
+        avant = client.get("/api/incidents/export", params={"include_deleted": "true"}).text
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        assert db.get(Incident, historique["ancien"]) is None
+        assert client.get("/api/incidents/export", params={"include_deleted": "true"}).text == avant
+        ids = [int(ligne.split('"id":')[1].split(",")[0]) for ligne in
+               client.get("/api/incidents/export").text.splitlines()]
+        assert ids == sorted([historique["ancien"], historique["recent"], historique["ouvert"]])
+
+    def test_suivis_archives_exportes(self, client, db, historique):
+        """✅ L'export des suivis contient aussi les suivis archivés"""
+        avant = client.get("/api/incidents/export/suivis").text
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        assert client.get("/api/incidents/export/suivis").text == avant
+        assert "Remplacement de l'antenne du processeur" in avant
+
+    def test_filtres_appliques_a_l_archive(self, client, db, historique):
+        """✅ Les filtres s'appliquent aussi aux lignes archivées"""
+        ArchiveService.run(db, months=24, batch_size=10, now=MAINTENANT)
+        response = client.get("/api/incidents/export", params={"statut": "FERME", "format": "csv"})
+        ids = [int(ligne.split(",")[0]) for ligne in response.text.splitlines()[1:]]
+        assert ids == [historique["ancien"], historique["recent"]]
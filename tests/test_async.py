@@ -0,0 +1,162 @@
+"""
+Tests - Chemin asyncio (AsyncSession + aiosqlite)
+"""
+import anyio
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.main import app
+from app.core.cache import incident_cache
+from app.database import Base, async_database_url, get_db
+from app.models.patient import Patient
+from app.schemas.incident import IncidentCreate
+from app.services import async_incident_service
+from app.services.async_incident_service import AsyncIncidentService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    incident_cache.clear()
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def patient_async(async_session_factory):
+    async with async_session_factory() as session:
+        patient = Patient(nom="Martin", prenom="Claire", sexe="Féminin")
+        session.add(patient)
+        await session.commit()
+        return patient
+
+
+@pytest.fixture
+async def async_client(async_session_factory, monkeypatch):
+    async def override_get_db():
+        async with async_session_factory() as session:
+            yield session
+
+    # Le chemin asynchrone ne doit jamais emprunter le pool de threads
+    async def no_threadpool(*args, **kwargs):
+        raise AssertionError("run_in_threadpool appelé avec une AsyncSession")
+
+    monkeypatch.setattr(async_incident_service, "run_in_threadpool", no_threadpool)
+    app.dependency_overrides[get_db] = override_get_db
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+class TestUrlAsync:
+    """Tests de dérivation de l'URL asynchrone"""
+
+    @pytest.mark.parametrize("url, attendu", [
+        ("mysql+pymysql://u:p@localhost/followup", "mysql+aiomysql://u:p@localhost/followup"),
+        ("sqlite:///./followup.db", "sqlite+aiosqlite:///./followup.db"),
+        ("mysql+aiomysql://u:p@localhost/followup", "mysql+aiomysql://u:p@localhost/followup"),
+    ])
+    def test_pilote_asyncio(self, url, attendu):
+        """✅ Le pilote synchrone est remplacé par son équivalent asyncio"""
+        assert async_database_url(url) == attendu
+
+
+class TestAsyncIncidentService:
+    """Tests du service asynchrone sur AsyncSession"""
+
+    async def test_creation_et_lecture(self, async_session_factory, patient_async):
+        """✅ Création puis lecture via AsyncSession"""
+        async with async_session_factory() as session:
+            created = await AsyncIncidentService.create(session, IncidentCreate(
+                dateIncident="2024-03-20",
+                heureIncident="14:30:00",
+                gravite="MAJEUR",
+                description="Perte de son côté droit",
+                idPatient=patient_async.id
+            ))
+            fetched = await AsyncIncidentService.get_by_id(session, created.id)
+            assert fetched.description == "Perte de son côté droit"
+
+    async def test_patient_inexistant(self, async_session_factory):
+        """❌ ValueError propagée depuis la logique métier"""
+        async with async_session_factory() as session:
+            with pytest.raises(ValueError, match="Patient"):
+                await AsyncIncidentService.create(session, IncidentCreate(
+                    dateIncident="2024-03-20",
+                    heureIncident="14:30:00",
+                    gravite="MINEUR",
+                    description="Patient inexistant",
+                    idPatient=99999
+                ))
+
+
+class TestAsyncApi:
+    """Tests des routes servies par une AsyncSession"""
+
+    async def test_cycle_complet(self, async_client, patient_async):
+        """✅ POST, GET, PUT, suivis et DELETE sans pool de threads"""
+        response = await async_client.post("/api/incidents/", json={
+            "dateIncident": "2024-03-20",
+            "heureIncident": "14:30:00",
+            "gravite": "MINEUR",
+            "description": "Son faible après calibration",
+            "idPatient": patient_async.id
+        })
+        assert response.status_code == 201
+        incident_id = response.json()["id"]
+
+        response = await async_client.put(f"/api/incidents/{incident_id}", json={"gravite": "CRITIQUE"})
+        assert response.json()["gravite"] == "CRITIQUE"
+
+        response = await async_client.post(
+            f"/api/incidents/{incident_id}/suivis",
+            json={"dateSuivi": "2024-03-25", "actionsPrises": "Recalibration effectuée"}
+        )
+        assert response.status_code == 201
+
+        response = await async_client.get(f"/api/incidents/{incident_id}")
+        assert response.json()["statut"] == "EN_COURS"
+        response = await async_client.get(f"/api/incidents/{incident_id}/suivis")
+        assert len(response.json()) == 1
+        response = await async_client.get(f"/api/patients/{patient_async.id}/incidents")
+        assert [i["id"] for i in response.json()] == [incident_id]
+
+        assert (await async_client.delete(f"/api/incidents/{incident_id}")).status_code == 204
+        assert (await async_client.get(f"/api/incidents/{incident_id}")).status_code == 404
+
+    async def test_export_en_flux(self, async_client, patient_async):
+        """✅ Export NDJSON lu via AsyncConnection.stream"""
+        for gravite in ("MINEUR", "MAJEUR"):
+            await async_client.post("/api/incidents/", json={
+                "dateIncident": "2024-03-20",
+                "heureIncident": "14:30:00",
+                "gravite": gravite,
+                "description": f"Incident {gravite}",
+                "idPatient": patient_async.id
+            })
+        response = await async_client.get("/api/incidents/export", params={"gravite": "MAJEUR"})
+        assert response.status_code == 200
+        assert [line.count('"MAJEUR"') for line in response.text.splitlines()] == [1]
+
+    async def test_requetes_concurrentes(self, async_client, patient_async):
+        """✅ Plusieurs centaines de requêtes simultanées aboutissent"""
+        statuses = []
+
+        async def fetch():
+            response = await async_client.get(f"/api/patients/{patient_async.id}/incidents")
+            statuses.append(response.status_code)
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(200):
+                tg.start_soon(fetch)
+        assert statuses == [200] * 200
@@ -0,0 +1,212 @@
+"""
+Tests - Ingestion en masse d'incidents
+"""
+import pytest
+
+from app.core.cache import incident_cache
+from app.models.incident import Incident, StatutEnum
+from app.models.patient import Patient
+from app.schemas.incident import IncidentCreate, IncidentFilter, IncidentUpdate
+from app.services import incident_service
+from app.services.incident_service import IncidentService
+from app.services.stats_service import StatsService
+
+
+def _ligne(patient_id, **overrides):
+    ligne = {
+        "dateIncident": "2024-03-20",
+        "heureIncident": "14:30:00",
+        "gravite": "MINEUR",
+        "description": "Incident issu du fichier fabricant",
+        "idPatient": patient_id,
+    }
+    ligne.update(overrides)
+    return ligne
+
+
+class TestCreationEnMasseService:
+    """Tests de IncidentService.create_many"""
+
+    def test_lot_valide(self, db, patient_en_db):
+        """✅ Toutes les lignes sont créées avec les valeurs par défaut"""
+        items = [IncidentCreate(**_ligne(patient_en_db.id, description=f"Ligne {i} du lot")) for i in range(5)]
+        result = IncidentService.create_many(db, items)
+        assert result.created == 5
+        assert result.errors == []
+        assert len(result.ids) == 5 and result.ids == sorted(result.ids)
+
+        incidents = db.query(Incident).order_by(Incident.id).all()
+        assert [i.description for i in incidents] == [f"Ligne {i} du lot" for i in range(5)]
+        assert all(i.statut == StatutEnum.OUVERT and i.deleted == 0 and i.dateCreation for i in incidents)
+
+    def test_ids_dans_l_ordre_des_lignes(self, db, patient_en_db):
+        """✅ ids[i] est l'incident créé pour la i-ème ligne valide"""
+        items = [IncidentCreate(**_ligne(patient_en_db.id, description=f"Ligne {i} du lot")) for i in range(3)]
+        items.insert(1, IncidentCreate(**_ligne(99999)))
+        result = IncidentService.create_many(db, items)
+        descriptions = [db.get(Incident, incident_id).description for incident_id in result.ids]
+        assert descriptions == [f"Ligne {i} du lot" for i in range(3)]
+
+    def test_erreurs_par_ligne(self, db, patient_en_db):
+        """❌ Patient inexistant et implant étranger rejetés ligne par ligne"""
+        autre = Patient(nom="Durand", prenom="Anne", idImplant=7)
+        db.add(autre)
+        db.commit()
+        items = [
+            IncidentCreate(**_ligne(patient_en_db.id)),
+            IncidentCreate(**_ligne(99999)),
+            IncidentCreate(**_ligne(autre.id, idImplant=8)),
+            IncidentCreate(**_ligne(autre.id, idImplant=7)),
+        ]
+        result = IncidentService.create_many(db, items)
+        assert result.created == 2
+        assert [e.index for e in result.errors] == [1, 2]
+        assert "Patient" in result.errors[0].detail
+        assert "implant" in result.errors[1].detail.lower()
+
+    def test_requetes_ensemblistes(self, db, patient_en_db, sql_statements):
+        """✅ Un SELECT patients, une mise à jour des statistiques et de l'index pour tout le lot"""
+        items = [IncidentCreate(**_ligne(patient_en_db.id)) for _ in range(50)]
+        IncidentService.create_many(db, items)
+        sql = [" ".join(statement.replace("OR REPLACE ", "").split()[:3]).upper() for statement, _ in sql_statements]
+        assert sum(s.startswith("SELECT") for s in sql) == 1
+        # SQLite n'a pas de sentinelle d'ordre : ids de RETURNING obtenus ligne par ligne
+        assert sql.count("INSERT INTO INCIDENTS") == 50
+        assert sql.count("INSERT INTO INCIDENT_STATS") == 1
+        assert sql.count("INSERT INTO INCIDENT_SEARCH") == 1
+        assert len(sql) == 53
+
+
+class TestCreationEnMasseApi:
+    """Tests POST /api/incidents/bulk"""
+
+    def test_post_bulk(self, client, patient_en_db):
+        """✅ Lot mixte → lignes valides créées, erreurs détaillées"""
+        response = client.post("/api/incidents/bulk", json={"items": [
+            _ligne(patient_en_db.id), _ligne(99999), _ligne(patient_en_db.id)
+        ]})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 2
+        assert data["errors"] == [{"index": 1, "detail": "Patient avec l'ID 99999 introuvable."}]
+        assert len(client.get(f"/api/patients/{patient_en_db.id}/incidents").json()) == 2
+
+    def test_post_bulk_vide(self, client):
+        """❌ Lot vide → 422"""
+        assert client.post("/api/incidents/bulk", json={"items": []}).status_code == 422
+
+    def test_post_bulk_ligne_invalide(self, client, patient_en_db):
+        """❌ Ligne mal formée → 422 avec sa position"""
+        response = client.post("/api/incidents/bulk", json={"items": [
+            _ligne(patient_en_db.id), _ligne(patient_en_db.id, gravite="Catastrophique")
+        ]})
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][:3] == ["body", "items", 1]
+
+
+@pytest.fixture
+def quatre_incidents(db, patient_en_db):
+    """Un incident par statut (OUVERT, EN_COURS, RESOLU, FERME) ; renvoie leurs ids dans cet ordre"""
+    ids = IncidentService.create_many(db, [IncidentCreate(**_ligne(patient_en_db.id)) for _ in range(4)]).ids
+    for incident_id, statut in zip(ids[1:], (StatutEnum.EN_COURS, StatutEnum.RESOLU, StatutEnum.FERME)):
+        IncidentService.update(db, incident_id, IncidentUpdate(statut=statut))
+    return ids
+
+
+class TestTransitionStatutService:
+    """Tests de IncidentService.transition_many"""
+
+    def test_resultats_par_incident(self, db, quatre_incidents):
+        """✅ Transitions autorisées appliquées, interdites et introuvables signalées, dans l'ordre demandé"""
+        ouvert, en_cours, resolu, ferme = quatre_incidents
+        IncidentService.soft_delete(db, ouvert)
+        result = IncidentService.transition_many(
+            db, StatutEnum.EN_COURS, ids=[resolu, ferme, ouvert, 99999, en_cours, resolu]
+        )
+        assert result.updated == 1
+        assert [(r.id, r.outcome.value, r.statut) for r in result.results] == [
+            (resolu, "updated", StatutEnum.EN_COURS),
+            (ferme, "forbidden_transition", StatutEnum.FERME),
+            (ouvert, "not_found", None),
+            (99999, "not_found", None),
+            (en_cours, "unchanged", StatutEnum.EN_COURS),
+        ]
+        db.expire_all()
+        assert db.get(Incident, resolu).statut == StatutEnum.EN_COURS
+        assert db.get(Incident, ferme).statut == StatutEnum.FERME
+        assert db.get(Incident, ouvert).deleted == 1
+
+    def test_statistiques_et_date_de_modification(self, db, quatre_incidents):
+        """✅ Compteurs par statut déplacés, dateModification mise à jour, cache invalidé"""
+        ouvert, en_cours, resolu, _ = quatre_incidents
+        avant = db.get(Incident, resolu).dateModification
+        incident_cache.put(resolu, b"{}")
+        IncidentService.transition_many(db, StatutEnum.FERME, ids=[ouvert, en_cours, resolu])
+        assert StatsService.check(db) == {}
+        assert StatsService.get(db).statut == {"FERME": 4}
+        db.expire_all()
+        assert db.get(Incident, resolu).dateModification >= avant
+        assert incident_cache.get(resolu) is None
+
+    def test_par_filtre(self, db, quatre_incidents):
+        """✅ Filtre : seuls les incidents actifs retenus, dans l'ordre des ids"""
+        ouvert, en_cours, resolu, ferme = quatre_incidents
+        IncidentService.soft_delete(db, ouvert)
+        # include_deleted est ignoré : jamais de transition sur un incident supprimé
+        filtre = IncidentFilter(statut=["OUVERT", "EN_COURS", "RESOLU"], include_deleted=True)
+        result = IncidentService.transition_many(db, StatutEnum.FERME, filters=filtre)
+        assert [(r.id, r.outcome.value) for r in result.results] == [(en_cours, "updated"), (resolu, "updated")]
+
+    def test_filtre_trop_large(self, db, quatre_incidents, monkeypatch):
+        """❌ Filtre retenant plus que la limite → ValueError, rien n'est modifié"""
+        monkeypatch.setattr(incident_service, "STATUS_BATCH_LIMIT", 2)
+        with pytest.raises(ValueError):
+            IncidentService.transition_many(db, StatutEnum.FERME, filters=IncidentFilter())
+        assert db.query(Incident).filter(Incident.statut == StatutEnum.FERME).count() == 1
+
+    def test_requetes_ensemblistes(self, db, patient_en_db, sql_statements):
+        """✅ Un SELECT, un UPDATE et une mise à jour des statistiques, quel que soit le nombre d'incidents"""
+        ids = IncidentService.create_many(db, [IncidentCreate(**_ligne(patient_en_db.id)) for _ in range(300)]).ids
+        debut = len(sql_statements)
+        result = IncidentService.transition_many(db, StatutEnum.RESOLU, ids=ids)
+        assert result.updated == 300
+        sql = [" ".join(statement.split()[:3]).upper() for statement, _ in sql_statements[debut:]]
+        assert len(sql) == 3
+        assert sql[0].startswith("SELECT") and sql[1] == "UPDATE INCIDENTS SET"
+        assert sql[2] == "INSERT INTO INCIDENT_STATS"
+
+
+class TestTransitionStatutApi:
+    """Tests PATCH /api/incidents/status"""
+
+    def test_patch_ids(self, client, quatre_incidents):
+        """✅ Clôture d'une liste d'incidents"""
+        ouvert, en_cours, resolu, ferme = quatre_incidents
+        response = client.patch("/api/incidents/status", json={"statut": "FERME", "ids": [resolu, en_cours, ferme]})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["statut"] == "FERME" and data["updated"] == 2
+        assert [r["outcome"] for r in data["results"]] == ["updated", "updated", "unchanged"]
+        assert client.get(f"/api/incidents/{resolu}").json()["statut"] == "FERME"
+
+    def test_patch_filtre(self, client, quatre_incidents):
+        """✅ Clôture des incidents résolus retenus par un filtre"""
+        response = client.patch("/api/incidents/status", json={"statut": "FERME", "filter": {"statut": ["RESOLU"]}})
+        assert response.status_code == 200
+        assert [r["id"] for r in response.json()["results"]] == [quatre_incidents[2]]
+
+    @pytest.mark.parametrize("corps", [
+        {"statut": "FERME"},
+        {"statut": "FERME", "ids": [1], "filter": {}},
+        {"statut": "FERME", "ids": []},
+        {"statut": "ARCHIVE", "ids": [1]},
+    ])
+    def test_patch_invalide(self, client, corps):
+        """❌ Ni ids ni filtre, les deux, liste vide ou statut inconnu → 422"""
+        assert client.patch("/api/incidents/status", json=corps).status_code == 422
+
+    def test_patch_filtre_trop_large(self, client, quatre_incidents, monkeypatch):
+        """❌ Filtre retenant trop d'incidents → 400"""
+        monkeypatch.setattr(incident_service, "STATUS_BATCH_LIMIT", 2)
+        response = client.patch("/api/incidents/status", json={"statut": "FERME", "filter": {}})
+        assert response.status_code == 400
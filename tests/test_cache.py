@@ -0,0 +1,225 @@
+"""
+Tests - Cache des incidents (lecture traversante + invalidation)
+"""
+import fnmatch
+import json
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import IncidentCache, MemoryCache, RedisCache, incident_cache
+from app.schemas.incident import IncidentCreate, IncidentUpdate
+from app.schemas.suivi_incident import SuiviCreate
+from app.services.incident_service import IncidentService
+from tests.conftest import TestingSessionLocal
+
+
+class FakeRedis:
+    """Substitut local d'un client redis-py (get / set(ex=) / delete / incr / eval / scan_iter)."""
+
+    def __init__(self):
+        self.data = {}
+        self.expirations = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expirations[key] = ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def eval(self, script, numkeys, key, generation_key, value, ttl, generation):
+        """Seul script utilisé : RedisCache.SET_IF_GENERATION."""
+        assert script == RedisCache.SET_IF_GENERATION and numkeys == 2
+        if int(self.data.get(generation_key, 0)) != generation:
+            return 0
+        self.set(key, value, ex=ttl)
+        return 1
+
+    def scan_iter(self, match):
+        return [k for k in list(self.data) if fnmatch.fnmatch(k, match)]
+
+
+@pytest.fixture
+def incident(db, patient_en_db):
+    return IncidentService.create(db, IncidentCreate(
+        dateIncident="2024-03-20",
+        heureIncident="14:30:00",
+        gravite="MINEUR",
+        description="Son faible après calibration",
+        idPatient=patient_en_db.id
+    ))
+
+
+class TestBackends:
+    """Tests des backends de cache"""
+
+    def test_lru_borne(self):
+        """✅ L'entrée la moins récemment utilisée est évincée"""
+        cache = MemoryCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")
+        cache.set("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1" and cache.get("c") == b"3"
+
+    def test_ttl(self, monkeypatch):
+        """✅ Une entrée expirée n'est plus servie"""
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+        cache = MemoryCache(max_entries=10, ttl_seconds=5)
+        cache.set("a", b"1")
+        now[0] += 4
+        assert cache.get("a") == b"1"
+        now[0] += 2
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_redis_partage(self):
+        """✅ Backend partagé : préfixe, TTL et purge"""
+        client = FakeRedis()
+        cache = IncidentCache(RedisCache(client, ttl_seconds=30))
+        cache.put(1, b"{}")
+        assert client.expirations == {"followup:incident:1": 30}
+        assert IncidentCache(RedisCache(client, ttl_seconds=30)).get(1) == b"{}"
+        cache.invalidate(1)
+        assert cache.get(1) is None
+        cache.put(2, b"{}")
+        cache.clear()
+        assert list(client.data) == ["followup:generation"]
+
+    @pytest.mark.parametrize("backend", [
+        lambda: MemoryCache(max_entries=10, ttl_seconds=60),
+        lambda: RedisCache(FakeRedis(), ttl_seconds=30),
+    ], ids=["memory", "redis"])
+    def test_generation(self, backend):
+        """✅ Mise en cache refusée si une invalidation a eu lieu depuis la génération lue"""
+        cache = IncidentCache(backend())
+        generation = cache.generation()
+        assert cache.put(1, b"v1", generation)
+        cache.invalidate(2)
+        assert not cache.put(1, b"v1-perime", generation)
+        assert cache.get(1) == b"v1"
+        generation = cache.generation()
+        cache.clear()
+        assert not cache.put(1, b"v1", generation)
+        assert cache.put(1, b"v2", cache.generation())
+
+    def test_redis_refuse_en_asynchrone(self, monkeypatch):
+        """❌ CACHE_BACKEND=redis avec DATABASE_ASYNC : refusé au démarrage"""
+        monkeypatch.setattr(cache_module.settings, "CACHE_BACKEND", "redis")
+        monkeypatch.setattr(cache_module.settings, "DATABASE_ASYNC", True)
+        with pytest.raises(RuntimeError, match="DATABASE_ASYNC"):
+            cache_module.build_backend()
+
+    def test_compteurs(self):
+        """✅ Compteurs de succès / échecs"""
+        cache = IncidentCache(MemoryCache(max_entries=10, ttl_seconds=60))
+        cache.get(1)
+        cache.put(1, b"{}")
+        cache.get(1)
+        cache.get(1)
+        assert cache.stats() == {"backend": "MemoryCache", "hits": 2, "misses": 1, "hit_ratio": 0.6667}
+
+
+class TestCacheService:
+    """Tests de la lecture traversante dans IncidentService"""
+
+    def test_second_appel_sans_requete(self, db, incident, sql_statements):
+        """✅ Le second accès est servi sans requête SQL"""
+        premier = IncidentService.get_payload(db, incident.id)
+        nb_requetes = len(sql_statements)
+        assert IncidentService.get_payload(db, incident.id) == premier
+        assert len(sql_statements) == nb_requetes
+
+    def test_inexistant_non_cache(self, db):
+        """❌ Incident inexistant → None"""
+        assert IncidentService.get_payload(db, 99999) is None
+
+    @pytest.mark.parametrize("ecriture", [
+        lambda db, i: IncidentService.update(db, i, IncidentUpdate(gravite="CRITIQUE")),
+        lambda db, i: IncidentService.add_suivi(db, i, SuiviCreate(dateSuivi="2024-03-25", actionsPrises="Contrôle")),
+        lambda db, i: IncidentService.soft_delete(db, i),
+    ], ids=["update", "add_suivi", "soft_delete"])
+    def test_invalidation(self, db, incident, ecriture):
+        """✅ Chaque écriture invalide l'entrée de l'incident"""
+        avant = IncidentService.get_payload(db, incident.id)
+        ecriture(db, incident.id)
+        assert IncidentService.get_payload(db, incident.id) != avant
+
+    def test_ecriture_pendant_le_chargement(self, db, incident, monkeypatch):
+        """❌ Écriture validée entre la lecture en base et la mise en cache : version lue non mise en cache"""
+        serialize = IncidentService.serialize
+
+        def ecriture_concurrente(obj):
+            payload = serialize(obj)
+            monkeypatch.setattr(IncidentService, "serialize", serialize)
+            with TestingSessionLocal() as autre:
+                IncidentService.update(autre, incident.id, IncidentUpdate(gravite="CRITIQUE"))
+            return payload
+
+        monkeypatch.setattr(IncidentService, "serialize", staticmethod(ecriture_concurrente))
+        assert json.loads(IncidentService.get_payload(db, incident.id))["version"] == 1
+        assert incident_cache.get(incident.id) is None
+        assert IncidentService.incident_version(db, incident.id)[0] == 2
+        with TestingSessionLocal() as requete_suivante:
+            assert json.loads(IncidentService.get_payload(requete_suivante, incident.id))["gravite"] == "CRITIQUE"
+
+    def test_prechauffage(self, db, patient_en_db):
+        """✅ Le préchauffage charge uniquement les incidents ouverts"""
+        ids = IncidentService.create_many(db, [IncidentCreate(
+            dateIncident="2024-03-20",
+            heureIncident="14:30:00",
+            gravite="MINEUR",
+            description=f"Incident {i}",
+            idPatient=patient_en_db.id
+        ) for i in range(3)]).ids
+        IncidentService.update(db, ids[0], IncidentUpdate(statut="RESOLU"))
+        incident_cache.clear()
+        assert IncidentService.warm_cache(db, limit=100) == 2
+        assert incident_cache.get(ids[0]) is None
+        assert incident_cache.get(ids[1]) is not None and incident_cache.get(ids[2]) is not None
+
+
+@pytest.fixture
+def incident_api(client, patient_en_db):
+    response = client.post("/api/incidents/", json={
+        "dateIncident": "2024-03-20",
+        "heureIncident": "14:30:00",
+        "gravite": "MINEUR",
+        "description": "Son faible après calibration",
+        "idPatient": patient_en_db.id
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+class TestCacheApi:
+    """Tests GET /api/incidents/{id} avec cache"""
+
+    def test_reponse_identique(self, client, incident_api):
+        """✅ La réponse servie depuis le cache est identique à la réponse initiale"""
+        r1 = client.get(f"/api/incidents/{incident_api['id']}")
+        r2 = client.get(f"/api/incidents/{incident_api['id']}")
+        assert r1.content == r2.content
+        assert r2.headers["content-type"] == "application/json"
+        assert json.loads(r2.content) == incident_api
+
+    def test_put_visible(self, client, incident_api):
+        """✅ Une mise à jour est immédiatement visible"""
+        client.get(f"/api/incidents/{incident_api['id']}")
+        client.put(f"/api/incidents/{incident_api['id']}", json={"gravite": "MAJEUR"})
+        assert client.get(f"/api/incidents/{incident_api['id']}").json()["gravite"] == "MAJEUR"
+
+    def test_stats_sante(self, client):
+        """✅ Les compteurs du cache sont exposés par /health"""
+        assert set(client.get("/health").json()["cache"]) == {"backend", "hits", "misses", "hit_ratio"}
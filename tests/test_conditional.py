@@ -0,0 +1,188 @@
+"""
+Tests - Requêtes conditionnelles (ETag / Last-Modified / If-Match)
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from app.core.cache import incident_cache
+from app.core.conditional import etag_matches, http_date, strong_etag
+from app.models.incident import Incident
+from app.schemas.incident import IncidentCreate
+from app.services.incident_service import IncidentService
+
+
+@pytest.fixture
+def incident_id(db, patient_en_db):
+    return IncidentService.create(db, IncidentCreate(
+        dateIncident="2024-03-20",
+        heureIncident="14:30:00",
+        gravite="MINEUR",
+        description="Son faible après calibration",
+        idPatient=patient_en_db.id
+    )).id
+
+
+class TestValidateurs:
+    """Tests des fonctions de comparaison d'ETag"""
+
+    def test_comparaison(self):
+        """✅ Comparaison forte pour If-Match, faible pour If-None-Match"""
+        etag = strong_etag("incident", 1)
+        assert etag_matches(f'"autre", {etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(f"W/{etag}", etag)
+        assert etag_matches(f"W/{etag}", etag, weak=True)
+        assert not etag_matches(None, etag)
+
+    def test_date_http(self):
+        """✅ Last-Modified au format IMF-fixdate"""
+        assert http_date(datetime(2024, 3, 20, 14, 30, 5, 123)) == "Wed, 20 Mar 2024 14:30:05 GMT"
+
+
+class TestGetIncidentConditionnel:
+    """Tests GET /api/incidents/{id} avec If-None-Match"""
+
+    def test_304_sans_chargement(self, client, incident_id, sql_statements):
+        """✅ ETag inchangé → 304 sans corps, via une requête de métadonnées uniquement"""
+        response = client.get(f"/api/incidents/{incident_id}")
+        etag = response.headers["etag"]
+        assert response.headers["last-modified"].endswith("GMT")
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        incident_cache.clear()
+        sql_statements.clear()
+        response = client.get(f"/api/incidents/{incident_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert len(sql_statements) == 1
+        assert "description" not in sql_statements[0][0]
+
+    def test_304_depuis_le_cache(self, client, incident_id, sql_statements):
+        """✅ Incident en cache → 304 sans aucune requête SQL"""
+        etag = client.get(f"/api/incidents/{incident_id}").headers["etag"]
+        sql_statements.clear()
+        assert client.get(f"/api/incidents/{incident_id}", headers={"If-None-Match": etag}).status_code == 304
+        assert sql_statements == []
+
+    def test_modifie_200(self, client, incident_id):
+        """✅ Après une mise à jour, l'ancien ETag ne correspond plus"""
+        etag = client.get(f"/api/incidents/{incident_id}").headers["etag"]
+        client.put(f"/api/incidents/{incident_id}", json={"gravite": "MAJEUR"})
+        response = client.get(f"/api/incidents/{incident_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["gravite"] == "MAJEUR"
+        assert response.headers["etag"] != etag
+
+    def test_if_modified_since(self, client, incident_id):
+        """✅ If-Modified-Since égal à Last-Modified → 304"""
+        last_modified = client.get(f"/api/incidents/{incident_id}").headers["last-modified"]
+        response = client.get(f"/api/incidents/{incident_id}", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+    def test_supprime_404(self, client, incident_id):
+        """❌ Incident supprimé → 404 même avec un ETag connu"""
+        etag = client.get(f"/api/incidents/{incident_id}").headers["etag"]
+        client.delete(f"/api/incidents/{incident_id}")
+        assert client.get(f"/api/incidents/{incident_id}", headers={"If-None-Match": etag}).status_code == 404
+
+
+class TestIfMatch:
+    """Tests PUT /api/incidents/{id} avec If-Match"""
+
+    def test_version_courante(self, client, incident_id):
+        """✅ If-Match à jour → mise à jour appliquée, nouvel ETag renvoyé"""
+        etag = client.get(f"/api/incidents/{incident_id}").headers["etag"]
+        response = client.put(
+            f"/api/incidents/{incident_id}", json={"gravite": "MAJEUR"}, headers={"If-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] == client.get(f"/api/incidents/{incident_id}").headers["etag"]
+
+    def test_etag_du_put_relu(self, client, incident_id):
+        """✅ ETag, Last-Modified et dates du PUT identiques à ceux relus ensuite (secondes entières : DATETIME)"""
+        url = f"/api/incidents/{incident_id}"
+        put = client.put(url, json={"gravite": "MAJEUR"}, headers={"If-Match": client.get(url).headers["etag"]})
+        incident_cache.clear()
+        get = client.get(url)
+        assert put.headers["etag"] == get.headers["etag"]
+        assert put.headers["last-modified"] == get.headers["last-modified"]
+        for champ in ("dateCreation", "dateModification"):
+            assert put.json()[champ] == get.json()[champ]
+            assert datetime.fromisoformat(put.json()[champ]).microsecond == 0
+        response = client.put(url, json={"gravite": "CRITIQUE"}, headers={"If-Match": put.headers["etag"]})
+        assert response.status_code == 200
+
+    def test_version_perimee(self, client, incident_id):
+        """❌ If-Match périmé → 412, incident inchangé"""
+        etag = client.get(f"/api/incidents/{incident_id}").headers["etag"]
+        client.put(f"/api/incidents/{incident_id}", json={"gravite": "MAJEUR"})
+        response = client.put(
+            f"/api/incidents/{incident_id}", json={"gravite": "CRITIQUE"}, headers={"If-Match": etag}
+        )
+        assert response.status_code == 412
+        assert client.get(f"/api/incidents/{incident_id}").json()["gravite"] == "MAJEUR"
+
+    def test_ecritures_de_la_meme_seconde(self, client, db, incident_id):
+        """❌ Écriture concurrente dans la même seconde (DATETIME MySQL) → 412 quand même"""
+        lu = client.get(f"/api/incidents/{incident_id}")
+        client.put(f"/api/incidents/{incident_id}", json={"gravite": "MAJEUR"})
+        _meme_date_modification(db, incident_id, lu.json()["dateModification"])
+
+        url = f"/api/incidents/{incident_id}"
+        assert client.get(url, headers={"If-None-Match": lu.headers["etag"]}).status_code == 200
+        response = client.put(
+            f"/api/incidents/{incident_id}", json={"gravite": "CRITIQUE"}, headers={"If-Match": lu.headers["etag"]}
+        )
+        assert response.status_code == 412
+
+
+def _meme_date_modification(db, incident_id, valeur):
+    """Remet dateModification à `valeur` (ISO), sans toucher à la version : deux écritures de la même seconde."""
+    db.execute(update(Incident).where(Incident.id == incident_id).values(
+        dateModification=datetime.fromisoformat(valeur)
+    ).execution_options(synchronize_session=False))
+    db.commit()
+    incident_cache.clear()
+
+
+class TestListesConditionnelles:
+    """Tests des ETag de listes (incidents d'un patient, suivis)"""
+
+    def test_incidents_patient(self, client, db, patient_en_db, incident_id, sql_statements):
+        """✅ 304 tant que rien ne change, 200 après création ou suppression"""
+        url = f"/api/patients/{patient_en_db.id}/incidents"
+        etag = client.get(url).headers["etag"]
+        sql_statements.clear()
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        assert len(sql_statements) == 1
+
+        assert client.get(url, params={"limit": 1}, headers={"If-None-Match": etag}).status_code == 200
+        client.delete(f"/api/incidents/{incident_id}")
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200 and response.json() == []
+
+    def test_incidents_patient_meme_seconde(self, client, db, patient_en_db, incident_id):
+        """✅ Une modification dans la même seconde change quand même l'ETag de la liste"""
+        url = f"/api/patients/{patient_en_db.id}/incidents"
+        lu = client.get(url)
+        client.put(f"/api/incidents/{incident_id}", json={"gravite": "MAJEUR"})
+        _meme_date_modification(db, incident_id, lu.json()[0]["dateModification"])
+        response = client.get(url, headers={"If-None-Match": lu.headers["etag"]})
+        assert response.status_code == 200 and response.json()[0]["gravite"] == "MAJEUR"
+
+    def test_patient_inexistant(self, client):
+        """❌ Patient inexistant → 404"""
+        assert client.get("/api/patients/99999/incidents", headers={"If-None-Match": "*"}).status_code == 404
+
+    def test_suivis(self, client, incident_id):
+        """✅ L'ajout d'un suivi change l'ETag de la liste"""
+        url = f"/api/incidents/{incident_id}/suivis"
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        client.post(url, json={"dateSuivi": "2024-03-25", "actionsPrises": "Contrôle"})
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200 and len(response.json()) == 1
+        assert "last-modified" in response.headers
@@ -0,0 +1,92 @@
+"""
+Tests - Export en flux NDJSON / CSV
+"""
+import csv
+import io
+import json
+
+from app.schemas.incident import ExportFormat, IncidentCreate, IncidentFilter
+from app.schemas.suivi_incident import SuiviCreate
+from app.services.export_service import EXPORT_BATCH_SIZE, ExportService
+from app.services.incident_service import IncidentService
+
+
+def _creer(db, patient, gravite="MINEUR", date_incident="2024-03-20", n=1):
+    items = [IncidentCreate(
+        dateIncident=date_incident,
+        heureIncident="14:30:00",
+        gravite=gravite,
+        description=f"Incident « {gravite} » n°{i}",
+        idPatient=patient.id
+    ) for i in range(n)]
+    return IncidentService.create_many(db, items).ids
+
+
+class TestExportIncidents:
+    """Tests GET /api/incidents/export"""
+
+    def test_ndjson_identique_api(self, client, db, patient_en_db):
+        """✅ Chaque ligne NDJSON reprend la représentation de GET /api/incidents/{id}"""
+        [incident_id] = _creer(db, patient_en_db)
+        response = client.get("/api/incidents/export", params={"format": "ndjson"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lignes = [json.loads(line) for line in response.text.splitlines()]
+        attendu = client.get(f"/api/incidents/{incident_id}").json()
+        assert lignes == [{**attendu, "deleted": 0}]
+
+    def test_csv(self, client, db, patient_en_db):
+        """✅ Export CSV avec en-tête et valeurs énumérées lisibles"""
+        _creer(db, patient_en_db, n=2)
+        response = client.get("/api/incidents/export", params={"format": "csv"})
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="incidents.csv"' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 2
+        assert rows[0]["gravite"] == "MINEUR" and rows[0]["statut"] == "OUVERT"
+        assert rows[0]["description"] == "Incident « MINEUR » n°0"
+
+    def test_filtres(self, client, db, patient_en_db):
+        """✅ Filtres gravité (multiple), statut, période et suppression"""
+        _creer(db, patient_en_db, gravite="MINEUR", date_incident="2024-01-10")
+        [majeur] = _creer(db, patient_en_db, gravite="MAJEUR", date_incident="2024-02-10")
+        [critique] = _creer(db, patient_en_db, gravite="CRITIQUE", date_incident="2024-03-10")
+        IncidentService.soft_delete(db, critique)
+
+        def ids(**params):
+            text = client.get("/api/incidents/export", params=params).text
+            return [json.loads(line)["id"] for line in text.splitlines()]
+
+        assert ids(gravite=["MAJEUR", "CRITIQUE"]) == [majeur]
+        assert ids(gravite=["MAJEUR", "CRITIQUE"], include_deleted=True) == [majeur, critique]
+        assert ids(date_from="2024-02-01", date_to="2024-02-28") == [majeur]
+        assert ids(statut="FERME", include_deleted=True) == [critique]
+
+    def test_format_invalide(self, client):
+        """❌ Format inconnu → 422"""
+        assert client.get("/api/incidents/export", params={"format": "xml"}).status_code == 422
+
+
+class TestExportSuivis:
+    """Tests GET /api/incidents/export/suivis"""
+
+    def test_suivis_filtres_par_incident(self, client, db, patient_en_db):
+        """✅ Seuls les suivis des incidents retenus sont exportés"""
+        [mineur] = _creer(db, patient_en_db, gravite="MINEUR")
+        [majeur] = _creer(db, patient_en_db, gravite="MAJEUR")
+        for incident_id in (mineur, majeur):
+            IncidentService.add_suivi(db, incident_id, SuiviCreate(dateSuivi="2024-03-25", actionsPrises="Contrôle"))
+        response = client.get("/api/incidents/export/suivis", params={"gravite": "MAJEUR"})
+        lignes = [json.loads(line) for line in response.text.splitlines()]
+        assert [s["idIncident"] for s in lignes] == [majeur]
+
+
+class TestExportStreaming:
+    """Tests du découpage en flux"""
+
+    def test_lecture_par_lots(self, db, patient_en_db):
+        """✅ Les lignes sont émises par lots de EXPORT_BATCH_SIZE"""
+        _creer(db, patient_en_db, n=EXPORT_BATCH_SIZE * 2 + 5)
+        statement = IncidentService.export_incidents_statement(IncidentFilter())
+        chunks = list(ExportService.stream(db, statement, ExportFormat.NDJSON))
+        assert [chunk.count("\n") for chunk in chunks] == [EXPORT_BATCH_SIZE, EXPORT_BATCH_SIZE, 5]
@@ -0,0 +1,95 @@
+"""
+Tests - Champs choisis (fields=) et format colonnes (format=columnar) sur la liste des incidents
+"""
+from datetime import date, datetime, time
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.incident import Incident
+
+CHAMPS = "id,gravite,statut,dateIncident,idPatient"
+
+
+@pytest.fixture
+def incidents(db, patient_en_db):
+    db.execute(insert(Incident), [{
+        "dateIncident": date(2024, 3, 1 + i),
+        "heureIncident": time(14, 30),
+        "gravite": "MAJEUR" if i % 2 else "MINEUR",
+        "statut": "OUVERT",
+        "description": f"Perte de son côté droit après réglage n°{i} " * 20,
+        "idPatient": patient_en_db.id,
+        "idProcesseur": 7 if i % 2 else None,
+        "dateCreation": datetime(2024, 3, 1, 12, 0, i),
+    } for i in range(5)])
+    db.commit()
+
+
+def _selects(sql_statements):
+    return [statement for statement, _ in sql_statements if "FROM incidents" in statement]
+
+
+class TestChamps:
+    """Tests du paramètre fields="""
+
+    def test_champs_restreints(self, client, incidents, sql_statements):
+        """✅ Seuls les champs demandés sont lus et renvoyés"""
+        complet = client.get("/api/incidents/").json()
+        del sql_statements[:]
+        response = client.get(f"/api/incidents/?fields={CHAMPS}")
+        assert response.status_code == 200
+        assert response.json() == [
+            {champ: incident[champ] for champ in ("id", "dateIncident", "gravite", "statut", "idPatient")}
+            for incident in complet
+        ]
+        [select] = _selects(sql_statements)
+        assert "description" not in select
+        assert "heureIncident" not in select
+
+    def test_ordre_des_champs(self, client, incidents):
+        """✅ L'ordre et les doublons de fields n'affectent pas la réponse"""
+        a = client.get("/api/incidents/?fields=statut,id").content
+        b = client.get("/api/incidents/?fields=id,statut,id").content
+        assert a == b
+        assert list(client.get("/api/incidents/?fields=statut,id").json()[0]) == ["id", "statut"]
+
+    def test_pagination(self, client, incidents):
+        """✅ Le curseur fonctionne même si les colonnes de tri ne sont pas demandées"""
+        page = client.get("/api/incidents/?fields=id&limit=2")
+        suite = client.get(f"/api/incidents/?fields=id&limit=2&cursor={page.headers['x-next-cursor']}")
+        complet = client.get("/api/incidents/?fields=id").json()
+        assert page.json() + suite.json() == complet[:4]
+
+    def test_champ_inconnu(self, client, incidents):
+        """❌ Champ inconnu → 400"""
+        response = client.get("/api/incidents/?fields=id,motDePasse")
+        assert response.status_code == 400
+        assert "motDePasse" in response.json()["detail"]
+
+
+class TestColonnes:
+    """Tests de format=columnar"""
+
+    def test_un_tableau_par_champ(self, client, incidents):
+        """✅ Un tableau par champ, dans l'ordre des lignes"""
+        lignes = client.get(f"/api/incidents/?fields={CHAMPS}").json()
+        colonnes = client.get(f"/api/incidents/?fields={CHAMPS}&format=columnar").json()
+        assert list(colonnes) == ["id", "dateIncident", "gravite", "statut", "idPatient"]
+        assert colonnes == {champ: [ligne[champ] for ligne in lignes] for champ in colonnes}
+
+    def test_tous_les_champs(self, client, incidents):
+        """✅ Sans fields, toutes les colonnes de IncidentResponse, valeurs nulles comprises"""
+        lignes = client.get("/api/incidents/").json()
+        colonnes = client.get("/api/incidents/?format=columnar").json()
+        assert colonnes == {champ: [ligne[champ] for ligne in lignes] for champ in lignes[0]}
+        assert None in colonnes["idProcesseur"]
+
+    def test_liste_vide(self, client):
+        """✅ Aucun incident : des tableaux vides"""
+        response = client.get("/api/incidents/?fields=id,statut&format=columnar")
+        assert response.json() == {"id": [], "statut": []}
+
+    def test_format_inconnu(self, client):
+        """❌ Format inconnu → 422"""
+        assert client.get("/api/incidents/?format=xml").status_code == 422
@@ -0,0 +1,265 @@
+"""
+Tests - Idempotency-Key sur la création d'incidents et de suivis
+"""
+import asyncio
+import fnmatch
+import json
+import threading
+
+import pytest
+
+from app.core import idempotency
+from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware, MemoryIdempotencyStore, RedisIdempotencyStore
+from app.models.incident import Incident
+from app.models.suivi_incident import SuiviIncident
+
+
+class FakeRedis:
+    """Substitut local d'un client redis-py (get / set(ex=, nx=) / delete)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [k for k in list(self.data) if fnmatch.fnmatch(k, match)]
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    store = MemoryIdempotencyStore(max_entries=100)
+    monkeypatch.setattr(idempotency, "idempotency_store", store)
+    return store
+
+
+@pytest.fixture
+def nouvel_incident(patient_en_db):
+    return {
+        "dateIncident": "2024-03-20",
+        "heureIncident": "14:30:00",
+        "gravite": "MINEUR",
+        "description": "Son faible après calibration du processeur vocal",
+        "idPatient": patient_en_db.id,
+    }
+
+
+class TestIdempotenceApi:
+    """Tests de l'en-tête Idempotency-Key sur les routes de création"""
+
+    def test_rejeu_sans_doublon(self, client, db, nouvel_incident, sql_statements):
+        """✅ Même clé : réponse de la première requête, sans requête SQL ni doublon"""
+        headers = {"Idempotency-Key": "mobile-7f3a"}
+        premiere = client.post("/api/incidents/", json=nouvel_incident, headers=headers)
+        assert premiere.status_code == 201
+        assert "idempotent-replayed" not in premiere.headers
+
+        del sql_statements[:]
+        rejeu = client.post("/api/incidents/", json=nouvel_incident, headers=headers)
+        assert rejeu.status_code == 201
+        assert rejeu.headers["idempotent-replayed"] == "true"
+        assert rejeu.headers["content-type"] == "application/json"
+        assert rejeu.json() == premiere.json()
+        assert sql_statements == []
+        assert db.query(Incident).count() == 1
+
+    def test_sans_cle(self, client, db, nouvel_incident):
+        """✅ Sans Idempotency-Key, chaque requête crée un incident (comportement inchangé)"""
+        client.post("/api/incidents/", json=nouvel_incident)
+        client.post("/api/incidents/", json=nouvel_incident)
+        assert db.query(Incident).count() == 2
+
+    def test_cles_distinctes(self, client, db, nouvel_incident):
+        """✅ Deux clés différentes : deux créations"""
+        client.post("/api/incidents/", json=nouvel_incident, headers={"Idempotency-Key": "a"})
+        client.post("/api/incidents/", json=nouvel_incident, headers={"Idempotency-Key": "b"})
+        assert db.query(Incident).count() == 2
+
+    def test_cle_reutilisee_autre_corps(self, client, db, nouvel_incident):
+        """❌ Même clé, corps différent → 422"""
+        headers = {"Idempotency-Key": "mobile-7f3a"}
+        client.post("/api/incidents/", json=nouvel_incident, headers=headers)
+        autre = {**nouvel_incident, "description": "Douleur au niveau de l'aimant"}
+        response = client.post("/api/incidents/", json=autre, headers=headers)
+        assert response.status_code == 422
+        assert db.query(Incident).count() == 1
+
+    def test_en_tetes_cors(self, client, nouvel_incident):
+        """✅ Rejeu et 422 répondus par le middleware portent les en-têtes CORS"""
+        headers = {"Idempotency-Key": "mobile-7f3a", "Origin": "https://followup.example"}
+        client.post("/api/incidents/", json=nouvel_incident, headers=headers)
+        rejeu = client.post("/api/incidents/", json=nouvel_incident, headers=headers)
+        assert rejeu.headers["idempotent-replayed"] == "true"
+        assert "access-control-allow-origin" in rejeu.headers
+        assert "idempotent-replayed" in rejeu.headers["access-control-expose-headers"].lower()
+        autre = client.post("/api/incidents/", json={**nouvel_incident, "description": "Autre"}, headers=headers)
+        assert autre.status_code == 422
+        assert "access-control-allow-origin" in autre.headers
+
+    def test_cle_invalide(self, client, nouvel_incident):
+        """❌ Clé vide ou trop longue → 400"""
+        response = client.post("/api/incidents/", json=nouvel_incident, headers={"Idempotency-Key": "x" * 256})
+        assert response.status_code == 400
+
+    def test_erreur_non_conservee(self, client, db, nouvel_incident, store):
+        """✅ Une réponse en erreur n'est pas conservée : la tentative suivante s'exécute"""
+        headers = {"Idempotency-Key": "mobile-7f3a"}
+        response = client.post("/api/incidents/", json={**nouvel_incident, "idPatient": 99999}, headers=headers)
+        assert response.status_code == 400
+        assert store.get("/api/incidents|mobile-7f3a") is None
+
+    def test_suivi(self, client, db, nouvel_incident):
+        """✅ Suivi rejoué sans doublon ; la clé est propre à chaque route"""
+        incident = client.post("/api/incidents/", json=nouvel_incident, headers={"Idempotency-Key": "k1"}).json()
+        suivi = {"dateSuivi": "2024-03-25", "actionsPrises": "Remplacement de l'antenne"}
+        url = f"/api/incidents/{incident['id']}/suivis"
+        premiere = client.post(url, json=suivi, headers={"Idempotency-Key": "k1"})
+        rejeu = client.post(url, json=suivi, headers={"Idempotency-Key": "k1"})
+        assert premiere.status_code == rejeu.status_code == 201
+        assert rejeu.json() == premiere.json()
+        assert db.query(SuiviIncident).count() == 1
+
+    def test_autres_routes_ignorees(self, client, db, nouvel_incident):
+        """✅ L'en-tête est ignoré hors des routes de création"""
+        incident = client.post("/api/incidents/", json=nouvel_incident).json()
+        headers = {"Idempotency-Key": "k1"}
+        url = f"/api/incidents/{incident['id']}"
+        assert "idempotent-replayed" not in client.put(url, json={"gravite": "MAJEUR"}, headers=headers).headers
+        assert "idempotent-replayed" not in client.put(url, json={"gravite": "MINEUR"}, headers=headers).headers
+
+
+def _appel(app, corps=b'{"a": 1}', cle=b"cle-1"):
+    """Appelle une application ASGI ; renvoie (statut, en-têtes, corps)."""
+    async def run():
+        messages = [{"type": "http.request", "body": corps, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/api/incidents/", "headers": [(b"idempotency-key", cle)]}
+        await app(scope, receive, send)
+        start = sent[0]
+        return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in sent[1:])
+    return run()
+
+
+class LentApp:
+    """Application ASGI de test : compte ses exécutions, répond 201 après `delay` secondes."""
+
+    def __init__(self, delay=0.2, status=201):
+        self.delay, self.status, self.calls = delay, status, 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        body = (await receive())["body"]
+        await asyncio.sleep(self.delay)
+        payload = json.dumps({"execution": self.calls, "recu": body.decode()}).encode()
+        await send({"type": "http.response.start", "status": self.status,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": payload})
+
+
+class TestConcurrenceIdempotence:
+    """Tests du middleware : tentatives simultanées d'une même clé"""
+
+    def test_une_seule_execution(self):
+        """✅ Tentatives simultanées : une exécution, les autres attendent et rejouent sa réponse"""
+        app = LentApp()
+        middleware = IdempotencyMiddleware(app)
+
+        async def scenario():
+            return await asyncio.gather(*(_appel(middleware) for _ in range(5)))
+
+        reponses = asyncio.run(scenario())
+        assert app.calls == 1
+        assert {corps for _, _, corps in reponses} == {b'{"execution": 1, "recu": "{\\"a\\": 1}"}'}
+        assert sum(b"idempotent-replayed" in headers for _, headers, _ in reponses) == 4
+
+    def test_attente_depassee(self, monkeypatch):
+        """❌ Exécution trop longue : la tentative concurrente reçoit 409 et Retry-After"""
+        monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.05)
+        middleware = IdempotencyMiddleware(LentApp(delay=0.5))
+
+        async def scenario():
+            premiere = asyncio.ensure_future(_appel(middleware))
+            await asyncio.sleep(0.01)
+            seconde = await _appel(middleware)
+            return await premiere, seconde
+
+        premiere, seconde = asyncio.run(scenario())
+        assert premiere[0] == 201
+        assert seconde[0] == 409
+        assert seconde[1][b"retry-after"] == b"1"
+
+    def test_erreur_libere_la_cle(self):
+        """✅ Une exécution en erreur libère la clé : la tentative suivante s'exécute"""
+        app = LentApp(delay=0, status=503)
+        middleware = IdempotencyMiddleware(app)
+        asyncio.run(_appel(middleware))
+        asyncio.run(_appel(middleware))
+        assert app.calls == 2
+
+
+class TestMagasins:
+    """Tests des magasins clé → réponse"""
+
+    def test_memoire_expiration(self):
+        """✅ Une clé expirée peut être réclamée à nouveau"""
+        store = MemoryIdempotencyStore(max_entries=10)
+        assert store.claim("k", b"P|x", ttl_seconds=-1)
+        assert store.get("k") is None
+        assert store.claim("k", b"P|x", ttl_seconds=60)
+        assert not store.claim("k", b"P|y", ttl_seconds=60)
+
+    def test_memoire_taille_bornee(self):
+        """✅ Les clés les plus anciennes sont évincées au-delà de max_entries"""
+        store = MemoryIdempotencyStore(max_entries=2)
+        for key in ("a", "b", "c"):
+            store.set(key, b"D", ttl_seconds=60)
+        assert store.get("a") is None and store.get("c") == b"D"
+
+    def test_redis_set_nx(self):
+        """✅ Redis : réclamation atomique par SET NX, préfixe propre"""
+        client = FakeRedis()
+        store = RedisIdempotencyStore(client)
+        assert store.claim("k", b"P|x", ttl_seconds=60)
+        assert not store.claim("k", b"P|y", ttl_seconds=60)
+        assert client.data == {"followup:idempotency:k": b"P|x"}
+        store.delete("k")
+        assert store.get("k") is None
+
+    def test_redis_hors_boucle(self, monkeypatch):
+        """✅ Redis : les appels réseau du middleware s'exécutent hors de la boucle d'événements"""
+        threads = []
+
+        class RedisTrace(FakeRedis):
+            def set(self, key, value, ex=None, nx=False):
+                threads.append(threading.get_ident())
+                return super().set(key, value, ex=ex, nx=nx)
+
+        monkeypatch.setattr(idempotency, "idempotency_store", RedisIdempotencyStore(RedisTrace()))
+        middleware = IdempotencyMiddleware(LentApp(delay=0))
+
+        async def scenario():
+            await _appel(middleware)
+            return threading.get_ident()
+
+        boucle = asyncio.run(scenario())
+        assert len(threads) == 2  # claim puis réponse conservée
+        assert boucle not in threads
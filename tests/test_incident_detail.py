@@ -0,0 +1,89 @@
+"""
+Tests - Détail d'incident avec ressources liées (include=)
+"""
+import pytest
+
+from app.models.medecin import Medecin
+from app.schemas.incident import IncidentCreate, IncidentInclude
+from app.schemas.suivi_incident import SuiviCreate
+from app.services.incident_service import IncidentService
+
+
+@pytest.fixture
+def incident_complet(db, patient_en_db):
+    medecin = Medecin(nom="Bernard", prenom="Louis", specialite="ORL")
+    db.add(medecin)
+    db.commit()
+    incident = IncidentService.create(db, IncidentCreate(
+        dateIncident="2024-03-20",
+        heureIncident="14:30:00",
+        gravite="MAJEUR",
+        description="Perte de son côté droit",
+        idPatient=patient_en_db.id,
+        idMedecin=medecin.id
+    ))
+    for jour in ("2024-03-26", "2024-03-25"):
+        IncidentService.add_suivi(db, incident.id, SuiviCreate(dateSuivi=jour, actionsPrises="Contrôle du processeur"))
+    incident_id = incident.id
+    db.expunge_all()
+    return incident_id
+
+
+class TestDetailService:
+    """Tests du chargement du graphe d'objets"""
+
+    @pytest.mark.parametrize("include, nb_requetes", [
+        ((), 1),
+        (("patient",), 1),
+        (("medecin",), 1),
+        (("patient", "medecin"), 1),
+        (("suivis",), 2),
+        (("suivis", "patient", "medecin"), 2),
+    ])
+    def test_nombre_de_requetes(self, db, incident_complet, sql_statements, include, nb_requetes):
+        """✅ Nombre de requêtes SQL fixe par combinaison d'include"""
+        include = {IncidentInclude(name) for name in include}
+        incident = IncidentService.get_detail(db, incident_complet, include)
+        payload = IncidentService.serialize_detail(incident, include)
+        assert len(sql_statements) == nb_requetes
+        assert payload.startswith(b"{")
+
+    def test_relation_non_demandee(self, db, incident_complet):
+        """❌ Une relation non incluse n'est jamais chargée paresseusement"""
+        incident = IncidentService.get_detail(db, incident_complet, {IncidentInclude.PATIENT})
+        with pytest.raises(Exception, match="raise"):
+            incident.suivis
+
+
+class TestDetailApi:
+    """Tests GET /api/incidents/{id}?include="""
+
+    def test_graphe_complet(self, client, incident_complet):
+        """✅ Incident, suivis ordonnés, patient et médecin en une réponse"""
+        response = client.get(f"/api/incidents/{incident_complet}", params={"include": "suivis,patient,medecin"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == incident_complet
+        assert [s["dateSuivi"] for s in data["suivis"]] == ["2024-03-25", "2024-03-26"]
+        assert data["patient"]["id"] == data["idPatient"]
+        assert data["medecin"]["specialite"] == "ORL"
+
+    def test_champs_non_inclus_absents(self, client, incident_complet):
+        """✅ Seules les ressources demandées apparaissent"""
+        data = client.get(f"/api/incidents/{incident_complet}", params={"include": "patient"}).json()
+        assert "patient" in data
+        assert "suivis" not in data and "medecin" not in data
+
+    def test_sans_include_inchange(self, client, incident_complet):
+        """✅ Sans include, la représentation reste celle d'IncidentResponse"""
+        data = client.get(f"/api/incidents/{incident_complet}").json()
+        assert not {"suivis", "patient", "medecin"} & set(data)
+
+    def test_include_invalide(self, client, incident_complet):
+        """❌ Valeur inconnue → 400"""
+        response = client.get(f"/api/incidents/{incident_complet}", params={"include": "suivis,implant"})
+        assert response.status_code == 400
+
+    def test_incident_inexistant(self, client):
+        """❌ Incident inexistant → 404"""
+        assert client.get("/api/incidents/99999", params={"include": "suivis"}).status_code == 404
@@ -0,0 +1,114 @@
+"""
+Tests - Journalisation asynchrone structurée (file d'attente, JSON, échantillonnage, request id)
+"""
+import io
+import json
+import logging
+import random
+import sys
+
+import pytest
+
+from app.core.logs import JsonFormatter, SamplingFilter, build_pipeline, request_id_var
+
+
+@pytest.fixture
+def journal():
+    """Pipeline file d'attente → JSON branché sur le logger `app` ; renvoie une fonction qui lit les lignes écrites."""
+    stream = io.StringIO()
+    handler, listener = build_pipeline(stream)
+    logger = logging.getLogger("app")
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    listener.start()
+
+    def lignes():
+        listener.stop()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield lignes
+    logger.removeHandler(handler)
+    logger.setLevel(level)
+    if listener._thread is not None:
+        listener.stop()
+
+
+def _record(name="app.essai", level=logging.INFO, msg="Incident %s créé", args=(7,)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class TestFormatJson:
+    """Tests du formateur JSON"""
+
+    def test_champs(self):
+        """✅ Une ligne JSON par enregistrement, arguments % fusionnés"""
+        record = _record()
+        record.request_id = "abc"
+        entree = json.loads(JsonFormatter().format(record))
+        assert entree["message"] == "Incident 7 créé"
+        assert {k: entree[k] for k in ("level", "logger", "request_id")} == {
+            "level": "INFO", "logger": "app.essai", "request_id": "abc"
+        }
+        assert entree["ts"].endswith("+00:00")
+
+    def test_exception(self):
+        """✅ La trace de l'exception est incluse"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("app", logging.ERROR, __file__, 1, "échec", (), sys.exc_info())
+        assert "ValueError: boom" in json.loads(JsonFormatter().format(record))["exc"]
+
+
+class TestEchantillonnage:
+    """Tests de l'échantillonnage par logger"""
+
+    def test_taux_par_prefixe(self):
+        """✅ Le préfixe le plus long s'applique ; les autres loggers sont conservés"""
+        filtre = SamplingFilter({"app": 0.5, "app.routers": 0.0}, rng=random.Random(1))
+        assert filtre.rate("app.routers.incidents") == 0.0
+        assert filtre.rate("app.services") == 0.5
+        assert filtre.rate("application") == 1.0
+        assert not filtre.filter(_record("app.routers.incidents"))
+        assert filtre.filter(_record("sqlalchemy.engine"))
+        gardes = sum(filtre.filter(_record("app.services")) for _ in range(1000))
+        assert 400 < gardes < 600
+
+    def test_avertissements_jamais_echantillonnes(self):
+        """✅ WARNING et au-delà toujours conservés"""
+        filtre = SamplingFilter({"app": 0.0})
+        assert filtre.filter(_record(level=logging.WARNING))
+        assert not filtre.filter(_record(level=logging.DEBUG))
+
+
+class TestPipeline:
+    """Tests du pipeline QueueHandler / QueueListener"""
+
+    def test_ecriture_differee(self, journal):
+        """✅ Les messages passent par la file et portent l'identifiant de requête du contexte"""
+        token = request_id_var.set("req-42")
+        try:
+            logging.getLogger("app.essai").info("Suivi %s ajouté à l'incident %s", 3, 9)
+        finally:
+            request_id_var.reset(token)
+        logging.getLogger("app.essai").info("hors requête")
+        [dans, hors] = journal()
+        assert dans["message"] == "Suivi 3 ajouté à l'incident 9" and dans["request_id"] == "req-42"
+        assert hors["request_id"] == "-"
+
+
+class TestRequestId:
+    """Tests de la corrélation par X-Request-ID"""
+
+    def test_identifiant_client_repris(self, client, journal):
+        """✅ L'identifiant fourni est renvoyé et présent dans les journaux de la requête"""
+        response = client.get("/api/incidents/", headers={"X-Request-ID": "client-123"})
+        assert response.headers["X-Request-ID"] == "client-123"
+        assert "client-123" in {ligne["request_id"] for ligne in journal() if ligne["logger"].startswith("app.routers")}
+
+    @pytest.mark.parametrize("entete", [None, "x" * 65, "avec espace", "é".encode("latin-1")])
+    def test_identifiant_genere(self, client, entete):
+        """✅ Identifiant absent ou invalide → nouvel identifiant"""
+        response = client.get("/health", headers={"X-Request-ID": entete} if entete else {})
+        assert len(response.headers["X-Request-ID"]) == 32
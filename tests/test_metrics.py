@@ -0,0 +1,130 @@
+"""
+Tests - Métriques Prometheus (/metrics)
+"""
+import gc
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core import metrics
+from app.core.metrics import Counter, Histogram, Registry, TimedQueuePool
+
+
+@pytest.fixture(autouse=True)
+def registre_vide():
+    metrics.registry.reset()
+    yield
+    metrics.registry.reset()
+
+
+class TestRegistre:
+    """Tests du registre (compteurs par thread, rendu texte)"""
+
+    def test_fusion_des_threads(self):
+        """✅ Les valeurs enregistrées par plusieurs threads sont additionnées"""
+        registre = Registry()
+        compteur = Counter(registre, "essais_total", "Essais.", ("type",))
+
+        def enregistrer():
+            for _ in range(1000):
+                compteur.inc(("a",))
+
+        threads = [threading.Thread(target=enregistrer) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert 'essais_total{type="a"} 4000' in registre.render()
+
+    def test_threads_termines(self):
+        """✅ Les valeurs des threads terminés sont conservées, sans garder un fragment par thread"""
+        registre = Registry()
+        compteur = Counter(registre, "essais_total", "Essais.", ("type",))
+        for _ in range(50):
+            thread = threading.Thread(target=lambda: compteur.inc(("a",)))
+            thread.start()
+            thread.join()
+        gc.collect()
+        assert len(registre._shards) <= 1
+        assert 'essais_total{type="a"} 50' in registre.render()
+
+    def test_histogramme_cumulatif(self):
+        """✅ Buckets cumulés, +Inf, somme et nombre"""
+        registre = Registry()
+        histogramme = Histogram(registre, "duree_seconds", "Durée.", ("route",), buckets=(0.1, 1.0))
+        for valeur in (0.05, 0.1, 0.5, 3.0):
+            histogramme.observe(("/x",), valeur)
+        lignes = registre.render().splitlines()
+        assert lignes[1] == "# TYPE duree_seconds histogram"
+        assert lignes[2:] == [
+            'duree_seconds_bucket{route="/x",le="0.1"} 2',
+            'duree_seconds_bucket{route="/x",le="1.0"} 3',
+            'duree_seconds_bucket{route="/x",le="+Inf"} 4',
+            'duree_seconds_sum{route="/x"} 3.65',
+            'duree_seconds_count{route="/x"} 4',
+        ]
+
+    def test_echappement_des_libelles(self):
+        """✅ Guillemets, barres obliques et retours à la ligne échappés"""
+        registre = Registry()
+        Counter(registre, "c_total", "C.", ("v",)).inc(('a"b\\c\nd',))
+        assert 'c_total{v="a\\"b\\\\c\\nd"} 1' in registre.render()
+
+    def test_cout_enregistrement(self):
+        """✅ Enregistrer une requête coûte quelques microsecondes"""
+        n = 20000
+        start = time.perf_counter()
+        for _ in range(n):
+            metrics.HTTP_IN_FLIGHT.inc(("/api/incidents/{id}", "GET"))
+            metrics.HTTP_IN_FLIGHT.dec(("/api/incidents/{id}", "GET"))
+            metrics.HTTP_REQUESTS.inc(("/api/incidents/{id}", "GET", "200"))
+            metrics.HTTP_LATENCY.observe(("/api/incidents/{id}", "GET"), 0.003)
+        assert (time.perf_counter() - start) / n < 50e-6
+
+
+class TestPool:
+    """Tests des métriques du pool de connexions"""
+
+    def test_attente_et_connexions(self, tmp_path):
+        """✅ Temps d'obtention d'une connexion et connexions empruntées"""
+        class PoolTest(TimedQueuePool):
+            metrics_label = "test"
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=PoolTest, pool_size=1, max_overflow=2)
+        with engine.connect() as c1, engine.connect() as c2:
+            c1.execute(text("SELECT 1"))
+            c2.execute(text("SELECT 1"))
+            rendu = metrics.registry.render()
+            assert 'db_pool_checked_out{pool="test"} 2' in rendu
+            assert 'db_pool_overflow{pool="test"} 1' in rendu
+        assert 'db_pool_wait_seconds_count{pool="test"} 2' in metrics.registry.render()
+        engine.dispose()
+
+
+class TestMetricsApi:
+    """Tests du middleware et de GET /metrics"""
+
+    def test_compteurs_par_route(self, client):
+        """✅ Requêtes comptées par modèle de route, méthode et statut"""
+        client.get("/api/incidents/99998")
+        client.get("/api/incidents/99999")
+        client.get("/api/incidents/abc")
+        client.get("/route/inconnue")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+        assert 'http_requests_total{route="/api/incidents/{id}",method="GET",status="404"} 2' in response.text
+        assert 'http_requests_total{route="/api/incidents/{id}",method="GET",status="422"} 1' in response.text
+        assert 'http_requests_total{route="<unmatched>",method="GET",status="404"} 1' in response.text
+        assert 'http_request_duration_seconds_count{route="/api/incidents/{id}",method="GET"} 3' in response.text
+
+    def test_requetes_en_cours(self, client):
+        """✅ Jauge des requêtes en cours par modèle de route ; revient à zéro (hors requête /metrics elle-même)"""
+        client.get("/health")
+        client.get("/api/incidents/99999")
+        rendu = client.get("/metrics").text
+        assert 'http_requests_in_flight{route="/metrics",method="GET"} 1' in rendu
+        assert 'http_requests_in_flight{route="/api/incidents/{id}",method="GET"} 0' in rendu
+        assert 'http_requests_in_flight{route="/health",method="GET"} 0' in rendu
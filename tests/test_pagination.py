@@ -0,0 +1,189 @@
+"""
+Tests - Pagination par curseur (keyset)
+"""
+import pytest
+from datetime import date, datetime, time
+
+from sqlalchemy import insert
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.models.incident import Incident
+from app.services.incident_service import IncidentService
+from app.schemas.incident import IncidentCreate
+from app.schemas.suivi_incident import SuiviCreate
+
+
+def _creer_incidents(db, patient, n):
+    incidents = []
+    for i in range(n):
+        incidents.append(IncidentService.create(db, IncidentCreate(
+            dateIncident=date(2024, 3, 1 + i % 28),
+            heureIncident=time(10, 0, 0),
+            gravite="MINEUR",
+            description=f"Incident numéro {i + 1}",
+            idPatient=patient.id
+        )))
+    return incidents
+
+
+class TestCurseur:
+    """Tests d'encodage / décodage des curseurs"""
+
+    def test_aller_retour(self):
+        """✅ Un curseur décodé redonne les valeurs typées"""
+        values = (datetime(2024, 3, 20, 14, 30, 0, 123), 42)
+        token = encode_cursor(values)
+        assert decode_cursor(token, (datetime, int)) == values
+
+    def test_curseur_opaque_url_safe(self):
+        """✅ Le curseur ne contient que des caractères URL-safe"""
+        token = encode_cursor((date(2024, 3, 20), time(14, 30), 7))
+        assert all(c.isalnum() or c in "-_" for c in token)
+
+    @pytest.mark.parametrize("token", ["abc", "!!!", encode_cursor([1]), encode_cursor(["x", 1])])
+    def test_curseur_invalide(self, token):
+        """❌ Curseur malformé → InvalidCursorError"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(token, (datetime, int))
+
+
+class TestPaginationService:
+    """Tests de la pagination keyset dans IncidentService"""
+
+    def test_get_all_parcours_complet(self, db, patient_en_db):
+        """✅ Parcourir toutes les pages renvoie chaque incident une seule fois, dans l'ordre"""
+        created = _creer_incidents(db, patient_en_db, 7)
+        seen, cursor = [], None
+        while True:
+            page = IncidentService.get_all(db, limit=3, cursor=cursor)
+            seen.extend(i.id for i in page)
+            if len(page) < 3:
+                break
+            cursor = encode_cursor(IncidentService.list_cursor()(page[-1]))
+        assert seen == [i.id for i in reversed(created)]
+
+    def test_get_by_patient_parcours_complet(self, db, patient_en_db):
+        """✅ Pagination des incidents d'un patient par (date, heure, id) décroissants"""
+        _creer_incidents(db, patient_en_db, 5)
+        attendu = [i.id for i in IncidentService.get_by_patient(db, patient_en_db.id)]
+        page1 = IncidentService.get_by_patient(db, patient_en_db.id, limit=2)
+        cursor = encode_cursor(IncidentService.patient_incidents_cursor(page1[-1]))
+        reste = IncidentService.get_by_patient(db, patient_en_db.id, cursor=cursor)
+        assert [i.id for i in page1 + reste] == attendu
+
+    def test_get_suivis_parcours_complet(self, db, patient_en_db):
+        """✅ Pagination des suivis par (dateSuivi, id) croissants"""
+        incident = _creer_incidents(db, patient_en_db, 1)[0]
+        for i in range(4):
+            IncidentService.add_suivi(db, incident.id, SuiviCreate(
+                dateSuivi="2024-03-25", actionsPrises=f"Action numéro {i + 1}"
+            ))
+        page1 = IncidentService.get_suivis(db, incident.id, limit=3)
+        cursor = encode_cursor(IncidentService.suivis_cursor(page1[-1]))
+        page2 = IncidentService.get_suivis(db, incident.id, limit=3, cursor=cursor)
+        assert len(page1) == 3 and len(page2) == 1
+        assert page2[0].id > page1[-1].id
+
+    def test_comptage(self, db, patient_en_db):
+        """✅ Les comptages ignorent les incidents supprimés"""
+        created = _creer_incidents(db, patient_en_db, 3)
+        IncidentService.soft_delete(db, created[0].id)
+        assert IncidentService.count_all(db) == 2
+        assert IncidentService.count_by_patient(db, patient_en_db.id) == 2
+
+
+class TestPaginationApi:
+    """Tests des en-têtes de pagination sur les routes de liste"""
+
+    def test_liste_incidents_curseur(self, client, db, patient_en_db):
+        """✅ X-Next-Cursor permet d'obtenir la page suivante"""
+        _creer_incidents(db, patient_en_db, 5)
+        r1 = client.get("/api/incidents/", params={"limit": 3, "with_total": True})
+        assert r1.status_code == 200
+        assert len(r1.json()) == 3
+        assert r1.headers["X-Total-Count"] == "5"
+
+        r2 = client.get("/api/incidents/", params={"limit": 3, "cursor": r1.headers["X-Next-Cursor"]})
+        assert len(r2.json()) == 2
+        assert "X-Next-Cursor" not in r2.headers
+        assert not {i["id"] for i in r1.json()} & {i["id"] for i in r2.json()}
+
+    def test_incidents_patient_curseur(self, client, db, patient_en_db):
+        """✅ Pagination des incidents d'un patient"""
+        _creer_incidents(db, patient_en_db, 3)
+        r1 = client.get(f"/api/patients/{patient_en_db.id}/incidents", params={"limit": 2})
+        r2 = client.get(
+            f"/api/patients/{patient_en_db.id}/incidents",
+            params={"limit": 2, "cursor": r1.headers["X-Next-Cursor"]}
+        )
+        assert len(r1.json()) == 2 and len(r2.json()) == 1
+
+    def test_curseur_invalide(self, client):
+        """❌ Curseur invalide → 400"""
+        response = client.get("/api/incidents/", params={"cursor": "pas-un-curseur"})
+        assert response.status_code == 400
+
+
+class TestFiltresTriApi:
+    """Tests des filtres et du tri de GET /api/incidents"""
+
+    @pytest.fixture
+    def registre(self, db, patient_en_db):
+        lignes = [
+            (date(2024, 1, 10), "MINEUR", "OUVERT", 1, 10, None),
+            (date(2024, 2, 10), "MAJEUR", "OUVERT", 2, 10, 20),
+            (date(2024, 3, 10), "CRITIQUE", "EN_COURS", 1, None, 20),
+            (date(2024, 4, 10), "MAJEUR", "RESOLU", 2, 11, None),
+            (date(2024, 5, 10), "CRITIQUE", "OUVERT", 1, 11, 21),
+        ]
+        db.execute(insert(Incident), [{
+            "dateIncident": jour, "heureIncident": time(9, 0), "gravite": gravite, "statut": statut,
+            "description": f"Incident du {jour}", "idPatient": patient_en_db.id,
+            "idMedecin": medecin, "idImplant": implant, "idProcesseur": processeur,
+            # dateCreation dans l'ordre inverse de dateIncident
+            "dateCreation": datetime(2024, 6, 30 - i),
+        } for i, (jour, gravite, statut, medecin, implant, processeur) in enumerate(lignes)])
+        db.commit()
+
+    @staticmethod
+    def _jours(response):
+        assert response.status_code == 200, response.text
+        return [i["dateIncident"][5:7] for i in response.json()]
+
+    @pytest.mark.parametrize("params, mois", [
+        ({"gravite": ["MAJEUR", "CRITIQUE"]}, ["02", "03", "04", "05"]),
+        ({"statut": "OUVERT", "gravite": "CRITIQUE"}, ["05"]),
+        ({"date_from": "2024-02-01", "date_to": "2024-04-10"}, ["02", "03", "04"]),
+        ({"idMedecin": 1}, ["01", "03", "05"]),
+        ({"idImplant": 10}, ["01", "02"]),
+        ({"idProcesseur": 20, "statut": "EN_COURS"}, ["03"]),
+    ])
+    def test_filtres(self, client, registre, params, mois):
+        """✅ Filtres combinables"""
+        response = client.get("/api/incidents/", params={**params, "sort": "dateIncident", "with_total": True})
+        assert self._jours(response) == mois
+        assert response.headers["X-Total-Count"] == str(len(mois))
+
+    @pytest.mark.parametrize("sort, mois", [
+        ("-dateCreation", ["01", "02", "03", "04", "05"]),
+        ("dateCreation", ["05", "04", "03", "02", "01"]),
+        ("-dateIncident", ["05", "04", "03", "02", "01"]),
+        ("dateIncident", ["01", "02", "03", "04", "05"]),
+    ])
+    def test_tri(self, client, registre, sort, mois):
+        """✅ Tri sur une colonne de la liste blanche"""
+        assert self._jours(client.get("/api/incidents/", params={"sort": sort})) == mois
+
+    def test_curseur_avec_tri_et_filtre(self, client, registre):
+        """✅ Le curseur poursuit le parcours dans l'ordre et le filtre demandés"""
+        params = {"sort": "-dateIncident", "gravite": ["MAJEUR", "CRITIQUE"], "limit": 3}
+        r1 = client.get("/api/incidents/", params=params)
+        r2 = client.get("/api/incidents/", params={**params, "cursor": r1.headers["X-Next-Cursor"]})
+        assert self._jours(r1) + self._jours(r2) == ["05", "04", "03", "02"]
+
+    @pytest.mark.parametrize("params", [
+        {"sort": "description"}, {"sort": "-id"}, {"idMedecin": 0}, {"gravite": "GRAVE"},
+    ])
+    def test_parametre_invalide(self, client, params):
+        """❌ Tri hors liste blanche ou filtre invalide → 422"""
+        assert client.get("/api/incidents/", params=params).status_code == 422
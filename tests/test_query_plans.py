@@ -0,0 +1,151 @@
+"""
+Tests de non-régression des plans d'exécution
+Chaque requête émise par IncidentService doit être servie par un index :
+aucun parcours complet de table (SCAN <table>) ni tri temporaire.
+"""
+import random
+import re
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.core.pagination import encode_cursor
+from app.models.incident import GraviteEnum, Incident, StatutEnum
+from app.services.incident_service import IncidentService
+from app.schemas.incident import IncidentCreate, IncidentFilter, IncidentSort, IncidentUpdate
+from app.schemas.suivi_incident import SuiviCreate
+from tests.conftest import engine
+
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?\w+$")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR ORDER BY")
+
+
+def _plans(statements):
+    """EXPLAIN QUERY PLAN de chaque SELECT capturé → liste de (sql, [détails])."""
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            plans.append((statement, [row[-1] for row in rows]))
+    return plans
+
+
+def _assert_indexed(statements):
+    plans = _plans(statements)
+    assert plans, "Aucune requête SELECT capturée"
+    for statement, details in plans:
+        for detail in details:
+            assert not FULL_SCAN.match(detail), f"Parcours complet de table : {detail}\n{statement}"
+            assert not TEMP_SORT.search(detail), f"Tri sans index : {detail}\n{statement}"
+
+
+@pytest.fixture
+def incident(db, patient_en_db):
+    incident = IncidentService.create(db, IncidentCreate(
+        dateIncident="2024-03-20",
+        heureIncident="14:30:00",
+        gravite="MINEUR",
+        description="Son faible après calibration",
+        idPatient=patient_en_db.id
+    ))
+    IncidentService.add_suivi(db, incident.id, SuiviCreate(dateSuivi="2024-03-25", actionsPrises="Recalibration"))
+    return incident
+
+
+class TestPlansIncidentService:
+    """Chaque requête du service utilise un index"""
+
+    def test_creation(self, db, patient_en_db, sql_statements):
+        """✅ Création : recherche du patient par clé primaire"""
+        IncidentService.create(db, IncidentCreate(
+            dateIncident="2024-03-20",
+            heureIncident="14:30:00",
+            gravite="MAJEUR",
+            description="Perte de son brutale",
+            idPatient=patient_en_db.id
+        ))
+        _assert_indexed(sql_statements)
+
+    def test_lectures(self, db, incident, sql_statements):
+        """✅ get_by_id, get_all, get_by_patient, get_suivis et comptages"""
+        IncidentService.get_by_id(db, incident.id)
+        page = IncidentService.get_all(db, limit=1)
+        IncidentService.get_all(db, limit=1, cursor=encode_cursor(IncidentService.list_cursor()(page[0])))
+        page = IncidentService.get_by_patient(db, incident.idPatient, limit=1)
+        IncidentService.get_by_patient(
+            db, incident.idPatient, limit=1,
+            cursor=encode_cursor(IncidentService.patient_incidents_cursor(page[0]))
+        )
+        page = IncidentService.get_suivis(db, incident.id, limit=1)
+        IncidentService.get_suivis(
+            db, incident.id, limit=1, cursor=encode_cursor(IncidentService.suivis_cursor(page[0]))
+        )
+        IncidentService.count_all(db)
+        IncidentService.count_by_patient(db, incident.idPatient)
+        IncidentService.count_suivis(db, incident.id)
+        _assert_indexed(sql_statements)
+
+    def test_ecritures(self, db, incident, sql_statements):
+        """✅ update, add_suivi et soft_delete"""
+        IncidentService.update(db, incident.id, IncidentUpdate(gravite="CRITIQUE"))
+        IncidentService.add_suivi(db, incident.id, SuiviCreate(dateSuivi="2024-03-26", actionsPrises="Contrôle"))
+        IncidentService.soft_delete(db, incident.id)
+        _assert_indexed(sql_statements)
+
+
+@pytest.fixture
+def registre(db, patient_en_db):
+    """Registre réaliste (distribution des valeurs) puis ANALYZE, comme une base de production."""
+    rng = random.Random(0)
+    db.execute(insert(Incident), [{
+        "dateIncident": date(2022, 1, 1) + timedelta(days=rng.randrange(900)),
+        "heureIncident": time(12, 0),
+        "gravite": rng.choice(list(GraviteEnum)),
+        "statut": rng.choice(list(StatutEnum)),
+        "description": "Incident de test",
+        "idPatient": patient_en_db.id,
+        "idMedecin": rng.randrange(1, 50),
+        "idImplant": rng.choice([None, rng.randrange(1, 400)]),
+        "idProcesseur": rng.choice([None, rng.randrange(1, 400)]),
+        "deleted": int(rng.random() < 0.05),
+    } for _ in range(3000)])
+    db.commit()
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+
+class TestPlansFiltresListe:
+    """Chaque combinaison de filtres / tri de GET /api/incidents utilise l'index prévu"""
+
+    @pytest.mark.parametrize("filtres, tri, index, trie_par_index", [
+        ({}, IncidentSort.DATE_CREATION_DESC, "ix_incidents_actif_creation", True),
+        ({}, IncidentSort.DATE_CREATION, "ix_incidents_actif_creation", True),
+        ({}, IncidentSort.DATE_INCIDENT_DESC, "ix_incidents_actif_date", True),
+        ({}, IncidentSort.DATE_MODIFICATION_DESC, "ix_incidents_actif_modification", True),
+        ({"date_from": "2024-01-01", "date_to": "2024-01-07"}, IncidentSort.DATE_INCIDENT_DESC,
+         "ix_incidents_actif_date", True),
+        ({"gravite": ["CRITIQUE", "MAJEUR"], "statut": ["OUVERT"], "date_from": "2024-05-01"},
+         IncidentSort.DATE_CREATION_DESC, "ix_incidents_triage", False),
+        ({"idMedecin": 3, "gravite": ["CRITIQUE"]}, IncidentSort.DATE_CREATION_DESC,
+         "ix_incidents_medecin_creation", True),
+        ({"idMedecin": 3}, IncidentSort.DATE_INCIDENT, "ix_incidents_medecin_date", True),
+        ({"idMedecin": 3}, IncidentSort.DATE_MODIFICATION_DESC, "ix_incidents_medecin_modification", True),
+        ({"idImplant": 4}, IncidentSort.DATE_CREATION_DESC, "ix_incidents_implant_creation", True),
+        ({"idImplant": 4}, IncidentSort.DATE_INCIDENT_DESC, "ix_incidents_implant_date", True),
+        ({"idImplant": 4}, IncidentSort.DATE_MODIFICATION, "ix_incidents_implant_modification", True),
+        ({"idProcesseur": 5}, IncidentSort.DATE_CREATION_DESC, "ix_incidents_processeur_creation", True),
+        ({"idProcesseur": 5}, IncidentSort.DATE_INCIDENT_DESC, "ix_incidents_processeur_date", True),
+        ({"idProcesseur": 5, "statut": ["OUVERT"]}, IncidentSort.DATE_MODIFICATION_DESC,
+         "ix_incidents_processeur_modification", True),
+    ])
+    def test_index_utilise(self, db, registre, sql_statements, filtres, tri, index, trie_par_index):
+        """✅ Recherche par l'index attendu, jamais de parcours complet ; lecture dans l'ordre du tri"""
+        IncidentService.get_all(db, limit=20, filters=IncidentFilter(**filtres), sort=tri)
+        [(statement, details)] = _plans(sql_statements)
+        assert any(f"USING INDEX {index} " in detail for detail in details), details
+        assert not any(FULL_SCAN.match(detail) for detail in details), details
+        # Plusieurs valeurs de gravite / statut : aucun index ne donne l'ordre, tri des seules lignes filtrées
+        assert any(TEMP_SORT.search(detail) for detail in details) != trie_par_index, details
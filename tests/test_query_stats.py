@@ -0,0 +1,191 @@
+"""
+Tests - Instrumentation SQL (statistiques par requête, requêtes lentes, N+1)
+"""
+import logging
+
+import anyio
+import pytest
+from sqlalchemy import select, text
+
+from app.core import query_stats
+from app.core.cache import incident_cache
+from app.core.config import settings
+from app.core.query_stats import QueryStatsMiddleware, normalize, track
+from app.models.incident import Incident
+from app.schemas.incident import IncidentCreate, IncidentResponse, IncidentUpdate
+from app.schemas.suivi_incident import SuiviCreate, SuiviResponse
+from app.services.incident_service import IncidentService
+from tests.conftest import TestingSessionLocal
+
+INCIDENT = {
+    "dateIncident": "2024-03-20",
+    "heureIncident": "14:30:00",
+    "gravite": "MINEUR",
+    "description": "Son faible après calibration",
+}
+SUIVI = {"dateSuivi": "2024-03-25", "actionsPrises": "Recalibration effectuée"}
+
+
+class TestNormalisation:
+    """Tests de la forme normalisée des requêtes"""
+
+    @pytest.mark.parametrize("sql, forme", [
+        ("SELECT * FROM incidents WHERE id = 42", "SELECT * FROM incidents WHERE id = ?"),
+        ("SELECT * FROM incidents\n  WHERE description = 'l''oreille'  AND id = ?",
+         "SELECT * FROM incidents WHERE description = ? AND id = ?"),
+        ("SELECT anon_1.id FROM t AS anon_1 WHERE id IN (?, ?, ?)", "SELECT anon_1.id FROM t AS anon_1 WHERE id IN (?)"),
+        ("UPDATE incidents SET statut=%(statut)s WHERE id = %s", "UPDATE incidents SET statut=? WHERE id = ?"),
+        ("SELECT 1.5, -3 LIMIT :param_1", "SELECT ?, ? LIMIT ?"),
+    ])
+    def test_forme(self, sql, forme):
+        """✅ Littéraux et paramètres remplacés, listes IN et espaces réduits"""
+        assert normalize(sql) == forme
+
+
+class TestStatistiques:
+    """Tests de la collecte par contexte"""
+
+    def test_comptage_et_duree(self, db, patient_en_db):
+        """✅ Nombre de requêtes, durée cumulée et requête la plus lente"""
+        with track() as stats:
+            IncidentService.get_all(db, limit=10)
+            IncidentService.count_all(db)
+        assert stats.count == 2
+        assert stats.seconds >= stats.slowest_seconds > 0
+        assert stats.slowest.lstrip().startswith("SELECT")
+
+    def test_hors_contexte(self, db):
+        """✅ Aucune collecte hors d'une requête suivie"""
+        assert query_stats.current() is None
+        db.execute(text("SELECT 1"))
+
+    def test_requete_en_erreur(self, db):
+        """✅ Une requête en erreur ne laisse pas d'entrée sur la connexion"""
+        info = db.connection().info  # propre à la connexion du pool, conservé d'une session à l'autre
+        with pytest.raises(Exception):
+            db.execute(text("SELECT * FROM table_inexistante"))
+        db.rollback()
+        assert info["query_start"] == []
+        db.execute(text("SELECT 1"))
+        assert db.connection().info is info and info["query_start"] == []
+
+    def test_requete_lente(self, db, monkeypatch, caplog):
+        """✅ Requête au-delà du seuil journalisée sous forme normalisée"""
+        monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+        with caplog.at_level(logging.WARNING, logger="app.core.query_stats"):
+            db.execute(text("SELECT 12345"))
+        assert "Slow query" in caplog.text and "SELECT ?" in caplog.text
+
+
+class TestDetectionNPlusUn:
+    """Tests du signalement des N+1 par le middleware"""
+
+    def _requete(self, n):
+        async def endpoint(scope, receive, send):
+            with TestingSessionLocal() as session:
+                for i in range(n):
+                    session.execute(select(Incident).where(Incident.id == i)).all()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def envoyer(message):
+            pass
+
+        scope = {"type": "http", "method": "GET", "path": "/api/essai"}
+        anyio.run(QueryStatsMiddleware(endpoint), scope, None, envoyer)
+
+    def test_n_plus_un_signale(self, db, caplog):
+        """✅ La même requête répétée au-delà du seuil est signalée"""
+        with caplog.at_level(logging.WARNING, logger="app.core.query_stats"):
+            self._requete(settings.N_PLUS_ONE_THRESHOLD)
+        assert f"Probable N+1 on GET /api/essai: {settings.N_PLUS_ONE_THRESHOLD} × SELECT" in caplog.text
+
+    def test_sous_le_seuil(self, db, caplog):
+        """✅ Pas de signalement sous le seuil"""
+        with caplog.at_level(logging.WARNING, logger="app.core.query_stats"):
+            self._requete(settings.N_PLUS_ONE_THRESHOLD - 1)
+        assert "N+1" not in caplog.text
+
+
+class TestBudgetRequetes:
+    """Nombre maximal de requêtes SQL par endpoint (détection des régressions)"""
+
+    @pytest.fixture
+    def incident_id(self, client, patient_en_db):
+        incident_id = client.post("/api/incidents/", json={**INCIDENT, "idPatient": patient_en_db.id}).json()["id"]
+        client.post(f"/api/incidents/{incident_id}/suivis", json=SUIVI)
+        return incident_id
+
+    @pytest.mark.parametrize("methode, url, corps, budget", [
+        ("get", "/api/incidents/", None, 1),
+        ("get", "/api/incidents/?with_total=true&gravite=MINEUR", None, 2),
+        ("get", "/api/incidents/{id}", None, 1),
+        ("get", "/api/incidents/{id}?include=suivis,patient,medecin", None, 2),
+        ("get", "/api/patients/{patient}/incidents", None, 2),
+        ("get", "/api/incidents/{id}/suivis", None, 2),
+        ("get", "/api/stats/incidents", None, 1),
+        ("get", "/api/search?q=calibration", None, 1),
+        ("post", "/api/incidents/", INCIDENT, 4),
+        ("put", "/api/incidents/{id}", {"gravite": "MAJEUR"}, 3),
+        ("post", "/api/incidents/{id}/suivis", SUIVI, 3),
+        ("delete", "/api/incidents/{id}", None, 4),
+    ])
+    def test_budget(self, client, patient_en_db, incident_id, assert_max_queries, methode, url, corps, budget):
+        """✅ L'endpoint reste dans son budget de requêtes"""
+        url = url.format(id=incident_id, patient=patient_en_db.id)
+        if corps is INCIDENT:
+            corps = {**corps, "idPatient": patient_en_db.id}
+        # Budget d'un cache froid
+        incident_cache.clear()
+        with assert_max_queries(budget):
+            response = client.request(methode.upper(), url, json=corps)
+        assert response.status_code < 300
+
+
+class TestEcrituresSansRelecture:
+    """Les écritures renvoient l'entité persistée sans SELECT de relecture après le commit"""
+
+    @staticmethod
+    def _sur_table(statements, debut, table):
+        return [
+            normalize(statement).split(" (")[0].split(" SET")[0] for statement, _ in statements[debut:]
+            if table in statement.split(" WHERE")[0]
+        ]
+
+    def test_creation(self, db, patient_en_db, sql_statements):
+        """✅ Création : un seul INSERT sur incidents, entité lisible sans requête"""
+        debut = len(sql_statements)
+        incident = IncidentService.create(db, IncidentCreate(**INCIDENT, idPatient=patient_en_db.id))
+        reponse = IncidentResponse.model_validate(incident)
+        assert self._sur_table(sql_statements, debut, "incidents") == ["INSERT INTO incidents"]
+        assert reponse.id and reponse.dateCreation and reponse.dateModification and reponse.statut == "OUVERT"
+
+    def test_mise_a_jour(self, db, patient_en_db, sql_statements):
+        """✅ Mise à jour : lecture verrouillée puis un seul UPDATE, dateModification à jour sans relecture"""
+        incident = IncidentService.create(db, IncidentCreate(**INCIDENT, idPatient=patient_en_db.id))
+        avant = incident.dateModification
+        debut = len(sql_statements)
+        incident = IncidentService.update(db, incident.id, IncidentUpdate(gravite="MAJEUR"))
+        reponse = IncidentResponse.model_validate(incident)
+        executees = self._sur_table(sql_statements, debut, "incidents")
+        assert len(executees) == 2 and executees[0].startswith("SELECT") and executees[1] == "UPDATE incidents"
+        assert reponse.gravite == "MAJEUR" and reponse.dateModification >= avant
+
+    def test_ajout_suivi(self, db, patient_en_db, sql_statements):
+        """✅ Ajout de suivi : un seul INSERT sur suivis_incidents, suivi lisible sans requête"""
+        incident = IncidentService.create(db, IncidentCreate(**INCIDENT, idPatient=patient_en_db.id))
+        debut = len(sql_statements)
+        suivi = IncidentService.add_suivi(db, incident.id, SuiviCreate(**SUIVI))
+        reponse = SuiviResponse.model_validate(suivi)
+        assert self._sur_table(sql_statements, debut, "suivis_incidents") == ["INSERT INTO suivis_incidents"]
+        assert reponse.id and reponse.dateCreation
+
+    def test_verrou_relit_les_valeurs_validees(self, db, patient_en_db):
+        """✅ La lecture verrouillée remplace l'état en session (objets non expirés au commit)"""
+        incident = IncidentService.create(db, IncidentCreate(**INCIDENT, idPatient=patient_en_db.id))
+        with TestingSessionLocal() as autre:
+            IncidentService.update(autre, incident.id, IncidentUpdate(gravite="CRITIQUE"))
+        assert incident.gravite == "MINEUR"
+        IncidentService.update(db, incident.id, IncidentUpdate(statut="RESOLU"))
+        assert incident.gravite == "CRITIQUE"
+        assert IncidentService.get_by_id(db, incident.id).statut == "RESOLU"
@@ -0,0 +1,222 @@
+"""
+Tests - Lectures sur réplica (deux fichiers SQLite : principal et réplica)
+"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.core.cache import incident_cache
+from app.core.config import settings
+from app.core import replica as replica_module
+from app.core.replica import PRIMARY_COOKIE, _reported_lag, replica_lag
+from app.database import Base, get_db
+from app.main import app
+from app.models.incident import GraviteEnum, Incident
+from app.models.patient import Patient
+
+
+def _sessions(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+
+def _incident(session, incident_id, modified=datetime(2026, 5, 4, 10, 0)):
+    with session() as db:
+        db.add(Incident(
+            id=incident_id, dateIncident=modified.date(), heureIncident=modified.time(),
+            gravite=GraviteEnum.MINEUR, description=f"Incident {incident_id}", idPatient=1,
+            dateCreation=modified, dateModification=modified
+        ))
+        db.commit()
+
+
+@pytest.fixture
+def bases(tmp_path, monkeypatch):
+    """Principal et réplica, un même patient des deux côtés ; les GET passent par le réplica."""
+    primary = _sessions(tmp_path / "primary.db")
+    replica = _sessions(tmp_path / "replica.db")
+    for session in (primary, replica):
+        with session() as db:
+            db.add(Patient(id=1, nom="Dupont", prenom="Jean"))
+            db.commit()
+
+    def override_get_db():
+        with primary() as db:
+            yield db
+
+    replica.configure(info={"replica": True})
+    monkeypatch.setattr(database, "ReadSessionLocal", replica)
+    monkeypatch.setattr(settings, "DATABASE_READ_URL", f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(replica_module, "_cached_status", None)
+    app.dependency_overrides[get_db] = override_get_db
+    incident_cache.clear()
+    yield primary, replica
+    app.dependency_overrides.clear()
+    incident_cache.clear()
+
+
+@pytest.fixture
+def client(bases):
+    with TestClient(app) as c:
+        yield c
+
+
+class TestRoutageLectures:
+    """Tests de get_read_db"""
+
+    def test_get_lit_le_replica(self, client, bases):
+        """✅ Les GET lisent le réplica, pas le principal"""
+        primary, replica = bases
+        _incident(replica, 10)
+        _incident(primary, 11)
+        assert client.get("/api/incidents/10").status_code == 200
+        assert client.get("/api/incidents/11").status_code == 404
+        assert [i["id"] for i in client.get("/api/patients/1/incidents").json()] == [10]
+
+    def test_lecture_de_ses_ecritures(self, client, bases):
+        """✅ Après une écriture, le client lit le principal pendant la fenêtre"""
+        response = client.post("/api/incidents/", json={
+            "dateIncident": "2024-03-20", "heureIncident": "14:30:00", "gravite": "MINEUR",
+            "description": "Son faible après calibration", "idPatient": 1
+        })
+        assert response.status_code == 201
+        assert PRIMARY_COOKIE in response.cookies
+        incident_id = response.json()["id"]
+        assert client.get(f"/api/incidents/{incident_id}").status_code == 200
+
+        # Le réplica n'a pas reçu l'incident : hors cache, un client non épinglé ne le voit pas
+        client.cookies.clear()
+        incident_cache.clear()
+        assert client.get(f"/api/incidents/{incident_id}").status_code == 404
+
+    def test_fenetre_expiree(self, client, bases):
+        """✅ Passé la fenêtre, les lectures retournent au réplica"""
+        primary, _ = bases
+        _incident(primary, 11)
+        client.cookies.set(PRIMARY_COOKIE, f"{time.time() - 1:.3f}")
+        assert client.get("/api/incidents/11").status_code == 404
+        client.cookies.set(PRIMARY_COOKIE, "invalide")
+        assert client.get("/api/incidents/11").status_code == 404
+
+    def test_ecriture_refusee_sans_cookie(self, client):
+        """❌ Une écriture en erreur n'épingle pas le client au principal"""
+        response = client.post("/api/incidents/", json={"idPatient": 1})
+        assert response.status_code == 422
+        assert PRIMARY_COOKIE not in response.cookies
+
+    def test_replica_ne_remplit_pas_le_cache(self, client, bases):
+        """✅ Une lecture sur le réplica (peut-être en retard) ne remplit pas le cache"""
+        _, replica = bases
+        _incident(replica, 10)
+        assert client.get("/api/incidents/10").status_code == 200
+        assert incident_cache.get(10) is None
+
+    def test_sans_replica(self, client, bases, monkeypatch):
+        """✅ Sans DATABASE_READ_URL, tout passe par le principal et aucun cookie n'est posé"""
+        primary, _ = bases
+        monkeypatch.setattr(database, "ReadSessionLocal", None)
+        monkeypatch.setattr(settings, "DATABASE_READ_URL", None)
+        _incident(primary, 11)
+        assert client.get("/api/incidents/11").status_code == 200
+        response = client.put("/api/incidents/11", json={"description": "Description corrigée"})
+        assert response.status_code == 200
+        assert PRIMARY_COOKIE not in response.cookies
+
+
+class TestRetardReplica:
+    """Tests du retard du réplica (replica_lag, /ready)"""
+
+    def test_retard(self, bases):
+        """✅ Retard = âge de la plus ancienne écriture du principal absente du réplica"""
+        primary, replica = bases
+        t0 = datetime(2026, 5, 4, 10, 0)
+        with primary() as p, replica() as r:
+            assert replica_lag(p, r, now=t0) == 0.0
+            _incident(primary, 9, modified=t0 - timedelta(seconds=30))
+            _incident(primary, 10)
+            assert replica_lag(p, r, now=t0 + timedelta(seconds=15)) == 45.0
+            _incident(replica, 9, modified=t0 - timedelta(seconds=30))
+            assert replica_lag(p, r, now=t0 + timedelta(seconds=15)) == 15.0
+            _incident(replica, 10)
+            assert replica_lag(p, r, now=t0 + timedelta(days=1)) == 0.0
+
+    def test_inactif_a_jour(self, bases):
+        """✅ Sans écriture depuis longtemps, un réplica à jour n'est pas en retard"""
+        primary, replica = bases
+        for session in (primary, replica):
+            _incident(session, 10, modified=datetime(2020, 1, 1))
+        with primary() as p, replica() as r:
+            assert replica_lag(p, r) == 0.0
+
+    def test_retard_rapporte_par_mysql(self):
+        """✅ SHOW REPLICA STATUS, puis SHOW SLAVE STATUS (MySQL < 8.0.22) ; None si la réplication est arrêtée"""
+
+        class Replica:
+            def __init__(self, rows):
+                self.rows, self.statements = rows, []
+
+            def execute(self, statement):
+                self.statements.append(str(statement))
+                row = self.rows[str(statement)]
+                if isinstance(row, Exception):
+                    raise row
+                return type("Result", (), {"mappings": lambda _: type("M", (), {"first": lambda _: row})()})()
+
+            def rollback(self):
+                pass
+
+        erreur = ProgrammingError("SHOW REPLICA STATUS", {}, Exception("syntax error"))
+        assert _reported_lag(Replica({"SHOW REPLICA STATUS": {"Seconds_Behind_Source": 3}})) == 3.0
+        ancien = Replica({"SHOW REPLICA STATUS": erreur, "SHOW SLAVE STATUS": {"Seconds_Behind_Master": 7}})
+        assert _reported_lag(ancien) == 7.0
+        assert ancien.statements == ["SHOW REPLICA STATUS", "SHOW SLAVE STATUS"]
+        assert _reported_lag(Replica({"SHOW REPLICA STATUS": None})) is None
+        with pytest.raises(replica_module.ReplicationStopped):
+            _reported_lag(Replica({"SHOW REPLICA STATUS": {"Seconds_Behind_Source": None}}))
+
+    def test_ready_a_jour(self, client, bases):
+        """✅ /ready rapporte un réplica à jour"""
+        primary, replica = bases
+        _incident(primary, 10)
+        _incident(replica, 10)
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["replica"] == {"configured": True, "status": "ok", "lag_seconds": 0.0}
+
+    def test_ready_en_retard(self, client, bases, monkeypatch):
+        """✅ Au-delà de DATABASE_READ_MAX_LAG_SECONDS, le réplica est signalé en retard"""
+        primary, replica = bases
+        monkeypatch.setattr(settings, "DATABASE_READ_MAX_LAG_SECONDS", 10.0)
+        _incident(primary, 10)
+        _incident(replica, 9, modified=datetime(2026, 5, 4, 10, 0) - timedelta(seconds=30))
+        replica_info = client.get("/ready").json()["replica"]
+        assert replica_info["status"] == "lagging"
+        assert replica_info["lag_seconds"] > 10.0
+
+    def test_ready_en_cache(self, client, bases, monkeypatch):
+        """✅ Le retard est mesuré au plus une fois par DATABASE_READ_LAG_CACHE_SECONDS"""
+        primary, _ = bases
+        mesures = []
+        monkeypatch.setattr(settings, "DATABASE_READ_LAG_CACHE_SECONDS", 60.0)
+        monkeypatch.setattr(replica_module, "replica_lag", lambda p, r: mesures.append(1) or replica_lag(p, r))
+        assert client.get("/ready").json()["replica"]["status"] == "ok"
+        _incident(primary, 10)
+        assert client.get("/ready").json()["replica"]["status"] == "ok"
+        assert len(mesures) == 1
+        monkeypatch.setattr(replica_module, "_cached_status", None)
+        assert client.get("/ready").json()["replica"]["status"] == "lagging"
+        assert len(mesures) == 2
+
+    def test_ready_sans_replica(self, client, monkeypatch):
+        """✅ Sans réplica, /ready ne vérifie que le principal"""
+        monkeypatch.setattr(database, "ReadSessionLocal", None)
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready", "database": "ok", "replica": {"configured": False}}
@@ -0,0 +1,148 @@
+"""
+Tests - Recherche plein texte (FTS5 en local)
+"""
+import pytest
+
+from app.models.incident import Incident
+from app.schemas.incident import IncidentCreate, IncidentUpdate
+from app.schemas.suivi_incident import SuiviCreate
+from app.services.incident_service import IncidentService
+from app.services.search_service import SearchService, highlight
+
+
+def _incident(patient_id, description):
+    return IncidentCreate(
+        dateIncident="2024-03-20",
+        heureIncident="14:30:00",
+        gravite="MINEUR",
+        description=description,
+        idPatient=patient_id
+    )
+
+
+@pytest.fixture
+def corpus(db, patient_en_db):
+    calibration = IncidentService.create(db, _incident(patient_en_db.id, "Son faible après calibration du processeur"))
+    perte = IncidentService.create(db, _incident(patient_en_db.id, "Perte de son brutale côté droit"))
+    bulk = IncidentService.create_many(db, [
+        _incident(patient_en_db.id, "Impédance anormale sur l'électrode 12"),
+        _incident(patient_en_db.id, "Douleur au niveau de l'aimant"),
+    ]).ids
+    IncidentService.add_suivi(db, perte.id, SuiviCreate(
+        dateSuivi="2024-03-25", actionsPrises="Désactivation des électrodes 3 et 4, nouvelle calibration"
+    ))
+    return {"calibration": calibration.id, "perte": perte.id, "electrode": bulk[0], "aimant": bulk[1]}
+
+
+def _ids(hits):
+    return [(hit.type, hit.idIncident) for hit in hits]
+
+
+class TestRecherche:
+    """Tests de SearchService.search"""
+
+    def test_accents_et_casse(self, db, corpus):
+        """✅ « ELECTRODE » trouve « électrode » et « électrodes » (incidents et suivis)"""
+        hits = SearchService.search(db, "ELECTRODE")
+        assert sorted(_ids(hits)) == sorted([("incident", corpus["electrode"]), ("suivi", corpus["perte"])])
+
+    def test_tous_les_mots(self, db, corpus):
+        """✅ Tous les mots doivent figurer, les mots courts sont ignorés"""
+        assert _ids(SearchService.search(db, "perte de son")) == [("incident", corpus["perte"])]
+
+    def test_classement(self, db, corpus):
+        """✅ Le texte le plus pertinent est classé en premier"""
+        hits = SearchService.search(db, "calibration")
+        assert _ids(hits)[0] == ("incident", corpus["calibration"])
+        assert hits[0].score >= hits[-1].score
+
+    def test_extrait_surligne(self, db, corpus):
+        """✅ Les termes trouvés sont surlignés"""
+        [hit] = SearchService.search(db, "aimant")
+        assert hit.snippet == "Douleur au niveau de l'<mark>aimant</mark>"
+
+    def test_extrait_echappe(self, db, patient_en_db):
+        """✅ Le HTML saisi dans une description est échappé, seules les marques restent des balises"""
+        IncidentService.create(db, _incident(patient_en_db.id, "<img src=x onerror=alert(1)> après calibration"))
+        [hit] = SearchService.search(db, "calibration")
+        assert hit.snippet == "&lt;img src=x onerror=alert(1)&gt; après <mark>calibration</mark>"
+
+    def test_syntaxe_neutralisee(self, db, corpus):
+        """✅ Les opérateurs FTS saisis par l'utilisateur sont traités comme du texte"""
+        assert SearchService.search(db, 'son" OR "aimant') == []
+
+    def test_requete_trop_courte(self, db):
+        """❌ Aucun mot de 3 caractères → ValueError"""
+        with pytest.raises(ValueError):
+            SearchService.search(db, "de la")
+
+
+class TestSynchronisation:
+    """Tests de la tenue à jour de l'index"""
+
+    def test_mise_a_jour(self, db, corpus):
+        """✅ Une description modifiée est réindexée"""
+        IncidentService.update(db, corpus["aimant"], IncidentUpdate(description="Migration du porte-antenne"))
+        assert SearchService.search(db, "aimant") == []
+        assert _ids(SearchService.search(db, "antenne")) == [("incident", corpus["aimant"])]
+
+    def test_suppression(self, db, corpus):
+        """✅ Les incidents supprimés et leurs suivis sont exclus"""
+        IncidentService.soft_delete(db, corpus["perte"])
+        assert _ids(SearchService.search(db, "électrode")) == [("incident", corpus["electrode"])]
+
+    def test_reindex(self, db, corpus):
+        """✅ Le réindexage reconstruit l'index depuis les tables"""
+        db.query(Incident).filter(Incident.id == corpus["aimant"]).update({"description": "Aimant déplacé"})
+        db.commit()
+        assert SearchService.search(db, "déplacé") == []
+        assert SearchService.reindex(db) == 5
+        assert _ids(SearchService.search(db, "deplace")) == [("incident", corpus["aimant"])]
+
+
+class TestRechercheSansIndex:
+    """Tests du repli ILIKE (SGBD sans index plein texte)"""
+
+    def test_sous_chaines(self, db, corpus):
+        """✅ Tous les mots en sous-chaîne, sans casse ; incidents supprimés exclus ; plus récents d'abord"""
+        hits = SearchService._search_like(db, ["CALIBRATION"], limit=20)
+        assert _ids(hits) == [("suivi", corpus["perte"]), ("incident", corpus["calibration"])]
+        assert hits[1].snippet == "Son faible après <mark>calibration</mark> du processeur"
+        IncidentService.soft_delete(db, corpus["perte"])
+        assert _ids(SearchService._search_like(db, ["calibration", "nouvelle"], limit=20)) == []
+
+    def test_joker_neutralise(self, db, corpus):
+        """✅ « _ » est cherché tel quel, pas comme joker LIKE"""
+        assert SearchService._search_like(db, ["s_n"], limit=20) == []
+
+
+class TestExtrait:
+    """Tests du surlignage côté Python (MySQL)"""
+
+    def test_fenetre(self):
+        """✅ Fenêtre autour de la première occurrence, insensible aux accents"""
+        texte = "début " * 30 + "Électrodes désactivées " + "fin " * 30
+        extrait = highlight(texte, ["electrode"], words=8)
+        assert extrait.startswith("…") and extrait.endswith("…")
+        assert "<mark>Électrodes</mark>" in extrait
+
+    def test_echappement(self):
+        """✅ Texte échappé en HTML autour des marques"""
+        assert highlight("<script>x</script> & calibration", ["calibration"]) == (
+            "&lt;script&gt;x&lt;/script&gt; &amp; <mark>calibration</mark>"
+        )
+        assert highlight("<>", ["calibration"]) == "&lt;&gt;"
+
+
+class TestRechercheApi:
+    """Tests GET /api/search"""
+
+    def test_get(self, client, corpus):
+        """✅ Résultats classés avec extraits"""
+        response = client.get("/api/search", params={"q": "perte son"})
+        assert response.status_code == 200
+        assert response.json()[0]["snippet"] == "<mark>Perte</mark> de <mark>son</mark> brutale côté droit"
+
+    def test_requete_invalide(self, client):
+        """❌ Requête sans mot exploitable → 400"""
+        assert client.get("/api/search", params={"q": "a b"}).status_code == 400
@@ -0,0 +1,73 @@
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Incident, Patient, SuiviIncident
+from app.services.stats_service import StatsService
+from app.tools import seed as seed_tool
+
+VOLUMES = seed_tool.Volumes(patients=100, incidents=2000, suivis=6000)
+
+
+def _generate(tmp_path, name, **options):
+    url = f"sqlite:///{tmp_path / name}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    counts = seed_tool.generate(url, VOLUMES, **options)
+    return engine, counts
+
+
+def _rows(engine, model):
+    with engine.connect() as conn:
+        return conn.execute(select(model.__table__).order_by(model.id)).all()
+
+
+@pytest.fixture(autouse=True)
+def petits_chunks(monkeypatch):
+    # Plusieurs chunks par table, même sur un petit jeu de données
+    monkeypatch.setattr(seed_tool, "CHUNK", 300)
+
+
+class TestGenerateur:
+    """✅ Jeu de données synthétique : volumes, forme et déterminisme"""
+
+    def test_volumes(self, tmp_path):
+        engine, counts = _generate(tmp_path, "a.db")
+        assert counts["patients"] == VOLUMES.patients
+        assert counts["incidents"] == VOLUMES.incidents
+        assert counts["medecins"] == VOLUMES.medecins
+        # Total de suivis approximatif (loi exponentielle par incident)
+        assert 0.9 * VOLUMES.suivis < counts["suivis"] < 1.1 * VOLUMES.suivis
+        with engine.connect() as conn:
+            ids = conn.execute(select(func.min(SuiviIncident.id), func.max(SuiviIncident.id))).one()
+        assert ids == (1, counts["suivis"])
+
+    def test_deterministe_quel_que_soit_le_nombre_de_workers(self, tmp_path):
+        seul, _ = _generate(tmp_path, "a.db", seed=7)
+        parallele, _ = _generate(tmp_path, "b.db", seed=7, workers=2, batch=250)
+        for model in (Patient, Incident, SuiviIncident):
+            assert _rows(seul, model) == _rows(parallele, model)
+
+    def test_graine_differente(self, tmp_path):
+        a, _ = _generate(tmp_path, "a.db", seed=1)
+        b, _ = _generate(tmp_path, "b.db", seed=2)
+        assert _rows(a, Incident) != _rows(b, Incident)
+
+    def test_forme_des_donnees(self, tmp_path):
+        engine, _ = _generate(tmp_path, "a.db")
+        incidents = _rows(engine, Incident)
+        gravites = Counter(i.gravite.value for i in incidents)
+        assert gravites["MINEUR"] > gravites["MODERE"] > gravites["MAJEUR"] > gravites["CRITIQUE"] > 0
+        # Patients "chauds" : le premier pourcent porte bien plus que 1 % des incidents
+        par_patient = Counter(i.idPatient for i in incidents)
+        chauds = sum(n for patient, n in par_patient.items() if patient <= VOLUMES.patients // 100)
+        assert chauds > 0.1 * len(incidents)
+
+    def test_statistiques_reconstruites(self, tmp_path):
+        engine, counts = _generate(tmp_path, "a.db")
+        with sessionmaker(bind=engine)() as db:
+            assert StatsService.check(db) == {}
+            assert StatsService.get(db).total == sum(1 for i in _rows(engine, Incident) if not i.deleted)
@@ -0,0 +1,67 @@
+"""
+Tests - Sérialisation rapide des listes (FAST_LIST_SERIALIZATION)
+"""
+from datetime import date, datetime, time
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.incident import Incident
+from app.services.incident_service import IncidentService
+
+DESCRIPTIONS = [
+    "Son faible après calibration",
+    'Guillemets "doubles", barre \\ oblique et </script>',
+    "Retour\nà la ligne,\ttabulation et \x01 caractère de contrôle",
+    "Émoji 🦻, séparateur de ligne \u2028 et espace\u00a0insécable",
+]
+
+
+@pytest.fixture
+def incidents(db, patient_en_db):
+    db.execute(insert(Incident), [{
+        "dateIncident": date(2024, 3, 1 + i),
+        "heureIncident": time(14, 30, 15),
+        "gravite": "MAJEUR",
+        "statut": "OUVERT",
+        "description": description,
+        "idPatient": patient_en_db.id,
+        "idProcesseur": 7 if i % 2 else None,
+        "dateCreation": datetime(2024, 3, 1, 10, 0, 0, 123456 * (i % 2)),
+    } for i, description in enumerate(DESCRIPTIONS)])
+    db.commit()
+
+
+def _deux_modes(client, monkeypatch, url, params=None):
+    # Même identifiant de requête, pour comparer tous les en-têtes
+    headers = {"X-Request-ID": "comparaison"}
+    monkeypatch.setattr(settings, "FAST_LIST_SERIALIZATION", False)
+    standard = client.get(url, params=params, headers=headers)
+    monkeypatch.setattr(settings, "FAST_LIST_SERIALIZATION", True)
+    rapide = client.get(url, params=params, headers=headers)
+    assert standard.status_code == rapide.status_code == 200
+    return standard, rapide
+
+
+class TestSerialisationRapide:
+    """Tests de compatibilité octet par octet avec le chemin response_model"""
+
+    @pytest.mark.parametrize("params", [{}, {"limit": 2, "with_total": True}, {"gravite": "CRITIQUE"}])
+    def test_liste_incidents_identique(self, client, monkeypatch, incidents, params):
+        """✅ Même corps et mêmes en-têtes sur GET /api/incidents"""
+        standard, rapide = _deux_modes(client, monkeypatch, "/api/incidents/", params)
+        assert rapide.content == standard.content
+        assert rapide.headers == standard.headers
+
+    def test_incidents_patient_identique(self, client, monkeypatch, incidents, patient_en_db):
+        """✅ Même corps et mêmes validateurs sur GET /api/patients/{id}/incidents"""
+        url = f"/api/patients/{patient_en_db.id}/incidents"
+        standard, rapide = _deux_modes(client, monkeypatch, url, {"limit": 3, "with_total": True})
+        assert rapide.content == standard.content
+        assert rapide.headers == standard.headers
+        assert {"etag", "x-next-cursor", "x-total-count"} <= set(rapide.headers)
+
+    def test_page_vide(self):
+        """✅ Page vide → tableau JSON vide"""
+        assert IncidentService.serialize_list([]) == b"[]"
@@ -0,0 +1,100 @@
+"""
+Tests - Statistiques d'incidents (table de synthèse)
+"""
+import pytest
+
+from app.models.incident import Incident
+from app.schemas.incident import IncidentCreate, IncidentUpdate
+from app.schemas.suivi_incident import SuiviCreate
+from app.services.incident_service import IncidentService
+from app.services.stats_service import StatsService
+from app.tools import stats as stats_tool
+from tests.conftest import TestingSessionLocal
+
+
+def _incident(patient_id, **champs):
+    return IncidentCreate(**{
+        "dateIncident": "2024-03-20",
+        "heureIncident": "14:30:00",
+        "gravite": "MINEUR",
+        "description": "Son faible après calibration",
+        "idPatient": patient_id,
+        **champs
+    })
+
+
+@pytest.fixture
+def incidents(db, patient_en_db):
+    premier = IncidentService.create(db, _incident(patient_en_db.id, idProcesseur=7))
+    IncidentService.create_many(db, [
+        _incident(patient_en_db.id, gravite="MAJEUR", dateIncident="2024-04-02"),
+        _incident(patient_en_db.id, gravite="CRITIQUE", dateIncident="2024-04-15", idProcesseur=7),
+    ])
+    return premier.id
+
+
+class TestMiseAJourIncrementale:
+    """Tests de la tenue à jour des compteurs à chaque écriture"""
+
+    def test_creation(self, db, incidents):
+        """✅ Création unitaire et en masse comptées par dimension"""
+        stats = StatsService.get(db)
+        assert stats.total == 3
+        assert stats.gravite == {"CRITIQUE": 1, "MAJEUR": 1, "MINEUR": 1}
+        assert stats.statut == {"OUVERT": 3}
+        assert stats.mois == {"2024-03": 1, "2024-04": 2}
+        assert stats.idProcesseur == {"7": 2}
+        assert stats.idImplant == {}
+
+    def test_ecritures(self, db, incidents):
+        """✅ update, add_suivi et soft_delete déplacent les compteurs"""
+        IncidentService.update(db, incidents, IncidentUpdate(gravite="MAJEUR"))
+        IncidentService.add_suivi(db, incidents, SuiviCreate(dateSuivi="2024-03-25", actionsPrises="Contrôle"))
+        stats = StatsService.get(db)
+        assert stats.gravite == {"CRITIQUE": 1, "MAJEUR": 2}
+        assert stats.statut == {"EN_COURS": 1, "OUVERT": 2}
+
+        IncidentService.soft_delete(db, incidents)
+        stats = StatsService.get(db)
+        assert stats.total == 2
+        assert stats.statut == {"OUVERT": 2}
+        assert stats.idProcesseur == {"7": 1}
+        assert StatsService.check(db) == {}
+
+    def test_lecture_sans_table_incidents(self, db, incidents, sql_statements):
+        """✅ La lecture ne touche que la table de synthèse"""
+        StatsService.get(db)
+        assert len(sql_statements) == 1
+        assert "incidents " not in sql_statements[0][0].replace("incident_stats", "")
+
+
+class TestReconstruction:
+    """Tests de la commande d'administration"""
+
+    def test_derive_detectee_et_corrigee(self, db, incidents, capsys, monkeypatch):
+        """✅ check signale une dérive, rebuild la corrige"""
+        monkeypatch.setattr(stats_tool, "SessionLocal", TestingSessionLocal)
+        # Écriture hors service : la table de synthèse n'est pas mise à jour
+        db.query(Incident).filter(Incident.id == incidents).update({"deleted": 1})
+        db.commit()
+        assert StatsService.check(db)[("total", "all")] == (3, 2)
+
+        assert stats_tool.main(["check"]) == 1
+        assert stats_tool.main(["rebuild"]) == 0
+        assert "in sync" in capsys.readouterr().out
+        assert StatsService.get(db).total == 2
+
+
+class TestStatsApi:
+    """Tests GET /api/stats/incidents"""
+
+    def test_get(self, client, incidents):
+        """✅ Compteurs servis par l'API"""
+        data = client.get("/api/stats/incidents").json()
+        assert data["total"] == 3
+        assert data["mois"] == {"2024-03": 1, "2024-04": 2}
+
+    def test_vide(self, client):
+        """✅ Base vide → compteurs à zéro"""
+        data = client.get("/api/stats/incidents").json()
+        assert data == {"total": 0, "gravite": {}, "statut": {}, "mois": {}, "idImplant": {}, "idProcesseur": {}}
@@ -0,0 +1,239 @@
+"""
+Tests - Contrôle de concurrence optimiste (version des incidents)
+"""
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.conditional import PreconditionFailedError, VersionConflictError
+from app.database import Base
+from app.models.incident import Incident, StatutEnum
+from app.models.patient import Patient
+from app.models.suivi_incident import SuiviIncident
+from app.schemas.incident import IncidentCreate, IncidentUpdate
+from app.schemas.suivi_incident import SuiviCreate
+from app.services.incident_service import IncidentService
+from app.services.stats_service import StatsService
+
+THREADS = 8
+PAR_THREAD = 10
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Base SQLite sur fichier : une connexion par thread, comme en production."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'versions.db'}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def incident_id(sessions):
+    with sessions() as db:
+        patient = Patient(nom="Dupont", prenom="Jean")
+        db.add(patient)
+        db.commit()
+        return IncidentService.create(db, IncidentCreate(
+            dateIncident="2024-03-20", heureIncident="14:30:00", gravite="MINEUR",
+            description="Compteur 0", idPatient=patient.id
+        )).id
+
+
+def _marteler(worker):
+    """Lance THREADS threads en même temps ; remonte la première exception."""
+    start, errors = threading.Barrier(THREADS), []
+
+    def run(n):
+        try:
+            start.wait()
+            worker(n)
+        except Exception as e:  # pragma: no cover - remonté ci-dessous
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+class TestVersionIncident:
+    """Tests de la colonne version (version_id_col)"""
+
+    def test_creation_et_increment(self, sessions, incident_id):
+        """✅ Version 1 à la création, +1 à chaque mise à jour"""
+        with sessions() as db:
+            assert IncidentService.get_by_id(db, incident_id).version == 1
+            incident = IncidentService.update(db, incident_id, IncidentUpdate(description="Compteur 1"))
+            assert incident.version == 2
+
+    def test_version_perimee(self, sessions, incident_id):
+        """❌ Mise à jour refusée si l'incident n'est plus à la version lue"""
+        with sessions() as db:
+            IncidentService.update(db, incident_id, IncidentUpdate(description="Compteur 1", version=1))
+            with pytest.raises(VersionConflictError):
+                IncidentService.update(db, incident_id, IncidentUpdate(description="Compteur 2", version=1))
+            assert IncidentService.get_by_id(db, incident_id).description == "Compteur 1"
+
+    def test_ecriture_concurrente_detectee(self, sessions, incident_id):
+        """❌ Un objet lu avant une écriture concurrente ne peut plus être écrit (UPDATE … AND version = ?)"""
+        with sessions() as a, sessions() as b:
+            perime = b.get(Incident, incident_id)
+            IncidentService.update(a, incident_id, IncidentUpdate(description="Compteur 1"))
+            perime.description = "Écriture perdue"
+            with pytest.raises(StaleDataError):
+                b.commit()
+
+    def test_if_match_ecriture_concurrente(self, sessions, incident_id, monkeypatch):
+        """❌ Avec If-Match, une écriture concurrente après la vérification de l'ETag → précondition échouée"""
+        record = StatsService.record
+
+        def ecriture_concurrente(db, before, after):
+            monkeypatch.setattr(StatsService, "record", record)
+            with sessions() as autre:
+                IncidentService.update(autre, incident_id, IncidentUpdate(description="Écriture concurrente"))
+            record(db, before, after)
+
+        with sessions() as db:
+            etag = IncidentService.incident_etag(incident_id, 1)
+            monkeypatch.setattr(StatsService, "record", ecriture_concurrente)
+            with pytest.raises(PreconditionFailedError):
+                IncidentService.update(db, incident_id, IncidentUpdate(description="Compteur 1"), if_match=etag)
+            assert IncidentService.get_by_id(db, incident_id).description == "Écriture concurrente"
+
+    def test_suivi_version_perimee(self, sessions, incident_id):
+        """❌ Suivi refusé si l'incident a changé depuis la version lue"""
+        with sessions() as db:
+            IncidentService.update(db, incident_id, IncidentUpdate(gravite="MAJEUR"))
+            with pytest.raises(VersionConflictError):
+                IncidentService.add_suivi(db, incident_id, SuiviCreate(
+                    dateSuivi="2024-03-25", actionsPrises="Contrôle de l'impédance", versionIncident=1
+                ))
+            assert db.query(SuiviIncident).count() == 0
+
+
+class TestConcurrence:
+    """Tests de charge : un même incident modifié depuis de nombreux threads"""
+
+    def test_aucune_mise_a_jour_perdue(self, sessions, incident_id):
+        """✅ Lecture-modification-écriture concurrente : chaque incrément est conservé"""
+        def incrementer(_):
+            for _ in range(PAR_THREAD):
+                while True:
+                    with sessions() as db:
+                        incident = IncidentService.get_by_id(db, incident_id)
+                        valeur = int(incident.description.split()[-1])
+                        try:
+                            IncidentService.update(db, incident_id, IncidentUpdate(
+                                description=f"Compteur {valeur + 1}", version=incident.version
+                            ))
+                            break
+                        except VersionConflictError:
+                            continue  # relu puis rejoué par le client
+
+        _marteler(incrementer)
+        with sessions() as db:
+            incident = IncidentService.get_by_id(db, incident_id)
+            assert incident.description == f"Compteur {THREADS * PAR_THREAD}"
+            assert incident.version == 1 + THREADS * PAR_THREAD
+
+    def test_ecritures_sans_version_rejouees(self, sessions, incident_id):
+        """✅ Sans version, les écritures concurrentes de champs différents sont toutes appliquées"""
+        def modifier(n):
+            with sessions() as db:
+                if n % 2:
+                    IncidentService.update(db, incident_id, IncidentUpdate(idMedecin=n))
+                else:
+                    IncidentService.update(db, incident_id, IncidentUpdate(description=f"Compteur {n + 100}"))
+
+        _marteler(modifier)
+        with sessions() as db:
+            incident = IncidentService.get_by_id(db, incident_id)
+            assert incident.idMedecin in range(1, THREADS, 2)
+            assert incident.description != "Compteur 0"
+            # Chaque écriture a produit sa propre version
+            assert incident.version == 1 + THREADS
+            assert StatsService.check(db) == {}
+
+    def test_suivis_concurrents(self, sessions, incident_id):
+        """✅ Suivis simultanés sur un incident Ouvert : tous enregistrés, une seule transition, stats justes"""
+        def ajouter(n):
+            with sessions() as db:
+                IncidentService.add_suivi(db, incident_id, SuiviCreate(
+                    dateSuivi="2024-03-25", actionsPrises=f"Action de suivi numéro {n}"
+                ))
+
+        _marteler(ajouter)
+        with sessions() as db:
+            assert db.query(SuiviIncident).count() == THREADS
+            incident = IncidentService.get_by_id(db, incident_id)
+            assert incident.statut == StatutEnum.EN_COURS
+            assert incident.version == 2
+            assert StatsService.check(db) == {}
+
+
+@pytest.fixture
+def incident_api(client, patient_en_db):
+    response = client.post("/api/incidents/", json={
+        "dateIncident": "2024-03-20", "heureIncident": "14:30:00", "gravite": "MINEUR",
+        "description": "Son faible après calibration du processeur vocal", "idPatient": patient_en_db.id
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+class TestVersionApi:
+    """Tests de la version via l'API"""
+
+    def test_version_exposee(self, client, incident_api):
+        """✅ La version figure dans la réponse"""
+        assert incident_api["version"] == 1
+        assert client.get(f"/api/incidents/{incident_api['id']}").json()["version"] == 1
+
+    def test_put_version_courante(self, client, incident_api):
+        """✅ PUT avec la version courante accepté, version incrémentée"""
+        response = client.put(
+            f"/api/incidents/{incident_api['id']}", json={"description": "Description corrigée", "version": 1}
+        )
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+
+    def test_put_version_perimee(self, client, incident_api):
+        """❌ PUT avec une version périmée → 409"""
+        url = f"/api/incidents/{incident_api['id']}"
+        assert client.put(url, json={"gravite": "MAJEUR", "version": 1}).status_code == 200
+        response = client.put(url, json={"description": "Description corrigée", "version": 1})
+        assert response.status_code == 409
+        assert client.get(url).json()["description"] == incident_api["description"]
+
+    def test_put_if_match_et_version_perimee(self, client, incident_api):
+        """❌ If-Match fourni : un conflit de version donne 412, pas 409"""
+        url = f"/api/incidents/{incident_api['id']}"
+        assert client.put(url, json={"gravite": "MAJEUR"}).status_code == 200
+        etag = client.get(url).headers["etag"]
+        response = client.put(
+            url, json={"description": "Description corrigée", "version": 1}, headers={"If-Match": etag}
+        )
+        assert response.status_code == 412
+        assert client.get(url).json()["description"] == incident_api["description"]
+
+    def test_suivi_version_perimee(self, client, incident_api):
+        """❌ Suivi avec une version d'incident périmée → 409"""
+        url = f"/api/incidents/{incident_api['id']}"
+        assert client.put(url, json={"gravite": "MAJEUR"}).status_code == 200
+        response = client.post(f"{url}/suivis", json={
+            "dateSuivi": "2024-03-25", "actionsPrises": "Contrôle de l'impédance", "versionIncident": 1
+        })
+        assert response.status_code == 409
+        response = client.post(f"{url}/suivis", json={
+            "dateSuivi": "2024-03-25", "actionsPrises": "Contrôle de l'impédance", "versionIncident": 2
+        })
+        assert response.status_code == 201